@@ -4,15 +4,14 @@ Main Streamlit Application
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import os
-from src.generate_data import SyntheticDataGenerator
-from src.observability import run_quality_checks, plot_completeness_chart, plot_outliers_chart, plot_freshness_gauge
-from src.ml_pipeline import ProductionMLPipeline
+import time
+from src.jobs import JobManager
 from src.utils import ensure_data_dirs, load_dataframe
 
+# Page modules (and their catboost / sklearn / scipy / plotly dependencies) are
+# imported inside each page, so a cold start loads only what the first page needs
+
 # Page configuration
 st.set_page_config(
     page_title="Vaca Muerta Observability",
@@ -55,7 +54,8 @@ st.markdown('<div class="sub-header">Synthetic Data Engineering & ML Platform fo
 st.sidebar.title("Navigation")
 page = st.sidebar.radio(
     "Select Module:",
-    ["🏗️ Synthetic Data", "🔍 Data Observability", "⚙️ Feature Engineering", "📈 Model Predictions"]
+    ["🏗️ Synthetic Data", "🔍 Data Observability", "⚙️ Feature Engineering", "📈 Model Predictions",
+     "🎯 HF Optimization", "💰 Well Economics"]
 )
 
 st.sidebar.markdown("---")
@@ -89,8 +89,62 @@ ensure_data_dirs()
 DATA_FILE = 'data/bronze/wells_synth.csv'
 
 
+@st.cache_resource
+def get_query_engine():
+    """One DuckDB engine per server process, shared across sessions"""
+    from src.query import QueryEngine
+    return QueryEngine(DATA_FILE)
+
+
+@st.cache_resource
+def get_production_model(path: str, mtime_ns: int):
+    """Promoted model, loaded once per file version"""
+    from src.ml_pipeline import ProductionMLPipeline
+    return ProductionMLPipeline.load(path)
+
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """One background job pool per server process, shared across sessions and pages"""
+    return JobManager(max_workers=2)
+
+
+def session_job(name: str):
+    """This session's latest background job of a given name, if any"""
+    return get_job_manager().get(st.session_state.get(name, ''))
+
+
+def show_job_progress(job, label: str):
+    """Progress bar with ETA for a queued or running job"""
+    info = job.info()
+    eta = f" · ETA {info['eta_s']:.0f}s" if info['eta_s'] is not None else ""
+    st.progress(info['fraction'], text=f"{label}: {info['message']} ({info['fraction']:.0%}{eta})")
+
+
+@st.cache_resource
+def warm_up_server():
+    """Preload page modules, cached datasets and the model once per server process"""
+    from src.ml_pipeline import MODEL_PATH
+    from src.warmup import warm_up
+    
+    result = warm_up(DATA_FILE, load_model=False)
+    if os.path.exists(MODEL_PATH):
+        get_production_model(MODEL_PATH, os.stat(MODEL_PATH).st_mtime_ns)
+    return result['timings']
+
+
+# Optional warm-up hook (VMO_WARMUP=1): the first request pays once so later pages start warm
+if os.environ.get('VMO_WARMUP') == '1':
+    warm_up_server()
+
+
 # ==================== PAGE: SYNTHETIC DATA ====================
 if page == "🏗️ Synthetic Data":
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from src.gold import load_gold
+    from src.viz import histogram_trace, plot_well_map
+    
     st.header("🏗️ Synthetic Data Generation")
     
     col1, col2 = st.columns([2, 1])
@@ -101,32 +155,46 @@ if page == "🏗️ Synthetic Data":
         - **SDV (Synthetic Data Vault)** for statistical modeling
         - **Faker** for realistic field values
         - **Arps Decline Curves** for production simulation
+        - **Gaussian Random Fields** (optional) for spatially correlated reservoir properties
         """)
     
     with col2:
         n_wells = st.number_input("Number of Wells", min_value=10, max_value=500, value=150, step=10)
+        spatial_fields = st.checkbox("Spatially correlated properties",
+                                     help="Porosity, net pay, TOC and pressure from Gaussian random fields")
+        variogram_range_km = st.slider("Variogram range (km)", 2.0, 100.0, 20.0, 1.0, disabled=not spatial_fields)
         generate_button = st.button("🧬 Generate Data", type="primary", use_container_width=True)
     
+    # Generation runs in the background job pool; identical concurrent requests share one job
     if generate_button:
-        with st.spinner(f"Generating {n_wells} synthetic wells..."):
-            generator = SyntheticDataGenerator(n_wells=n_wells)
-            datasets = generator.generate_all()
-            st.success(f"✅ Successfully generated {n_wells} wells!")
-            
-            # Display sample data
-            st.subheader("Master Dataset Preview")
-            st.dataframe(datasets['master'].head(20), use_container_width=True)
-            
-            # Statistics
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("Total Wells", f"{len(datasets['master']):,}")
-            with col2:
-                st.metric("Total Columns", f"{datasets['master'].shape[1]}")
-            with col3:
-                st.metric("Avg Production (180d)", f"{datasets['master']['cum_oil_180_days_m3'].mean():.1f} m³")
-            with col4:
-                st.metric("Avg Lateral Length", f"{datasets['master']['lateral_length_m'].mean():.0f} m")
+        params = {'n_wells': int(n_wells)}
+        if spatial_fields:
+            params.update(spatial_fields=True, variogram_range_km=float(variogram_range_km))
+        st.session_state['generate_job'] = get_job_manager().submit('generate_data', **params).job_id
+    
+    generate_job = session_job('generate_job')
+    if generate_job and not generate_job.done:
+        show_job_progress(generate_job, f"Generating {generate_job.params['n_wells']} synthetic wells")
+    elif generate_job and generate_job.status == 'failed':
+        st.error(f"❌ Data generation failed: {generate_job.info()['message']}")
+    elif generate_job:
+        summary = generate_job.result()
+        st.success(f"✅ Successfully generated {summary['n_wells']} wells!")
+        
+        # Display sample data
+        st.subheader("Master Dataset Preview")
+        st.dataframe(load_dataframe(DATA_FILE).head(20), use_container_width=True)
+        
+        # Statistics
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Total Wells", f"{summary['n_wells']:,}")
+        with col2:
+            st.metric("Total Columns", f"{summary['n_columns']}")
+        with col3:
+            st.metric("Avg Production (180d)", f"{summary['avg_cum_oil_180_days_m3']:.1f} m³")
+        with col4:
+            st.metric("Avg Lateral Length", f"{summary['avg_lateral_length_m']:.0f} m")
     
     # Load existing data if available
     if os.path.exists(DATA_FILE):
@@ -135,40 +203,51 @@ if page == "🏗️ Synthetic Data":
         
         df = load_dataframe(DATA_FILE)
         
-        tab1, tab2, tab3 = st.tabs(["📍 Spatial Distribution", "📊 Production Histograms", "🔗 Correlations"])
+        tab1, tab2, tab3, tab4 = st.tabs(["📍 Spatial Distribution", "📊 Production Histograms",
+                                          "🏭 Production Breakdown", "🔗 Correlations"])
         
         with tab1:
             if 'latitude' in df.columns and 'longitude' in df.columns:
-                fig = px.scatter_mapbox(
-                    df,
-                    lat='latitude',
-                    lon='longitude',
-                    color='cum_oil_180_days_m3',
-                    size='cum_oil_180_days_m3',
-                    hover_data=['well_id', 'formation'],
-                    title="Well Locations (colored by 180-day production)",
-                    mapbox_style="open-street-map",
-                    zoom=6,
-                    height=600
-                )
+                # Large datasets are binned into hexagons sized for the zoom level, so the
+                # payload is bounded by the number of cells rather than wells
+                zoom = st.slider("Map zoom", min_value=4, max_value=12, value=6)
+                fig = plot_well_map(df, 'cum_oil_180_days_m3', zoom=zoom, hover=['well_id', 'formation'],
+                                    title="Well Locations (colored by 180-day production)")
                 st.plotly_chart(fig, use_container_width=True)
         
+        # Precomputed gold-layer aggregates (rebuilt only when the data changes)
         with tab2:
+            bins = load_gold('histograms', DATA_FILE)
+            col1, col2 = st.columns(2)
+            for column, title, container in [
+                ('cum_oil_180_days_m3', "Cumulative Oil Production @ 180 Days", col1),
+                ('proppant_intensity_ton_per_m', "Proppant Intensity Distribution", col2)
+            ]:
+                fig = go.Figure(histogram_trace(bins[bins['column'] == column]))
+                fig.update_layout(title=title, xaxis_title=column, yaxis_title="count")
+                with container:
+                    st.plotly_chart(fig, use_container_width=True)
+        
+        with tab3:
             col1, col2 = st.columns(2)
             with col1:
-                fig = px.histogram(df, x='cum_oil_180_days_m3', nbins=30, 
-                                   title="Cumulative Oil Production @ 180 Days")
+                by_formation = load_gold('production_by_formation', DATA_FILE)
+                fig = px.bar(by_formation, x='formation', y='mean_m3', text='n_wells',
+                             title="Mean 180-Day Production by Formation")
                 st.plotly_chart(fig, use_container_width=True)
-            
             with col2:
-                fig = px.histogram(df, x='proppant_intensity_ton_per_m', nbins=30,
-                                   title="Proppant Intensity Distribution")
+                by_proppant = load_gold('production_by_proppant_type', DATA_FILE)
+                fig = px.bar(by_proppant, x='proppant_type', y='mean_m3', text='n_wells',
+                             title="Mean 180-Day Production by Proppant Type")
                 st.plotly_chart(fig, use_container_width=True)
+            
+            by_month = load_gold('production_by_completion_month', DATA_FILE)
+            fig = px.line(by_month, x='completion_month', y=['p10_m3', 'p50_m3', 'p90_m3'], markers=True,
+                          title="180-Day Production by Completion Month (P10 / P50 / P90)")
+            st.plotly_chart(fig, use_container_width=True)
         
-        with tab3:
-            numeric_cols = ['porosity', 'net_pay_m', 'lateral_length_m', 
-                           'proppant_intensity_ton_per_m', 'cum_oil_180_days_m3']
-            corr_data = df[numeric_cols].corr()
+        with tab4:
+            corr_data = load_gold('correlations', DATA_FILE).set_index('feature')
             
             fig = px.imshow(corr_data, 
                            text_auto='.2f',
@@ -180,16 +259,21 @@ if page == "🏗️ Synthetic Data":
 
 # ==================== PAGE: DATA OBSERVABILITY ====================
 elif page == "🔍 Data Observability":
+    import pandas as pd
+    from src.observability import run_quality_checks_sql, plot_completeness_chart, plot_outliers_chart, plot_freshness_gauge
+    from src.anomaly import load_or_score_anomalies, anomaly_summary, plot_anomaly_scores
+    
     st.header("🔍 Data Observability & Quality Monitoring")
     
     if not os.path.exists(DATA_FILE):
         st.warning("⚠️ No data found. Please generate synthetic data first.")
     else:
-        df = load_dataframe(DATA_FILE)
+        engine = get_query_engine()
+        engine.refresh()
         
-        # Run quality checks
+        # Run quality checks in SQL over the file (no full pandas load)
         with st.spinner("Running data quality checks..."):
-            results = run_quality_checks(df, date_column='completion_date')
+            results = run_quality_checks_sql(engine, 'wells', date_column='last_production_date')
         
         st.success("✅ Quality checks complete!")
         
@@ -217,8 +301,8 @@ elif page == "🔍 Data Observability":
         
         with col4:
             st.metric(
-                "Memory Usage",
-                f"{results['memory_usage_mb']:.2f} MB"
+                "Size on Disk",
+                f"{results['size_on_disk_mb']:.2f} MB"
             )
         
         st.markdown("---")
@@ -244,10 +328,11 @@ elif page == "🔍 Data Observability":
         st.markdown("---")
         st.subheader("📋 Missing Values Analysis")
         
+        missing_counts = pd.Series(results['completeness']['missing_counts'])
         missing_data = pd.DataFrame({
-            'Column': df.columns,
-            'Missing Count': df.isnull().sum().values,
-            'Missing %': (df.isnull().sum().values / len(df) * 100).round(2)
+            'Column': missing_counts.index,
+            'Missing Count': missing_counts.values,
+            'Missing %': (missing_counts.values / results['row_count'] * 100).round(2)
         })
         missing_data = missing_data[missing_data['Missing Count'] > 0].sort_values('Missing Count', ascending=False)
         
@@ -255,17 +340,40 @@ elif page == "🔍 Data Observability":
             st.dataframe(missing_data, use_container_width=True)
         else:
             st.success("✅ No missing values detected!")
+        
+        # Multivariate anomalies from the persisted Isolation Forest (no refit per view)
+        st.markdown("---")
+        st.subheader("🌲 Multivariate Anomalies (Isolation Forest)")
+        
+        anomaly_scores = load_or_score_anomalies(DATA_FILE)
+        summary = anomaly_summary(anomaly_scores)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Anomaly Rate", f"{summary['anomaly_rate_pct']:.1f}%")
+        with col2:
+            st.metric("Anomalous Wells", f"{summary['n_anomalies']:,}")
+        with col3:
+            st.metric("Wells Scored", f"{summary['n_wells']:,}")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.plotly_chart(plot_anomaly_scores(anomaly_scores), use_container_width=True)
+        with col2:
+            st.dataframe(anomaly_scores.nlargest(15, 'anomaly_score'), use_container_width=True)
 
 
 # ==================== PAGE: FEATURE ENGINEERING ====================
 elif page == "⚙️ Feature Engineering":
+    from src.feature_store import load_feature_table
+    from src.gold import load_gold
+    from src.viz import box_stats, plot_box
+    
     st.header("⚙️ Feature Engineering & Analysis")
     
     if not os.path.exists(DATA_FILE):
         st.warning("⚠️ No data found. Please generate synthetic data first.")
     else:
-        df = load_dataframe(DATA_FILE)
-        
         st.markdown("""
         **Engineered Features:**
         - **Reservoir Quality Index** = Porosity × Net Pay
@@ -275,9 +383,8 @@ elif page == "⚙️ Feature Engineering":
         - **Stage Spacing** = Lateral Length / Number of Stages
         """)
         
-        # Initialize pipeline
-        pipeline = ProductionMLPipeline()
-        df_engineered = pipeline.prepare_features(df)
+        # Materialized silver-layer features (rebuilt only when the source changes)
+        df_engineered = load_feature_table(DATA_FILE)
         
         # Display engineered features
         st.subheader("🔧 Engineered Features Preview")
@@ -292,26 +399,28 @@ elif page == "⚙️ Feature Engineering":
             
             # Statistical summary
             st.subheader("📊 Statistical Summary")
-            st.dataframe(df_engineered[available_cols].describe(), use_container_width=True)
+            summary = load_gold('feature_summary', DATA_FILE).set_index('statistic')
+            st.dataframe(summary[available_cols], use_container_width=True)
             
             # Distributions
             st.subheader("📈 Feature Distributions")
             
             col1, col2 = st.columns(2)
             
+            # Box statistics are computed server-side; only quartiles and extreme outliers are sent
             for idx, col in enumerate(available_cols[:4]):
-                if idx % 2 == 0:
-                    with col1:
-                        fig = px.box(df_engineered, y=col, title=f"{col} Distribution")
-                        st.plotly_chart(fig, use_container_width=True)
-                else:
-                    with col2:
-                        fig = px.box(df_engineered, y=col, title=f"{col} Distribution")
-                        st.plotly_chart(fig, use_container_width=True)
+                with col1 if idx % 2 == 0 else col2:
+                    fig = plot_box({col: box_stats(df_engineered[col])}, title=f"{col} Distribution")
+                    st.plotly_chart(fig, use_container_width=True)
 
 
 # ==================== PAGE: MODEL PREDICTIONS ====================
 elif page == "📈 Model Predictions":
+    import plotly.graph_objects as go
+    from src.explain import load_or_compute_shap, well_drivers, plot_well_drivers
+    from src.feature_store import load_feature_table
+    from src.viz import histogram_table, histogram_trace, scatter_gl
+    
     st.header("📈 Production Forecasting with Machine Learning")
     
     if not os.path.exists(DATA_FILE):
@@ -327,13 +436,25 @@ elif page == "📈 Model Predictions":
         
         train_button = st.button("🚀 Train Model", type="primary", use_container_width=False)
         
-        if train_button or 'trained' in st.session_state:
-            with st.spinner("Training machine learning model..."):
-                pipeline = ProductionMLPipeline()
-                metrics = pipeline.train_model(df)
-                st.session_state['trained'] = True
-                st.session_state['pipeline'] = pipeline
-                st.session_state['metrics'] = metrics
+        # Training runs in the background job pool and keeps going across page switches
+        if train_button:
+            st.session_state['train_job'] = get_job_manager().submit('train_model', source_path=DATA_FILE).job_id
+        
+        train_job = session_job('train_job')
+        if train_job and not train_job.done:
+            show_job_progress(train_job, "Training machine learning model")
+        elif train_job and train_job.status == 'failed':
+            st.error(f"❌ Training failed: {train_job.info()['message']}")
+        elif train_job and st.session_state.get('trained_job') != train_job.job_id:
+            result = train_job.result()
+            st.session_state['trained'] = True
+            st.session_state['trained_job'] = train_job.job_id
+            st.session_state['pipeline'] = result['pipeline']
+            st.session_state['metrics'] = result['metrics']
+        
+        if 'trained' in st.session_state:
+            pipeline = st.session_state['pipeline']
+            metrics = st.session_state['metrics']
             
             st.success("✅ Model training complete!")
             
@@ -373,17 +494,163 @@ elif page == "📈 Model Predictions":
             col1, col2 = st.columns(2)
             
             with col1:
-                fig = px.scatter(x=metrics['y_pred'], y=residuals,
-                                labels={'x': 'Predicted Values', 'y': 'Residuals'},
-                                title="Residual Plot")
+                fig = go.Figure(scatter_gl(metrics['y_pred'], residuals, mode='markers'))
+                fig.update_layout(title="Residual Plot", xaxis_title="Predicted Values", yaxis_title="Residuals")
                 fig.add_hline(y=0, line_dash="dash", line_color="red")
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
-                fig = px.histogram(x=residuals, nbins=30, 
-                                  title="Residuals Distribution",
-                                  labels={'x': 'Residuals'})
+                fig = go.Figure(histogram_trace(histogram_table(residuals, bins=30)))
+                fig.update_layout(title="Residuals Distribution", xaxis_title="Residuals", yaxis_title="count")
                 st.plotly_chart(fig, use_container_width=True)
+            
+            # Per-well explanations (TreeSHAP, computed once per model and cached on disk)
+            st.markdown("---")
+            st.subheader("🧭 Well-Level Prediction Drivers")
+            
+            with st.spinner("Loading SHAP explanations..."):
+                shap_values = load_or_compute_shap(pipeline, df, DATA_FILE, load_feature_table(DATA_FILE))
+            
+            well_id = st.selectbox("Select Well", shap_values['well_id'])
+            drivers = well_drivers(shap_values, well_id, top_n=10)
+            st.plotly_chart(plot_well_drivers(drivers, well_id), use_container_width=True)
+
+
+# ==================== PAGE: HF OPTIMIZATION ====================
+elif page == "🎯 HF Optimization":
+    from src.ml_pipeline import MODEL_PATH
+    from src.optimizer import CompletionDesignOptimizer, grid_candidates, random_candidates, plot_pareto_front
+    
+    st.header("🎯 Completion Design Optimization")
+    
+    if 'pipeline' in st.session_state:
+        pipeline = st.session_state['pipeline']
+    elif os.path.exists(MODEL_PATH):
+        pipeline = get_production_model(MODEL_PATH, os.stat(MODEL_PATH).st_mtime_ns)
+    else:
+        pipeline = None
+    
+    if not os.path.exists(DATA_FILE):
+        st.warning("⚠️ No data found. Please generate synthetic data first.")
+    elif pipeline is None:
+        st.warning("⚠️ No trained model found. Please train a model on the Model Predictions page.")
+    else:
+        engine = get_query_engine()
+        engine.refresh()
+        
+        st.markdown("""
+        Searches lateral length, stage count, cluster spacing, proppant and fluid intensity
+        for a well's reservoir properties. All candidate designs are scored in **one batched
+        model prediction** and reduced to the **Pareto front** of production vs proppant cost.
+        """)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            well_ids = engine.query("SELECT well_id FROM wells ORDER BY well_id")['well_id']
+            well_id = st.selectbox("Well", well_ids)
+        with col2:
+            search_mode = st.radio("Search", ["Grid", "Random"], horizontal=True)
+        with col3:
+            if search_mode == "Grid":
+                points = st.slider("Points per parameter", min_value=4, max_value=12, value=10)
+                candidates = grid_candidates(points)
+            else:
+                n_candidates = st.select_slider("Candidates", options=[10_000, 50_000, 100_000, 250_000], value=100_000)
+                candidates = random_candidates(n_candidates)
+        
+        well = engine.query("SELECT * FROM wells WHERE well_id = ?", [well_id]).iloc[0]
+        result = CompletionDesignOptimizer(pipeline).optimize(well, candidates)
+        front = result['pareto_front']
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Designs Evaluated", f"{result['n_candidates']:,}")
+        with col2:
+            st.metric("Search Time", f"{result['elapsed_s']:.2f} s")
+        with col3:
+            st.metric("Best Predicted Production", f"{front['predicted_production'].max():,.0f} m³")
+        
+        st.plotly_chart(plot_pareto_front(result), use_container_width=True)
+        
+        st.subheader("📋 Pareto-Optimal Designs")
+        st.dataframe(front, use_container_width=True)
+
+# ==================== PAGE: WELL ECONOMICS ====================
+elif page == "💰 Well Economics":
+    import numpy as np
+    from src.economics import scenario_grid, well_economics, plot_npv_ranking
+    
+    st.header("💰 Well Economics Across Price Scenarios")
+    
+    if not os.path.exists(DATA_FILE):
+        st.warning("⚠️ No data found. Please generate synthetic data first.")
+    else:
+        df = load_dataframe(DATA_FILE)
+        
+        st.markdown("""
+        Each well's Arps forecast is turned into monthly cash flows for every combination of
+        oil price, operating cost and capex scenario. NPV, payout and IRR are computed for all
+        **wells × scenarios × months** at once and wells are ranked by expected NPV.
+        """)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            price_range = st.slider("Oil price (USD/bbl)", 30, 120, (50, 90))
+            n_prices = st.slider("Price steps", 2, 20, 5)
+        with col2:
+            opex_range = st.slider("Opex (USD/bbl)", 4, 30, (8, 16))
+            n_opex = st.slider("Opex steps", 1, 10, 3)
+        with col3:
+            capex_range = st.slider("Capex scale", 0.5, 2.0, (0.9, 1.2))
+            discount_rate = st.slider("Discount rate (annual)", 0.0, 0.25, 0.10, step=0.01)
+        
+        scenarios = scenario_grid(
+            np.linspace(*price_range, n_prices),
+            np.linspace(*opex_range, n_opex),
+            np.linspace(*capex_range, 3)
+        )
+        economics = well_economics(df, scenarios, discount_rate=discount_rate)
+        ranking = economics['ranking']
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Wells × Scenarios", f"{len(ranking):,} × {len(scenarios):,}")
+        with col2:
+            st.metric("Compute Time", f"{economics['elapsed_s']:.2f} s")
+        with col3:
+            st.metric("Wells with NPV > 0", f"{(ranking['npv_mean_usd'] > 0).sum():,}")
+        with col4:
+            st.metric("Best Expected NPV", f"${ranking['npv_mean_usd'].max() / 1e6:,.2f} M")
+        
+        st.plotly_chart(plot_npv_ranking(ranking), use_container_width=True)
+        
+        st.subheader("📋 Well Ranking")
+        st.dataframe(ranking, use_container_width=True)
+
+# Background jobs keep running when the page changes; progress is listed in the sidebar
+running_jobs = [(label, job) for label, job in [("Data generation", session_job('generate_job')),
+                                                ("Model training", session_job('train_job'))]
+                if job and not job.done]
+if running_jobs:
+    with st.sidebar:
+        st.markdown("---")
+        st.markdown("### ⏳ Background Jobs")
+        for label, job in running_jobs:
+            show_job_progress(job, label)
+
+# Stage timings recorded by this server process (background job spans are merged in when jobs finish)
+with st.sidebar.expander("⏱️ Performance", expanded=False):
+    from src.instrumentation import RECORDER
+
+    spans = RECORDER.summary()
+    if spans.empty:
+        st.caption("No spans recorded yet. Generate data, run quality checks or train a model.")
+    else:
+        st.dataframe(spans.round(3), use_container_width=True, hide_index=True)
+        st.download_button("Download spans (JSONL)", RECORDER.to_jsonl(),
+                           file_name="spans.jsonl", mime="application/x-ndjson")
+        st.download_button("Download metrics (Prometheus)", RECORDER.to_prometheus(),
+                           file_name="metrics.prom", mime="text/plain")
 
 st.markdown("---")
 st.markdown("""
@@ -392,3 +659,8 @@ st.markdown("""
     <p>Tech Stack: Streamlit • Python • CatBoost • Plotly • Docker</p>
 </div>
 """, unsafe_allow_html=True)
+
+# Poll until this session's jobs finish
+if running_jobs:
+    time.sleep(1)
+    st.rerun()
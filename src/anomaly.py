@@ -0,0 +1,205 @@
+"""
+Multivariate Anomaly Detection
+Isolation Forest over the engineered well feature matrix, persisted and scored in streaming batches
+"""
+
+import json
+import os
+import pickle
+from typing import Dict, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from src.feature_store import load_feature_table
+from src.features import FEATURE_VERSION, align_features, derive_features, with_features
+from src.utils import WELLS_FILE, file_signature
+from src.viz import histogram_table, histogram_trace
+
+ANOMALY_MODEL_PATH = 'models/anomaly_model.pkl'
+ANOMALY_SCORES_PATH = 'models/anomaly_scores.parquet'
+
+# Identifiers, location, categorical fields and production outcomes are not model
+# inputs; location would make every well on the edge of the acreage look anomalous
+EXCLUDE_COLUMNS = {
+    'well_id', 'latitude', 'longitude', 'cum_oil_30_days_m3', 'cum_oil_90_days_m3',
+    'cum_oil_180_days_m3', 'cum_oil_365_days_m3', 'peak_oil_rate_m3_day', 'avg_oil_rate_m3_day',
+    'decline_rate_annual', 'b_factor', 'days_online'
+}
+
+
+class AnomalyDetector:
+    """Isolation Forest on raw and engineered reservoir/completion features"""
+
+    def __init__(self, contamination: float = 0.02, n_estimators: int = 200, random_state: int = 42):
+        from sklearn.ensemble import IsolationForest
+        
+        self.model = IsolationForest(
+            n_estimators=n_estimators, contamination=contamination,
+            random_state=random_state, n_jobs=-1
+        )
+        self.feature_columns = None
+
+    def feature_matrix(self, df: pd.DataFrame, features: pd.DataFrame = None) -> np.ndarray:
+        """Numeric input columns plus derived features, as a float matrix
+
+        ``features`` is an optional materialized feature table (see
+        ``src.feature_store``); wells missing from it are derived on the fly.
+        """
+        derived = align_features(df, features) if features is not None else derive_features(df)
+        frame = with_features(df, derived)
+        if self.feature_columns is None:
+            numeric = frame.select_dtypes(include=[np.number]).columns
+            self.feature_columns = [c for c in numeric if c not in EXCLUDE_COLUMNS]
+        return frame.reindex(columns=self.feature_columns).fillna(0).to_numpy(dtype=np.float64)
+
+    def fit(self, df: pd.DataFrame, features: pd.DataFrame = None) -> 'AnomalyDetector':
+        """Fit the forest on all cores"""
+        self.feature_columns = None
+        self.model.fit(self.feature_matrix(df, features))
+        return self
+
+    def score(self, df: pd.DataFrame, features: pd.DataFrame = None) -> pd.DataFrame:
+        """Anomaly score (higher = more anomalous) and flag per well"""
+        X = self.feature_matrix(df, features)
+        return pd.DataFrame({
+            'well_id': df['well_id'].to_numpy(),
+            'anomaly_score': -self.model.score_samples(X),
+            'is_anomaly': self.model.predict(X) == -1
+        })
+
+    def score_stream(self, batches: Iterable[pd.DataFrame],
+                     features: pd.DataFrame = None) -> Iterator[pd.DataFrame]:
+        """Score an iterable of well batches without materializing them all"""
+        for batch in batches:
+            yield self.score(batch, features)
+
+    def score_file(self, path: str, features: pd.DataFrame = None, chunksize: int = 50_000) -> pd.DataFrame:
+        """Stream a CSV of wells through the model in chunks"""
+        batches = pd.read_csv(path, chunksize=chunksize)
+        return pd.concat(self.score_stream(batches, features), ignore_index=True)
+
+    def save(self, path: str = ANOMALY_MODEL_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump(self, f)
+        print(f"✅ Saved anomaly model to {path}")
+
+    @classmethod
+    def load(cls, path: str = ANOMALY_MODEL_PATH) -> 'AnomalyDetector':
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+
+def _model_manifest_path(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + '.json'
+
+
+def fit_anomaly_model(source_path: str = WELLS_FILE, model_path: str = ANOMALY_MODEL_PATH) -> AnomalyDetector:
+    """Fit the forest on ``source_path`` with its silver features and persist it with a manifest"""
+    detector = AnomalyDetector().fit(pd.read_csv(source_path), load_feature_table(source_path))
+    detector.save(model_path)
+    with open(_model_manifest_path(model_path), 'w') as f:
+        json.dump({'source': file_signature(source_path), 'feature_version': FEATURE_VERSION}, f, indent=2)
+    return detector
+
+
+def is_model_current(model_path: str = ANOMALY_MODEL_PATH) -> bool:
+    """Whether a persisted forest exists for the current feature definitions"""
+    manifest = _model_manifest_path(model_path)
+    if not os.path.exists(model_path) or not os.path.exists(manifest):
+        return False
+    with open(manifest) as f:
+        return json.load(f).get('feature_version') == FEATURE_VERSION
+
+
+def load_or_score_anomalies(source_path: str = WELLS_FILE, model_path: str = ANOMALY_MODEL_PATH,
+                            chunksize: int = 50_000) -> pd.DataFrame:
+    """Anomaly scores for the current dataset against the persisted forest
+
+    The forest is only fitted by ``fit_anomaly_model`` (the ``anomaly``
+    pipeline stage or ``python -m src.anomaly``), or here when there is no
+    model for the current ``FEATURE_VERSION``; new wells are scored against
+    it, so the anomaly rate is not pinned to the contamination. Scores are
+    cached per well with a hash of its row: the source is streamed in
+    chunks and only new or changed wells are scored. Changing the model
+    invalidates the cache.
+    """
+    if is_model_current(model_path):
+        detector = AnomalyDetector.load(model_path)
+    else:
+        detector = fit_anomaly_model(source_path, model_path)
+
+    manifest_path = ANOMALY_SCORES_PATH.replace('.parquet', '.json')
+    model_signature = {'model': file_signature(model_path)}
+    cached = pd.DataFrame(columns=['well_id', 'row_hash', 'anomaly_score', 'is_anomaly'])
+    if os.path.exists(ANOMALY_SCORES_PATH) and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f) == model_signature:
+                cached = pd.read_parquet(ANOMALY_SCORES_PATH)
+    cached = cached.set_index(['well_id', 'row_hash'])
+
+    features = None
+    parts, n_scored = [], 0
+    for batch in pd.read_csv(source_path, chunksize=chunksize):
+        keys = pd.MultiIndex.from_arrays(
+            [batch['well_id'].to_numpy(), pd.util.hash_pandas_object(batch, index=False).to_numpy()],
+            names=['well_id', 'row_hash'])
+        known = keys.isin(cached.index)
+        part = pd.DataFrame(index=keys, columns=['anomaly_score', 'is_anomaly'])
+        part.loc[keys[known]] = cached.loc[keys[known], ['anomaly_score', 'is_anomaly']].to_numpy()
+        if not known.all():
+            features = load_feature_table(source_path) if features is None else features
+            scored = detector.score(batch[~known], features)
+            part.loc[keys[~known]] = scored[['anomaly_score', 'is_anomaly']].to_numpy()
+            n_scored += int((~known).sum())
+        parts.append(part)
+
+    scores = pd.concat(parts).astype({'anomaly_score': np.float64, 'is_anomaly': bool}).reset_index()
+    if n_scored:
+        print(f"🔎 Scored {n_scored} new or changed wells ({len(scores) - n_scored} reused)")
+        scores.to_parquet(ANOMALY_SCORES_PATH, index=False)
+        with open(manifest_path, 'w') as f:
+            json.dump(model_signature, f, indent=2)
+    return scores[['well_id', 'anomaly_score', 'is_anomaly']]
+
+
+def anomaly_summary(scores: pd.DataFrame) -> Dict[str, float]:
+    """Anomaly count and rate"""
+    n_anomalies = int(scores['is_anomaly'].sum())
+    return {
+        'n_wells': len(scores),
+        'n_anomalies': n_anomalies,
+        'anomaly_rate_pct': n_anomalies / max(len(scores), 1) * 100
+    }
+
+
+def plot_anomaly_scores(scores: pd.DataFrame) -> go.Figure:
+    """Histogram of anomaly scores, split by flag (binned server-side on shared edges)"""
+    value_range = (scores['anomaly_score'].min(), scores['anomaly_score'].max())
+    fig = go.Figure()
+    for flag, name, color in [(False, 'Normal', '#00CC96'), (True, 'Anomaly', '#EF553B')]:
+        table = histogram_table(scores.loc[scores['is_anomaly'] == flag, 'anomaly_score'],
+                                bins=40, value_range=value_range)
+        fig.add_trace(histogram_trace(table, name=name, marker_color=color, opacity=0.75))
+    fig.update_layout(
+        title="Isolation Forest Anomaly Scores",
+        xaxis_title="Anomaly score (higher = more anomalous)",
+        yaxis_title="Wells",
+        barmode='overlay',
+        height=450
+    )
+    return fig
+
+
+def main():
+    """Refit the forest on the current dataset and print the anomaly summary"""
+    fit_anomaly_model()
+    print(anomaly_summary(load_or_score_anomalies()))
+
+
+if __name__ == "__main__":
+    # Fit from the src.anomaly module so the forest does not pickle as __main__.AnomalyDetector
+    import src.anomaly
+    src.anomaly.main()
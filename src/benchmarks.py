@@ -0,0 +1,371 @@
+"""
+Performance Benchmarks
+Latency and throughput measurements for the serving and ML paths
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src.compiled_model import COMPILED_DIR, CompiledModel
+from src.feature_store import load_feature_table
+from src.ml_pipeline import HORIZON_TARGETS, MODEL_PATH, MultiTargetMLPipeline, ProductionMLPipeline
+from src.random_fields import DEFAULT_VARIOGRAM_RANGE_KM, bilinear_sample, gaussian_random_field
+from src.utils import WELLS_FILE, load_dataframe
+
+
+def latency_summary(latencies_ms: List[float]) -> Dict[str, float]:
+    """Summarize a list of latencies in milliseconds"""
+    arr = np.asarray(latencies_ms)
+    return {
+        'n': int(arr.size),
+        'mean_ms': float(arr.mean()),
+        'p50_ms': float(np.percentile(arr, 50)),
+        'p95_ms': float(np.percentile(arr, 95)),
+        'p99_ms': float(np.percentile(arr, 99)),
+        'max_ms': float(arr.max())
+    }
+
+
+def benchmark_scoring_service(url: str, wells: List[Dict], n_requests: int = 2000,
+                              concurrency: int = 16) -> Dict[str, float]:
+    """Fire single-well requests at a running scoring service"""
+    bodies = [json.dumps(w).encode() for w in wells]
+
+    def call(i: int) -> float:
+        req = urllib.request.Request(
+            f"{url}/predict", data=bodies[i % len(bodies)],
+            headers={'Content-Type': 'application/json'}
+        )
+        start = time.perf_counter()
+        with urllib.request.urlopen(req) as resp:
+            resp.read()
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(call, range(n_requests)))
+    elapsed = time.perf_counter() - start
+
+    summary = latency_summary(latencies)
+    summary['throughput_rps'] = n_requests / elapsed
+    return summary
+
+
+def _best_of(fn: Callable, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def benchmark_multi_target(df: pd.DataFrame, features: pd.DataFrame = None,
+                           targets: List[str] = None, repeats: int = 20) -> pd.DataFrame:
+    """Compare one MultiRMSE model against independent per-horizon models
+
+    Reports training time, batch and single-well inference latency (best of
+    ``repeats``) and mean test R² across horizons for both approaches.
+    """
+    targets = targets or HORIZON_TARGETS
+    single_row = df.iloc[[0]]
+
+    start = time.perf_counter()
+    independent = {}
+    r2 = []
+    for target in targets:
+        pipeline = ProductionMLPipeline(target_column=target)
+        r2.append(pipeline.train_model(df, features=features)['test_r2'])
+        independent[target] = pipeline
+    independent_train = time.perf_counter() - start
+
+    start = time.perf_counter()
+    multi = MultiTargetMLPipeline(targets)
+    multi_metrics = multi.train_model(df, features=features)
+    multi_train = time.perf_counter() - start
+
+    def predict_independent(frame):
+        return np.column_stack([p.predict_cum_oil(frame, features) for p in independent.values()])
+
+    return pd.DataFrame([
+        {
+            'approach': f'{len(targets)} independent models',
+            'train_seconds': independent_train,
+            'batch_predict_ms': _best_of(lambda: predict_independent(df), repeats) * 1000,
+            'single_well_ms': _best_of(lambda: predict_independent(single_row), repeats) * 1000,
+            'mean_test_r2': float(np.mean(r2))
+        },
+        {
+            'approach': 'multi-target MultiRMSE',
+            'train_seconds': multi_train,
+            'batch_predict_ms': _best_of(lambda: multi.predict_cum_oil(df, features), repeats) * 1000,
+            'single_well_ms': _best_of(lambda: multi.predict_cum_oil(single_row, features), repeats) * 1000,
+            'mean_test_r2': float(multi_metrics['by_target']['test_r2'].mean())
+        }
+    ])
+
+
+def benchmark_random_fields(sizes: List[int] = None, range_km: float = DEFAULT_VARIOGRAM_RANGE_KM,
+                            n_wells: int = 100_000, repeats: int = 5) -> pd.DataFrame:
+    """Gaussian random field synthesis and bilinear sampling time per grid size (best of ``repeats``)"""
+    rng = np.random.default_rng(0)
+    rows = []
+    for size in sizes or [512, 1024, 2048]:
+        cell_km = (250.0 / size, 250.0 / size)
+        field = gaussian_random_field((size, size), cell_km, range_km, rng=rng)
+        points = rng.uniform(0, size - 1, (2, n_wells))
+        field_s = _best_of(lambda: gaussian_random_field((size, size), cell_km, range_km, rng=rng), repeats)
+        rows.append({
+            'grid': f'{size}×{size}',
+            'field_seconds': field_s,
+            'mcells_per_s': size * size / field_s / 1e6,
+            f'sample_{n_wells}_wells_ms': _best_of(lambda: bilinear_sample(field, *points), repeats) * 1000,
+        })
+    return pd.DataFrame(rows)
+
+
+_COLD_START_SCRIPTS = {
+    'predict_cum_oil': (
+        "import pandas as pd\n"
+        "from src.ml_pipeline import ProductionMLPipeline\n"
+        "p = ProductionMLPipeline.load({model!r})\n"
+        "p.predict_cum_oil(pd.read_csv({data!r}, nrows=1))\n"
+    ),
+    'compiled (numpy)': (
+        "import numpy as np\n"
+        "from src.compiled_model import CompiledModel\n"
+        "m = CompiledModel.load({compiled!r})\n"
+        "m.predict(np.zeros((1, len(m.input_columns))))\n"
+    ),
+}
+
+
+def benchmark_compiled(df: pd.DataFrame, model_path: str = MODEL_PATH,
+                       compiled_dir: str = COMPILED_DIR, data_path: str = WELLS_FILE,
+                       repeats: int = 50) -> pd.DataFrame:
+    """Compare the exported NumPy runtime with ``predict_cum_oil``
+
+    Cold start is measured in a fresh interpreter (imports, model load and
+    first prediction); per-call latencies are best of ``repeats``.
+    """
+    pipeline = ProductionMLPipeline.load(model_path)
+    compiled = CompiledModel.load(compiled_dir)
+    raw = df[compiled.input_columns].to_numpy(dtype=np.float64)
+    single_df, single_raw = df.iloc[[0]], raw[:1]
+
+    cold = {}
+    for name, script in _COLD_START_SCRIPTS.items():
+        code = script.format(model=model_path, compiled=compiled_dir, data=data_path)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True)
+        cold[name] = time.perf_counter() - start
+
+    return pd.DataFrame([
+        {
+            'path': 'predict_cum_oil',
+            'cold_start_s': cold['predict_cum_oil'],
+            'single_well_ms': _best_of(lambda: pipeline.predict_cum_oil(single_df), repeats) * 1000,
+            'batch_ms': _best_of(lambda: pipeline.predict_cum_oil(df), repeats) * 1000
+        },
+        {
+            'path': 'compiled (numpy)',
+            'cold_start_s': cold['compiled (numpy)'],
+            'single_well_ms': _best_of(lambda: compiled.predict(single_raw), repeats) * 1000,
+            'batch_ms': _best_of(lambda: compiled.predict(raw), repeats) * 1000
+        }
+    ])
+
+
+# First script run of the Streamlit app in a fresh interpreter: the landing page,
+# then each requested page, each in its own new session (cold module imports
+# are paid by whichever page needs them first)
+_APP_FIRST_RUN_SCRIPT = """
+import json, time
+from streamlit.testing.v1 import AppTest
+
+def session():
+    return AppTest.from_file({app!r}, default_timeout=600)
+
+def check(at, page):
+    errors.extend(f"{{page}}: {{e.message.strip().splitlines()[0]}}" for e in at.exception)
+
+timings, errors = {{}}, []
+start = time.perf_counter()
+at = session()
+at.run()
+timings['(landing)'] = time.perf_counter() - start
+check(at, '(landing)')
+pages = {pages!r} or list(at.sidebar.radio[0].options)
+for page in pages:
+    at = session()
+    at.run()
+    start = time.perf_counter()
+    at.sidebar.radio[0].set_value(page).run()
+    first = time.perf_counter() - start
+    check(at, page)
+    start = time.perf_counter()
+    at.run()
+    timings[page] = (first, time.perf_counter() - start)
+    check(at, page + ' (rerun)')
+print(json.dumps({{'timings': timings, 'errors': errors}}))
+"""
+
+
+def benchmark_app_startup(app_path: str = 'app.py', pages: List[str] = None,
+                          warmup: bool = False) -> pd.DataFrame:
+    """First-request latency of the Streamlit app from a cold interpreter
+
+    Runs the script through Streamlit's ``AppTest`` in a fresh process so
+    module imports are cold, as in a newly started server or container.
+    Reports the landing page's first run, then for each page the first
+    visit and a warm rerun. ``warmup`` sets ``VMO_WARMUP=1`` so the app's
+    warm-up hook runs on the first request. Raises ``RuntimeError`` if
+    any run raised in the app, since a page that errors out is not timed
+    doing its real work.
+    """
+    env = {**os.environ, 'VMO_WARMUP': '1' if warmup else '0'}
+    code = _APP_FIRST_RUN_SCRIPT.format(app=app_path, pages=pages or [])
+    completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup benchmark process failed:\n{completed.stderr[-2000:]}")
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    if report['errors']:
+        raise RuntimeError("App raised during the startup benchmark:\n" + '\n'.join(report['errors']))
+    timings = report['timings']
+    landing = timings.pop('(landing)')
+    rows = [{'page': '(landing, first request)', 'first_visit_s': landing, 'rerun_s': np.nan}]
+    rows += [{'page': page, 'first_visit_s': first, 'rerun_s': rerun} for page, (first, rerun) in timings.items()]
+    return pd.DataFrame(rows)
+
+
+def wait_for_health(url: str, timeout: float = 300) -> float:
+    """Seconds until ``url`` answers 200 (Streamlit's ``/_stcore/health``)"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as resp:
+                if resp.status == 200:
+                    return time.perf_counter() - start
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"{url} not healthy after {timeout:.0f}s")
+
+
+def benchmark_server_startup(app_path: str = 'app.py', port: int = 8599, timeout: float = 120) -> float:
+    """Seconds from launching ``streamlit run`` until the server reports healthy"""
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', app_path, '--server.headless=true',
+         f'--server.port={port}'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        return wait_for_health(f'http://localhost:{port}/_stcore/health', timeout)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def benchmark_compose_startup(build: bool = False, warmup: bool = False, timeout: float = 600,
+                              down: bool = True) -> Dict:
+    """Cold start through the ``docker-compose.yml`` deployment path
+
+    Times ``docker compose up`` until the container's health endpoint
+    answers, then measures first-request latency inside the fresh
+    container with ``benchmark_app_startup``.
+    """
+    env = {**os.environ, 'VMO_WARMUP': '1' if warmup else '0'}
+    up = ['docker', 'compose', 'up', '-d', '--force-recreate'] + (['--build'] if build else [])
+    start = time.perf_counter()
+    subprocess.run(up, check=True, env=env)
+    up_seconds = time.perf_counter() - start
+    try:
+        healthy = wait_for_health('http://localhost:8501/_stcore/health', timeout)
+        output = subprocess.run(
+            ['docker', 'compose', 'exec', '-T', 'streamlit', 'python', '-m', 'src.benchmarks',
+             'startup', '--json'] + (['--warmup'] if warmup else []),
+            check=True, capture_output=True, text=True
+        ).stdout
+        return {'compose_up_s': up_seconds, 'healthy_after_s': healthy,
+                'first_requests': json.loads(output.strip().splitlines()[-1])}
+    finally:
+        if down:
+            subprocess.run(['docker', 'compose', 'down'], check=True)
+
+
+def _well_records(df: pd.DataFrame, n: int = 200) -> List[Dict]:
+    sample = df.sample(min(n, len(df)), random_state=42)
+    return sample.select_dtypes(include=[np.number]).to_dict(orient='records')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run performance benchmarks")
+    sub = parser.add_subparsers(dest='benchmark', required=True)
+
+    p_serving = sub.add_parser('serving', help='load-test a running scoring service')
+    p_serving.add_argument('--url', default='http://localhost:8080')
+    p_serving.add_argument('--data', default=WELLS_FILE)
+    p_serving.add_argument('--requests', type=int, default=2000)
+    p_serving.add_argument('--concurrency', type=int, default=16)
+
+    p_multi = sub.add_parser('multi-target', help='MultiRMSE model vs one model per horizon')
+    p_multi.add_argument('--data', default=WELLS_FILE)
+    p_multi.add_argument('--repeats', type=int, default=20)
+
+    p_compiled = sub.add_parser('compiled', help='exported NumPy runtime vs predict_cum_oil')
+    p_compiled.add_argument('--data', default=WELLS_FILE)
+    p_compiled.add_argument('--repeats', type=int, default=50)
+
+    p_fields = sub.add_parser('random-fields', help='Gaussian random field synthesis and sampling')
+    p_fields.add_argument('--sizes', type=int, nargs='*', default=[512, 1024, 2048])
+    p_fields.add_argument('--range-km', type=float, default=DEFAULT_VARIOGRAM_RANGE_KM)
+    p_fields.add_argument('--repeats', type=int, default=5)
+
+    p_startup = sub.add_parser('startup', help='cold first-request latency of the Streamlit app')
+    p_startup.add_argument('--pages', nargs='*', default=None, help='page labels (default: all)')
+    p_startup.add_argument('--warmup', action='store_true', help='enable the VMO_WARMUP hook')
+    p_startup.add_argument('--server', action='store_true', help='also time `streamlit run` until healthy')
+    p_startup.add_argument('--compose', action='store_true', help='measure through docker compose instead')
+    p_startup.add_argument('--build', action='store_true', help='rebuild the image first (with --compose)')
+    p_startup.add_argument('--json', action='store_true')
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'serving':
+        wells = _well_records(load_dataframe(args.data))
+        result = benchmark_scoring_service(args.url, wells, args.requests, args.concurrency)
+        print(json.dumps(result, indent=2))
+
+    elif args.benchmark == 'multi-target':
+        df = load_dataframe(args.data)
+        result = benchmark_multi_target(df, load_feature_table(args.data), repeats=args.repeats)
+        print(result.to_string(index=False))
+
+    elif args.benchmark == 'compiled':
+        result = benchmark_compiled(load_dataframe(args.data), data_path=args.data, repeats=args.repeats)
+        print(result.to_string(index=False))
+
+    elif args.benchmark == 'random-fields':
+        result = benchmark_random_fields(args.sizes, args.range_km, repeats=args.repeats)
+        print(result.to_string(index=False))
+
+    elif args.benchmark == 'startup' and args.compose:
+        print(json.dumps(benchmark_compose_startup(args.build, args.warmup), indent=2))
+
+    elif args.benchmark == 'startup':
+        result = benchmark_app_startup(pages=args.pages, warmup=args.warmup)
+        if args.json:
+            print(result.to_json(orient='records'))
+        else:
+            if args.server:
+                print(f"⏱️ streamlit run → healthy in {benchmark_server_startup():.2f}s")
+            print(result.to_string(index=False))
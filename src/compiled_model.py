@@ -0,0 +1,94 @@
+"""
+Compiled Model Runtime
+NumPy-only scoring of exported oblivious-tree ensembles (see src.export)
+"""
+
+import json
+import os
+from typing import List
+
+import numpy as np
+
+COMPILED_DIR = 'models/compiled'
+
+
+class CompiledModel:
+    """Vectorized evaluator for an exported CatBoost oblivious-tree ensemble
+
+    All trees are padded to the same depth and evaluated at once: each row
+    compares its features against a (trees × depth) border table, the
+    comparison bits form leaf indices, and leaf values are summed. Inputs
+    are raw well columns ordered as ``input_columns``; derived features are
+    evaluated from the exported expressions and the scaler is already
+    folded into the borders, so only NumPy is needed at runtime.
+    """
+
+    def __init__(self, split_features: np.ndarray, split_borders: np.ndarray,
+                 leaf_values: np.ndarray, scale: float, bias: float,
+                 feature_columns: List[str], input_columns: List[str], expressions: dict,
+                 max_chunk_elements: int = 8_000_000):
+        self.split_features = split_features
+        self.split_borders = split_borders
+        self.leaf_values = leaf_values
+        self.scale = scale
+        self.bias = bias
+        self.feature_columns = feature_columns
+        self.input_columns = input_columns
+        self.max_chunk_elements = max_chunk_elements
+
+        n_trees, depth = split_features.shape
+        self._leaf_offsets = (np.arange(n_trees) << depth)[None, :]
+        self._bit_weights = (1 << np.arange(depth)).astype(np.int64)
+        self._flat_leaves = leaf_values.ravel()
+
+        index = {col: i for i, col in enumerate(input_columns)}
+        self._plan = []
+        for col in feature_columns:
+            if col in expressions:
+                code = compile(expressions[col], col, 'eval')
+                self._plan.append((code, [(name, index[name]) for name in code.co_names]))
+            else:
+                self._plan.append((None, index[col]))
+
+    @classmethod
+    def load(cls, directory: str = COMPILED_DIR) -> 'CompiledModel':
+        """Load an ensemble written by ``src.export.export_compiled``"""
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        arrays = np.load(os.path.join(directory, 'trees.npz'))
+        return cls(
+            arrays['split_features'], arrays['split_borders'], arrays['leaf_values'],
+            meta['scale'], meta['bias'], meta['feature_columns'],
+            meta['input_columns'], meta['expressions']
+        )
+
+    def features(self, raw: np.ndarray) -> np.ndarray:
+        """Build the (unscaled) model matrix from raw input columns"""
+        raw = np.asarray(raw, dtype=np.float64)
+        if raw.ndim == 1:
+            raw = raw.reshape(1, -1)
+        X = np.empty((raw.shape[0], len(self._plan)), dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for j, (code, source) in enumerate(self._plan):
+                if code is None:
+                    X[:, j] = raw[:, source]
+                else:
+                    X[:, j] = eval(code, {'__builtins__': {}}, {n: raw[:, i] for n, i in source})
+        X[~np.isfinite(X)] = 0.0
+        return X
+
+    def predict_features(self, X: np.ndarray) -> np.ndarray:
+        """Score a model matrix whose columns follow ``feature_columns``"""
+        n_trees, depth = self.split_features.shape
+        rows_per_chunk = max(1, self.max_chunk_elements // (n_trees * depth))
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], rows_per_chunk):
+            block = X[start:start + rows_per_chunk]
+            bits = block[:, self.split_features] > self.split_borders
+            leaf_index = bits @ self._bit_weights + self._leaf_offsets
+            out[start:start + rows_per_chunk] = self._flat_leaves[leaf_index].sum(axis=1)
+        return out * self.scale + self.bias
+
+    def predict(self, raw: np.ndarray) -> np.ndarray:
+        """Score raw input rows ordered as ``input_columns``"""
+        return self.predict_features(self.features(raw))
@@ -0,0 +1,114 @@
+"""
+Per-Well Model Explanations
+Batched CatBoost TreeSHAP values, cached on disk per model version
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from src.features import model_inputs
+from src.ml_pipeline import ProductionMLPipeline
+from src.utils import WELLS_FILE, file_signature, load_dataframe
+
+SHAP_DIR = 'models/shap'
+
+
+def model_fingerprint(pipeline: ProductionMLPipeline) -> str:
+    """Content hash identifying a trained model and its preprocessing"""
+    digest = hashlib.sha256()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.cbm')
+        pipeline.model.save_model(path)
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    digest.update(json.dumps(pipeline.feature_columns).encode())
+    digest.update(pipeline.scaler.mean_.tobytes() + pipeline.scaler.scale_.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def compute_shap_values(pipeline: ProductionMLPipeline, df: pd.DataFrame,
+                        features: pd.DataFrame = None, batch_size: int = 20000) -> pd.DataFrame:
+    """SHAP contribution of every feature for every well, computed in batches
+
+    Uses CatBoost's native TreeSHAP over all cores. The returned frame has
+    ``well_id``, one column per model feature and ``expected_value``.
+    """
+    from catboost import Pool
+    
+    df_features = pipeline.prepare_features(df, features)
+    X = pipeline.scaler.transform(model_inputs(df_features, pipeline.feature_columns))
+
+    blocks = []
+    for start in range(0, len(X), batch_size):
+        blocks.append(pipeline.model.get_feature_importance(
+            Pool(X[start:start + batch_size]), type='ShapValues', thread_count=-1
+        ))
+    shap = np.vstack(blocks) if blocks else np.empty((0, len(pipeline.feature_columns) + 1))
+
+    result = pd.DataFrame(shap, columns=pipeline.feature_columns + ['expected_value'])
+    result.insert(0, 'well_id', df['well_id'].to_numpy())
+    return result
+
+
+def load_or_compute_shap(pipeline: ProductionMLPipeline, df: pd.DataFrame = None,
+                         source_path: str = WELLS_FILE, features: pd.DataFrame = None) -> pd.DataFrame:
+    """Read cached SHAP values for this model, computing them once if missing or stale"""
+    os.makedirs(SHAP_DIR, exist_ok=True)
+    path = os.path.join(SHAP_DIR, f'shap_{model_fingerprint(pipeline)}.parquet')
+    manifest_path = path.replace('.parquet', '.json')
+    signature = file_signature(source_path)
+
+    if os.path.exists(path) and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f).get('source') == signature:
+                return pd.read_parquet(path)
+
+    df = load_dataframe(source_path) if df is None else df
+    shap = compute_shap_values(pipeline, df, features)
+    shap.to_parquet(path, index=False)
+    with open(manifest_path, 'w') as f:
+        json.dump({'source': signature, 'n_wells': len(shap)}, f, indent=2)
+    print(f"✅ Cached SHAP values for {len(shap)} wells to {path}")
+    return shap
+
+
+def well_drivers(shap: pd.DataFrame, well_id: str, top_n: int = 10) -> pd.DataFrame:
+    """Largest absolute feature contributions for one well"""
+    row = shap.loc[shap['well_id'] == well_id].iloc[0]
+    contributions = row.drop(['well_id', 'expected_value']).astype(float)
+    order = contributions.abs().sort_values(ascending=False).index[:top_n]
+    return pd.DataFrame({'feature': order, 'shap_value': contributions[order].to_numpy()})
+
+
+def plot_well_drivers(drivers: pd.DataFrame, well_id: str) -> go.Figure:
+    """Horizontal bar chart of a well's top SHAP contributions"""
+    drivers = drivers.iloc[::-1]
+    fig = go.Figure(data=[go.Bar(
+        x=drivers['shap_value'],
+        y=drivers['feature'],
+        orientation='h',
+        marker_color=np.where(drivers['shap_value'] >= 0, '#00CC96', '#EF553B')
+    )])
+
+    fig.update_layout(
+        title=f"Prediction Drivers for {well_id}",
+        xaxis_title="Contribution to prediction (m³)",
+        yaxis_title="Feature",
+        height=500
+    )
+
+    return fig
+
+
+if __name__ == "__main__":
+    from src.feature_store import load_feature_table
+    from src.ml_pipeline import MODEL_PATH
+
+    pipeline = ProductionMLPipeline.load(MODEL_PATH)
+    load_or_compute_shap(pipeline, features=load_feature_table(WELLS_FILE))
@@ -0,0 +1,139 @@
+"""
+Compiled Model Export
+Folds the StandardScaler into CatBoost split borders and writes portable model artifacts
+"""
+
+import json
+import os
+import tempfile
+
+import numpy as np
+from catboost import CatBoostRegressor
+
+from src.compiled_model import COMPILED_DIR
+from src.features import FEATURE_DEFINITIONS, FEATURE_VERSION
+from src.ml_pipeline import MODEL_PATH, ProductionMLPipeline
+
+
+def unscaled_borders(borders, mean: float, scale: float) -> np.ndarray:
+    """Largest float64 ``x`` per border whose standardized float32 value is still ``<= border``
+
+    CatBoost compares float32 features against float32 borders, so a plain
+    ``mean + border * scale`` flips rows lying within float32 rounding of a
+    border (up to ~10 m³ on training wells, which sit on borders). Bisecting
+    the float64 threshold of ``float32((x - mean) / scale) > border`` makes
+    ``x > result`` reproduce every split exactly on float64 inputs.
+    """
+    borders = np.asarray(borders, dtype=np.float32)
+    
+    def above(x):
+        return ((x - mean) / scale).astype(np.float32) > borders
+    
+    approx = mean + borders.astype(np.float64) * scale
+    step = np.abs(approx) * 1e-6 + scale * 1e-6
+    lo, hi = approx - step, approx + step
+    while above(lo).any():
+        lo = np.where(above(lo), lo - step, lo)
+        step *= 2
+    while not above(hi).all():
+        hi = np.where(above(hi), hi, hi + step)
+        step *= 2
+    while True:
+        mid = lo + (hi - lo) / 2
+        active = (mid > lo) & (mid < hi)
+        if not active.any():
+            return lo
+        up = above(mid)
+        hi = np.where(active & up, mid, hi)
+        lo = np.where(active & ~up, mid, lo)
+
+
+def fold_scaler(pipeline: ProductionMLPipeline) -> dict:
+    """CatBoost JSON model whose borders operate on unscaled features
+
+    A split ``(x - mean) / scale > b`` becomes ``x > t`` with ``t`` from
+    ``unscaled_borders`` (about ``mean + b * scale``), so the standardization
+    is removed from the inference path. The NumPy runtime, comparing in
+    float64, then matches the pipeline's predictions exactly; the .cbm and
+    ONNX artifacts cast inputs to float32 and can still differ on rows
+    within float32 rounding of a border.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.json')
+        pipeline.model.save_model(path, format='json')
+        with open(path) as f:
+            model_json = json.load(f)
+
+    mean, scale = pipeline.scaler.mean_, pipeline.scaler.scale_
+    folded = {}
+    for feature in model_json['features_info']['float_features']:
+        i = feature['flat_feature_index']
+        borders = feature.get('borders') or []
+        folded[i] = dict(zip(borders, unscaled_borders(borders, mean[i], scale[i]).tolist()))
+        feature['borders'] = list(folded[i].values())
+    for tree in model_json['oblivious_trees']:
+        for split in tree['splits']:
+            i = split['float_feature_index']
+            split['border'] = folded[i][split['border']]
+    return model_json
+
+
+def _tree_arrays(model_json: dict):
+    """Pad oblivious trees to a common depth and stack them into arrays"""
+    trees = model_json['oblivious_trees']
+    depth = max(len(t['splits']) for t in trees)
+    n_trees = len(trees)
+
+    split_features = np.zeros((n_trees, depth), dtype=np.int64)
+    split_borders = np.full((n_trees, depth), np.inf, dtype=np.float64)
+    leaf_values = np.zeros((n_trees, 1 << depth), dtype=np.float64)
+    for t, tree in enumerate(trees):
+        for d, split in enumerate(tree['splits']):
+            split_features[t, d] = split['float_feature_index']
+            split_borders[t, d] = split['border']
+        # Padded levels compare against +inf and always yield bit 0
+        leaf_values[t, :len(tree['leaf_values'])] = tree['leaf_values']
+    return split_features, split_borders, leaf_values
+
+
+def export_compiled(pipeline: ProductionMLPipeline, directory: str = COMPILED_DIR,
+                    onnx: bool = True) -> str:
+    """Write scaler-free CatBoost (.cbm), optional ONNX and NumPy tree artifacts"""
+    os.makedirs(directory, exist_ok=True)
+    model_json = fold_scaler(pipeline)
+
+    json_path = os.path.join(directory, 'model.json')
+    with open(json_path, 'w') as f:
+        json.dump(model_json, f)
+    folded = CatBoostRegressor()
+    folded.load_model(json_path, format='json')
+    folded.save_model(os.path.join(directory, 'model.cbm'))
+    if onnx:
+        folded.save_model(os.path.join(directory, 'model.onnx'), format='onnx')
+    os.remove(json_path)
+
+    split_features, split_borders, leaf_values = _tree_arrays(model_json)
+    np.savez(os.path.join(directory, 'trees.npz'), split_features=split_features,
+             split_borders=split_borders, leaf_values=leaf_values)
+
+    transform = pipeline.compile_transform()
+    scale, bias = model_json['scale_and_bias']
+    with open(os.path.join(directory, 'meta.json'), 'w') as f:
+        json.dump({
+            'target': pipeline.target_column,
+            'feature_version': FEATURE_VERSION,
+            'feature_columns': transform.feature_columns,
+            'input_columns': transform.input_columns,
+            'expressions': {c: FEATURE_DEFINITIONS[c] for c in transform.feature_columns
+                            if c in FEATURE_DEFINITIONS},
+            'scale': float(scale),
+            'bias': float(np.ravel(bias)[0])
+        }, f, indent=2)
+
+    print(f"✅ Exported compiled model ({leaf_values.shape[0]} trees, depth "
+          f"{split_features.shape[1]}) to {directory}")
+    return directory
+
+
+if __name__ == "__main__":
+    export_compiled(ProductionMLPipeline.load(MODEL_PATH))
@@ -0,0 +1,72 @@
+"""
+Silver-Layer Feature Store
+Materializes engineered well features keyed by well_id and versioned by definition hash
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from src.features import FEATURE_DEFINITIONS, FEATURE_VERSION, derive_features
+from src.utils import WELLS_FILE, ensure_data_dirs, file_signature, load_dataframe
+
+SILVER_DIR = 'data/silver'
+
+
+def feature_table_path(source_path: str = WELLS_FILE, version: str = FEATURE_VERSION) -> str:
+    """Path of the feature table built from ``source_path`` for a feature-definition version
+
+    Each source gets its own table, so alternating sources do not
+    overwrite (and rebuild) each other's features. Tables built from an
+    in-memory frame (``source_path=None``) share one unkeyed file.
+    """
+    if source_path is None:
+        return os.path.join(SILVER_DIR, f'well_features_{version}.parquet')
+    source_id = hashlib.sha256(os.path.abspath(source_path).encode()).hexdigest()[:8]
+    return os.path.join(SILVER_DIR, f'well_features_{version}_{source_id}.parquet')
+
+
+def _manifest_path(table_path: str) -> str:
+    return table_path.replace('.parquet', '.json')
+
+
+def materialize_features(df: pd.DataFrame, source_path: str = None) -> pd.DataFrame:
+    """Compute derived features for all wells and persist them to the silver layer"""
+    ensure_data_dirs()
+    table = derive_features(df)
+    table.insert(0, 'well_id', df['well_id'].to_numpy())
+
+    path = feature_table_path(source_path)
+    table.to_parquet(path, index=False)
+    with open(_manifest_path(path), 'w') as f:
+        json.dump({
+            'feature_version': FEATURE_VERSION,
+            'definitions': FEATURE_DEFINITIONS,
+            'n_wells': len(table),
+            'source': file_signature(source_path) if source_path else None
+        }, f, indent=2)
+
+    print(f"✅ Materialized {table.shape[1] - 1} features for {len(table)} wells to {path}")
+    return table
+
+
+def is_fresh(source_path: str = WELLS_FILE) -> bool:
+    """Whether the current-version feature table was built from ``source_path`` as it is now"""
+    manifest = _manifest_path(feature_table_path(source_path))
+    if not os.path.exists(manifest) or not os.path.exists(source_path):
+        return False
+    with open(manifest) as f:
+        return json.load(f).get('source') == file_signature(source_path)
+
+
+def load_feature_table(source_path: str = WELLS_FILE) -> pd.DataFrame:
+    """Read materialized features, rebuilding them only when the source or definitions changed"""
+    if is_fresh(source_path):
+        return pd.read_parquet(feature_table_path(source_path))
+    return materialize_features(load_dataframe(source_path), source_path)
+
+
+if __name__ == "__main__":
+    materialize_features(load_dataframe(WELLS_FILE), WELLS_FILE)
@@ -0,0 +1,133 @@
+"""
+Feature Definitions
+Derived well features shared by training, feature storage and array scoring
+"""
+
+import hashlib
+import json
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+# Derived features as arithmetic expressions over raw well columns.
+# Each expression is compiled once and evaluates identically on pandas
+# Series (training, pages) and NumPy arrays (low-latency scoring).
+FEATURE_DEFINITIONS = {
+    'reservoir_quality_index': 'porosity * net_pay_m',
+    'completion_quality_index': 'proppant_intensity_ton_per_m * fluid_intensity_m3_per_m',
+    'hc_pore_volume': 'porosity * oil_saturation * net_pay_m',
+    'stage_spacing_m': 'lateral_length_m / n_stages',
+    'total_clusters': 'n_stages * n_clusters_per_stage',
+    'brittleness_index': 'youngs_modulus_gpa / (1 + poisson_ratio)',
+}
+
+_COMPILED_FEATURES = {
+    name: compile(expr, name, 'eval') for name, expr in FEATURE_DEFINITIONS.items()
+}
+
+# Short hash of the feature definitions, used to version materialized features
+FEATURE_VERSION = hashlib.sha256(
+    json.dumps(FEATURE_DEFINITIONS, sort_keys=True).encode()
+).hexdigest()[:12]
+
+
+def _evaluate_feature(code, columns):
+    """Evaluate a compiled feature expression against a column mapping"""
+    return eval(code, {'__builtins__': {}}, {col: columns[col] for col in code.co_names})
+
+
+def derive_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Compute derived features from only the columns each one reads"""
+    derived = {
+        name: _evaluate_feature(code, df)
+        for name, code in _COMPILED_FEATURES.items()
+        if all(col in df.columns for col in code.co_names)
+    }
+    return pd.DataFrame(derived, index=df.index)
+
+
+def with_features(df: pd.DataFrame, derived: pd.DataFrame) -> pd.DataFrame:
+    """``df`` with the ``derived`` columns appended, replacing any it already has
+
+    Only overlapping columns are dropped first, so the common case (no
+    overlap) joins without copying the source frame.
+    """
+    overlap = df.columns.intersection(derived.columns)
+    if len(overlap):
+        df = df.drop(columns=overlap)
+    return pd.concat([df, derived], axis=1, copy=False)
+
+
+def model_inputs(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """Model feature columns with missing and non-finite values set to 0
+
+    Same imputation as ``CompiledFeatureTransform``, so the pandas and
+    array scoring paths agree on inf inputs (e.g. a zero ``n_stages``).
+    """
+    X = df[columns]
+    return X.where(np.isfinite(X), 0.0)
+
+
+def align_features(df: pd.DataFrame, features: pd.DataFrame) -> pd.DataFrame:
+    """Look up materialized features for the wells in ``df``
+
+    Wells absent from the feature table are derived on the fly.
+    """
+    columns = [col for col in FEATURE_DEFINITIONS if col in features.columns]
+    aligned = features.set_index('well_id')[columns].reindex(df['well_id'].to_numpy())
+    aligned.index = df.index
+    
+    missing = aligned.isna().all(axis=1).to_numpy()
+    if missing.any():
+        aligned.loc[missing] = derive_features(df.loc[missing])[columns].to_numpy()
+    return aligned
+
+
+class CompiledFeatureTransform:
+    """Array-only feature derivation and scaling for a trained pipeline
+
+    Maps a raw float matrix (columns ordered as ``input_columns``) to the
+    scaled model matrix without building any pandas objects.
+    """
+    
+    def __init__(self, feature_columns: List[str], mean: np.ndarray, scale: np.ndarray):
+        derived = [col for col in feature_columns if col in _COMPILED_FEATURES]
+        raw = [col for col in feature_columns if col not in _COMPILED_FEATURES]
+        for col in derived:
+            raw += [c for c in _COMPILED_FEATURES[col].co_names if c not in raw]
+        
+        self.feature_columns = list(feature_columns)
+        self.input_columns = raw
+        self._index = {col: i for i, col in enumerate(raw)}
+        self._plan = [
+            (j, _COMPILED_FEATURES.get(col), self._index.get(col))
+            for j, col in enumerate(self.feature_columns)
+        ]
+        self._mean = np.asarray(mean, dtype=np.float64)
+        self._scale = np.asarray(scale, dtype=np.float64)
+    
+    def __call__(self, raw: np.ndarray) -> np.ndarray:
+        """Derive, impute and scale features from a raw input matrix"""
+        raw = np.asarray(raw, dtype=np.float64)
+        if raw.ndim == 1:
+            raw = raw.reshape(1, -1)
+        columns = {col: raw[:, i] for col, i in self._index.items()}
+        
+        X = np.empty((raw.shape[0], len(self._plan)), dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for j, code, i in self._plan:
+                X[:, j] = raw[:, i] if code is None else _evaluate_feature(code, columns)
+        
+        X[~np.isfinite(X)] = 0.0
+        X -= self._mean
+        X /= self._scale
+        return X
+    
+    def rows_to_array(self, rows: List[Dict]) -> np.ndarray:
+        """Convert JSON-like well records to a raw input matrix"""
+        return np.array(
+            [[row.get(col, np.nan) for col in self.input_columns] for row in rows],
+            dtype=np.float64
+        )
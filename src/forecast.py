@@ -0,0 +1,148 @@
+"""
+Portfolio Production Forecast Engine
+Chunked wells × months Arps forecasts aggregated to P10/P50/P90 type curves
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from src.utils import arps_decline
+
+DAYS_PER_MONTH = 365.25 / 12
+
+# Log-spaced histogram used to accumulate rate percentiles across well chunks
+_HIST_LOW, _HIST_HIGH, _HIST_BINS = 1e-4, 1e5, 1024
+
+
+def arps_params_from_master(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-well Arps parameters from the master table's peak rate and decline columns"""
+    return pd.DataFrame({
+        'well_id': df['well_id'].to_numpy(),
+        'qi_m3_day': df['peak_oil_rate_m3_day'].to_numpy(),
+        'di_per_day': df['decline_rate_annual'].to_numpy() / 365.0,
+        'b_factor': df['b_factor'].to_numpy()
+    })
+
+
+def completion_vintage(df: pd.DataFrame, freq: str = 'Y') -> pd.Series:
+    """Completion vintage label (year by default) for grouping type curves"""
+    return pd.to_datetime(df['completion_date']).dt.to_period(freq).astype(str)
+
+
+def forecast_rates(qi: np.ndarray, di: np.ndarray, b: np.ndarray, n_months: int = 120) -> np.ndarray:
+    """Instantaneous rates (m³/day) at mid-month as a float32 (wells × months) array"""
+    t = ((np.arange(n_months, dtype=np.float32) + 0.5) * np.float32(DAYS_PER_MONTH))[None, :]
+    return arps_decline(
+        np.asarray(qi, dtype=np.float32)[:, None],
+        np.asarray(di, dtype=np.float32)[:, None],
+        np.asarray(b, dtype=np.float32)[:, None],
+        t
+    ).astype(np.float32, copy=False)
+
+
+def _edges() -> np.ndarray:
+    return np.concatenate([[0.0], np.geomspace(_HIST_LOW, _HIST_HIGH, _HIST_BINS)])
+
+
+def _histogram_quantile(counts: np.ndarray, q: float) -> np.ndarray:
+    """Quantile per row of a (…, bins) histogram over ``_edges()``, linearly interpolated in-bin"""
+    edges = _edges()
+    cum = np.cumsum(counts, axis=-1)
+    total = cum[..., -1:]
+    target = q * total
+    idx = np.minimum((cum < target).sum(axis=-1), counts.shape[-1] - 1)
+    below = np.take_along_axis(cum, idx[..., None], -1)[..., 0] - \
+        np.take_along_axis(counts, idx[..., None], -1)[..., 0]
+    in_bin = np.take_along_axis(counts, idx[..., None], -1)[..., 0]
+    frac = np.where(in_bin > 0, (target[..., 0] - below) / np.maximum(in_bin, 1), 0.0)
+    return np.where(total[..., 0] > 0, edges[idx] + frac * (edges[idx + 1] - edges[idx]), np.nan)
+
+
+def portfolio_forecast(params: pd.DataFrame, groups: pd.Series = None, n_months: int = 120,
+                       chunk_wells: int = 50_000) -> Dict[str, pd.DataFrame]:
+    """Forecast every well and aggregate to field-level type curves per group
+
+    Wells are processed ``chunk_wells`` at a time, so peak memory is one
+    (chunk × months) float32 block regardless of portfolio size. Means
+    of the mid-month rates are exact and monthly volumes take the mid-month
+    rate over the whole month (midpoint rule); P10/P50/P90 (10th/50th/90th percentiles of the
+    monthly rate, as in ``calculate_percentiles``) come from log-spaced
+    histograms accumulated across chunks.
+    """
+    groups = pd.Series('Field', index=params.index) if groups is None else groups
+    codes, labels = pd.factorize(pd.Series(groups).to_numpy())
+    n_groups = len(labels)
+
+    edges = _edges()
+    hist = np.zeros((n_groups, n_months, _HIST_BINS), dtype=np.int64)
+    sums = np.zeros((n_groups, n_months), dtype=np.float64)
+    counts = np.bincount(codes, minlength=n_groups)
+
+    qi, di, b = (params[c].to_numpy() for c in ('qi_m3_day', 'di_per_day', 'b_factor'))
+    month_index = np.arange(n_months)[None, :]
+    n_cells = n_groups * n_months
+
+    for start in range(0, len(params), chunk_wells):
+        chunk = slice(start, start + chunk_wells)
+        rates = forecast_rates(qi[chunk], di[chunk], b[chunk], n_months)
+        group = codes[chunk][:, None]
+
+        cell = (group * n_months + month_index).ravel()
+        sums += np.bincount(cell, weights=rates.ravel(), minlength=n_cells).reshape(sums.shape)
+        bins = np.clip(np.searchsorted(edges, rates, side='right') - 1, 0, _HIST_BINS - 1)
+        flat = cell * _HIST_BINS + bins.ravel()
+        hist += np.bincount(flat, minlength=hist.size).reshape(hist.shape)
+
+    curves = []
+    for g, label in enumerate(labels):
+        curves.append(pd.DataFrame({
+            'group': label,
+            'month': np.arange(1, n_months + 1),
+            'n_wells': counts[g],
+            'p10_rate_m3_day': _histogram_quantile(hist[g], 0.1),
+            'p50_rate_m3_day': _histogram_quantile(hist[g], 0.5),
+            'p90_rate_m3_day': _histogram_quantile(hist[g], 0.9),
+            'mean_rate_m3_day': sums[g] / counts[g],
+            'total_volume_m3': sums[g] * DAYS_PER_MONTH
+        }))
+    type_curves = pd.concat(curves, ignore_index=True)
+
+    field = type_curves.groupby('month', as_index=False)['total_volume_m3'].sum()
+    field['cumulative_volume_m3'] = field['total_volume_m3'].cumsum()
+    return {'type_curves': type_curves, 'field': field}
+
+
+def plot_type_curves(type_curves: pd.DataFrame) -> go.Figure:
+    """P10/P50/P90 monthly-rate bands per group"""
+    fig = go.Figure()
+    for group, curve in type_curves.groupby('group', sort=False):
+        fig.add_trace(go.Scatter(x=curve['month'], y=curve['p90_rate_m3_day'], mode='lines',
+                                 line=dict(width=0), showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=curve['month'], y=curve['p10_rate_m3_day'], mode='lines',
+                                 line=dict(width=0), fill='tonexty', opacity=0.2,
+                                 name=f"{group} P10–P90"))
+        fig.add_trace(go.Scatter(x=curve['month'], y=curve['p50_rate_m3_day'], mode='lines',
+                                 name=f"{group} P50"))
+    fig.update_layout(
+        title="Type Curves (mid-month oil rate)",
+        xaxis_title="Months on production",
+        yaxis_title="Oil rate (m³/day)",
+        yaxis_type='log',
+        height=550
+    )
+    return fig
+
+
+if __name__ == "__main__":
+    import time
+
+    from src.utils import WELLS_FILE, load_dataframe
+
+    df = load_dataframe(WELLS_FILE)
+    start = time.perf_counter()
+    result = portfolio_forecast(arps_params_from_master(df), df['formation'])
+    print(result['type_curves'].groupby('group').head(3).to_string(index=False))
+    print(f"⏱️ Forecast {len(df)} wells in {time.perf_counter() - start:.2f}s")
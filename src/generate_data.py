@@ -7,41 +7,104 @@ import pandas as pd
 import numpy as np
 from faker import Faker
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Callable, Dict, List, Tuple
 import os
-from src.utils import arps_decline, save_dataframe, ensure_data_dirs
+from src.utils import arps_decline, save_dataframe, ensure_data_dirs, WELLS_FILE
+from src.feature_store import materialize_features
+from src.spatial import materialize_spatial
+from src.production_store import ProductionStore
+from src.gold import build_gold
+from src.instrumentation import span
+from src.random_fields import (DEFAULT_GRID_SIZE, DEFAULT_VARIOGRAM_RANGE_KM, FIELD_PROPERTIES,
+                               sample_property_fields)
 
 fake = Faker()
 Faker.seed(42)
 np.random.seed(42)
 
+# Sampling distributions for generated inputs: (method, *args), drawn in this order.
+# Shared with the Monte Carlo engine so simulated wells match the synthetic dataset.
+RESERVOIR_DISTRIBUTIONS: Dict[str, Tuple] = {
+    'latitude': ('uniform', -39.5, -37.0),
+    'longitude': ('uniform', -70.5, -68.0),
+    'formation': ('choice', ['Vaca Muerta', 'Vaca Muerta Superior']),
+    'porosity': ('uniform', 0.04, 0.12),
+    'permeability_nd': ('lognormal', -3, 1.5),
+    'water_saturation': ('uniform', 0.20, 0.45),
+    'net_pay_m': ('uniform', 50, 250),
+    'toc_percent': ('uniform', 2.0, 8.0),
+    'vitrinite_reflectance': ('uniform', 0.8, 1.4),
+    'youngs_modulus_gpa': ('uniform', 20, 45),
+    'poisson_ratio': ('uniform', 0.15, 0.30),
+    'initial_pressure_mpa': ('uniform', 40, 65),
+    'temperature_c': ('uniform', 90, 140),
+}
+
+FRACTURING_DISTRIBUTIONS: Dict[str, Tuple] = {
+    'lateral_length_m': ('uniform', 1500, 3000),
+    'n_stages': ('integers', 25, 55),
+    'n_clusters_per_stage': ('integers', 4, 8),
+    'cluster_spacing_m': ('uniform', 15, 30),
+    'proppant_total_ton': ('uniform', 1500, 4500),
+    'fluid_total_m3': ('uniform', 15000, 40000),
+    'avg_rate_bpm': ('uniform', 60, 100),
+    'avg_pressure_mpa': ('uniform', 60, 95),
+    'slickwater_percent': ('uniform', 70, 100),
+    'proppant_type': ('choice', ['White Sand', 'Brown Sand', 'Ceramic']),
+    'mesh_size': ('choice', ['30/50', '40/70', '100']),
+}
+
+
+def sample_distributions(rng, distributions: Dict[str, Tuple], n: int) -> Dict[str, np.ndarray]:
+    """Draw ``n`` values per column from ``np.random`` or a ``np.random.Generator``"""
+    samples = {}
+    for column, (method, *args) in distributions.items():
+        if method == 'integers' and not isinstance(rng, np.random.Generator):
+            method = 'randint'
+        samples[column] = getattr(rng, method)(*args, n)
+    return samples
+
+# Daily production histories
+CUM_HORIZONS_DAYS = [30, 90, 180, 365]
+PEAK_RATE_SCALE = 1000.0
+MIN_DAYS_ONLINE, MAX_DAYS_ONLINE = 365, 1095
+MIN_SPUD_TO_COMPLETION_DAYS, MAX_SPUD_TO_COMPLETION_DAYS = 30, 120
+DAILY_NOISE_SIGMA = 0.08
+
 
 class SyntheticDataGenerator:
-    """Generate synthetic well data for Vaca Muerta formation"""
+    """Generate synthetic well data for Vaca Muerta formation
+
+    With ``spatial_fields`` the properties in ``FIELD_PROPERTIES`` are read
+    from Gaussian random fields over the acreage (see ``src.random_fields``)
+    instead of drawn independently per well, so neighbouring wells are
+    correlated within ``variogram_range_km``.
+    """
     
-    def __init__(self, n_wells: int = 100):
+    def __init__(self, n_wells: int = 100, spatial_fields: bool = False,
+                 variogram_range_km: float = DEFAULT_VARIOGRAM_RANGE_KM, grid_size: int = DEFAULT_GRID_SIZE):
         self.n_wells = n_wells
+        self.spatial_fields = spatial_fields
+        self.variogram_range_km = variogram_range_km
+        self.grid_size = grid_size
         ensure_data_dirs()
     
     def generate_reservoir_properties(self) -> pd.DataFrame:
         """Generate reservoir properties for synthetic wells"""
         data = {
             'well_id': [f'VM-{i:04d}' for i in range(1, self.n_wells + 1)],
-            'latitude': np.random.uniform(-39.5, -37.0, self.n_wells),
-            'longitude': np.random.uniform(-70.5, -68.0, self.n_wells),
-            'formation': np.random.choice(['Vaca Muerta', 'Vaca Muerta Superior'], self.n_wells),
-            'porosity': np.random.uniform(0.04, 0.12, self.n_wells),
-            'permeability_nd': np.random.lognormal(mean=-3, sigma=1.5, size=self.n_wells),
-            'water_saturation': np.random.uniform(0.20, 0.45, self.n_wells),
-            'net_pay_m': np.random.uniform(50, 250, self.n_wells),
-            'toc_percent': np.random.uniform(2.0, 8.0, self.n_wells),
-            'vitrinite_reflectance': np.random.uniform(0.8, 1.4, self.n_wells),
-            'youngs_modulus_gpa': np.random.uniform(20, 45, self.n_wells),
-            'poisson_ratio': np.random.uniform(0.15, 0.30, self.n_wells),
-            'initial_pressure_mpa': np.random.uniform(40, 65, self.n_wells),
-            'temperature_c': np.random.uniform(90, 140, self.n_wells)
+            **sample_distributions(np.random, RESERVOIR_DISTRIBUTIONS, self.n_wells)
         }
         
+        if self.spatial_fields:
+            # Seeded from the global stream so np.random.seed still reproduces the fields
+            rng = np.random.default_rng(np.random.randint(2 ** 31))
+            data.update(sample_property_fields(
+                data['latitude'], data['longitude'],
+                {column: RESERVOIR_DISTRIBUTIONS[column] for column in FIELD_PROPERTIES},
+                self.variogram_range_km, self.grid_size, rng=rng
+            ))
+        
         df = pd.DataFrame(data)
         df['oil_saturation'] = 1 - df['water_saturation']
         
@@ -51,21 +114,18 @@ class SyntheticDataGenerator:
         """Generate hydraulic fracturing job parameters"""
         n = len(reservoir_df)
         
+        # Completions are backdated by the history each well will produce, so
+        # days_online never exceeds the calendar days since first production
+        today = pd.Timestamp.today().normalize()
+        days_online = np.random.randint(MIN_DAYS_ONLINE, MAX_DAYS_ONLINE + 1, n)
+        drilling_days = np.random.randint(MIN_SPUD_TO_COMPLETION_DAYS, MAX_SPUD_TO_COMPLETION_DAYS + 1, n)
+        completion = today - pd.to_timedelta(days_online, unit='D')
+        
         data = {
             'well_id': reservoir_df['well_id'],
-            'spud_date': [fake.date_between(start_date='-3y', end_date='-6m') for _ in range(n)],
-            'completion_date': [fake.date_between(start_date='-2y', end_date='today') for _ in range(n)],
-            'lateral_length_m': np.random.uniform(1500, 3000, n),
-            'n_stages': np.random.randint(25, 55, n),
-            'n_clusters_per_stage': np.random.randint(4, 8, n),
-            'cluster_spacing_m': np.random.uniform(15, 30, n),
-            'proppant_total_ton': np.random.uniform(1500, 4500, n),
-            'fluid_total_m3': np.random.uniform(15000, 40000, n),
-            'avg_rate_bpm': np.random.uniform(60, 100, n),
-            'avg_pressure_mpa': np.random.uniform(60, 95, n),
-            'slickwater_percent': np.random.uniform(70, 100, n),
-            'proppant_type': np.random.choice(['White Sand', 'Brown Sand', 'Ceramic'], n),
-            'mesh_size': np.random.choice(['30/50', '40/70', '100'], n),
+            'spud_date': (completion - pd.to_timedelta(drilling_days, unit='D')).date,
+            'completion_date': completion.date,
+            **sample_distributions(np.random, FRACTURING_DISTRIBUTIONS, n)
         }
         
         df = pd.DataFrame(data)
@@ -77,78 +137,91 @@ class SyntheticDataGenerator:
         return df
     
     def generate_production_data(self, reservoir_df: pd.DataFrame, 
-                                 frac_df: pd.DataFrame) -> pd.DataFrame:
-        """Generate production data using a simple heuristic (lightweight, stable)
+                                 frac_df: pd.DataFrame, chunk_wells: int = 10_000) -> pd.DataFrame:
+        """Generate daily Arps production histories and their summary metrics
 
-        This replacement avoids heavy numeric loops and external dependencies
-        during tests while keeping realistic-looking cumulative metrics.
+        Peak rate scales with reservoir and completion quality; each well
+        then declines along its own Arps curve, with daily noise, from its
+        completion date up to yesterday. Histories are written to the
+        memory-mapped daily store and the cumulative checkpoints are read
+        back from its prefix sums, so new horizons need no regeneration.
         """
+        n = len(reservoir_df)
+        frac = frac_df.set_index('well_id').loc[reservoir_df['well_id']]
+
+        reservoir_quality = reservoir_df['porosity'].to_numpy() * reservoir_df['net_pay_m'].to_numpy()
+        completion_quality = frac['proppant_intensity_ton_per_m'].to_numpy() * \
+            (frac['fluid_intensity_m3_per_m'].to_numpy() / 1000.0)
+        base = reservoir_quality * completion_quality * reservoir_df['oil_saturation'].to_numpy()
+
+        qi = base * PEAK_RATE_SCALE * np.random.lognormal(0.0, 0.25, n)
+        decline_annual = np.random.uniform(0.4, 1.2, n)
+        b_factor = np.random.uniform(0.3, 0.9, n)
+        first_production = pd.to_datetime(frac['completion_date']).to_numpy()
+        days_online = (pd.Timestamp.today().normalize() - pd.DatetimeIndex(first_production)).days.to_numpy()
+
+        # Mid-day rates; blocks share one width so the noise stream does not depend on chunking
+        t = np.arange(days_online.max()) + 0.5
+
+        def daily_rates():
+            for start in range(0, n, chunk_wells):
+                rows = slice(start, start + chunk_wells)
+                rates = arps_decline(qi[rows, None], decline_annual[rows, None] / 365.0,
+                                     b_factor[rows, None], t[None, :])
+                noise = np.random.lognormal(0.0, DAILY_NOISE_SIGMA, rates.shape)
+                yield (rates * noise).astype(np.float32)
+
+        store = ProductionStore.write(reservoir_df['well_id'], days_online, daily_rates())
+        cumulative = store.cumulative_table(CUM_HORIZONS_DAYS)
+
+        production_df = pd.DataFrame({
+            'well_id': reservoir_df['well_id'].to_numpy(),
+            'first_production_date': frac['completion_date'].to_numpy(),
+            'last_production_date': (pd.DatetimeIndex(first_production)
+                                     + pd.to_timedelta(days_online - 1, unit='D')).date,
+            'days_online': days_online
+        })
+        production_df = production_df.merge(cumulative, on='well_id')
+        production_df['peak_oil_rate_m3_day'] = np.maximum.reduceat(store.values, store.offsets[:-1])
+        production_df['avg_oil_rate_m3_day'] = store.total() / days_online
+        production_df['decline_rate_annual'] = decline_annual
+        production_df['b_factor'] = b_factor
 
-        production_records = []
-
-        # iterate by row to keep indexing aligned and readable
-        for idx, row in reservoir_df.iterrows():
-            well_id = row['well_id']
-            porosity = row['porosity']
-            net_pay = row['net_pay_m']
-            oil_sat = row['oil_saturation']
-
-            # Find matching frac row (assumes one-to-one ordering)
-            frac_row = frac_df[frac_df['well_id'] == well_id].iloc[0]
-            proppant_int = frac_row['proppant_intensity_ton_per_m']
-            fluid_int = frac_row['fluid_intensity_m3_per_m']
-
-            # Simple engineered indices
-            reservoir_quality = porosity * net_pay
-            completion_quality = proppant_int * (fluid_int / 1000.0)
-
-            # Heuristic base for cumulative oil at 180 days (m3)
-            base = reservoir_quality * completion_quality * oil_sat * 0.02
-            noise = np.random.normal(1.0, 0.25)
-            cum_oil_180 = max(0.0, base * noise)
-
-            # Provide a few additional descriptive metrics for compatibility
-            peak_oil = max(5.0, (base * 1000.0) * np.random.uniform(0.8, 1.4))
-            avg_oil = max(1.0, cum_oil_180 / 180.0)
-
-            production_records.append({
-                'well_id': well_id,
-                'first_production_date': frac_row['completion_date'],
-                'days_online': 180,
-                'cum_oil_30_days_m3': float(cum_oil_180 * 0.2),
-                'cum_oil_90_days_m3': float(cum_oil_180 * 0.55),
-                'cum_oil_180_days_m3': float(cum_oil_180),
-                'cum_oil_365_days_m3': float(cum_oil_180 * 1.6),
-                'peak_oil_rate_m3_day': float(peak_oil),
-                'avg_oil_rate_m3_day': float(avg_oil),
-                'decline_rate_annual': float(np.random.uniform(0.4, 1.2)),
-                'b_factor': float(np.random.uniform(0.3, 0.9))
-            })
-
-        return pd.DataFrame(production_records)
+        return production_df
     
-    def generate_all(self) -> Dict[str, pd.DataFrame]:
-        """Generate all synthetic datasets"""
+    def generate_bronze(self, progress: Callable[[float, str], None] = None) -> Dict[str, pd.DataFrame]:
+        """Generate and save the bronze-layer datasets (no silver/gold steps)
+
+        ``progress`` is called with the fraction done and a message per step.
+        """
+        report = progress or (lambda fraction, message: None)
         print(f"🧬 Generating synthetic data for {self.n_wells} wells...")
+        if self.spatial_fields:
+            print(f"🗺️ Spatially correlated properties (variogram range {self.variogram_range_km:g} km)")
         
-        reservoir_df = self.generate_reservoir_properties()
+        report(0.0, "Generating reservoir properties")
+        with span('generate.reservoir', n_wells=self.n_wells, spatial_fields=self.spatial_fields):
+            reservoir_df = self.generate_reservoir_properties()
         print(f"✅ Generated {len(reservoir_df)} reservoir property records")
         
-        frac_df = self.generate_fracturing_jobs(reservoir_df)
+        report(0.15, "Generating fracturing jobs")
+        with span('generate.fracturing', n_wells=self.n_wells):
+            frac_df = self.generate_fracturing_jobs(reservoir_df)
         print(f"✅ Generated {len(frac_df)} fracturing job records")
         
-        production_df = self.generate_production_data(reservoir_df, frac_df)
+        report(0.3, "Simulating daily production")
+        with span('generate.production', n_wells=self.n_wells):
+            production_df = self.generate_production_data(reservoir_df, frac_df)
         print(f"✅ Generated {len(production_df)} production records")
         
-        master_df = reservoir_df.merge(frac_df, on='well_id').merge(production_df, on='well_id')
-        
-        save_dataframe(reservoir_df, 'data/bronze/reservoir_properties.csv')
-        save_dataframe(frac_df, 'data/bronze/fracturing_jobs.csv')
-        save_dataframe(production_df, 'data/bronze/production_data.csv')
-        save_dataframe(master_df, 'data/bronze/wells_synth.csv')
-        
-        print(f"\n🎉 Synthetic data generation complete!")
-        print(f"📊 Master dataset: {master_df.shape[0]} rows × {master_df.shape[1]} columns")
+        report(0.8, "Saving bronze files")
+        with span('generate.save_bronze', n_wells=self.n_wells):
+            master_df = reservoir_df.merge(frac_df, on='well_id').merge(production_df, on='well_id')
+            
+            save_dataframe(reservoir_df, 'data/bronze/reservoir_properties.csv')
+            save_dataframe(frac_df, 'data/bronze/fracturing_jobs.csv')
+            save_dataframe(production_df, 'data/bronze/production_data.csv')
+            save_dataframe(master_df, WELLS_FILE)
         
         return {
             'reservoir': reservoir_df,
@@ -156,8 +229,41 @@ class SyntheticDataGenerator:
             'production': production_df,
             'master': master_df
         }
+    
+    def generate_all(self, progress: Callable[[float, str], None] = None) -> Dict[str, pd.DataFrame]:
+        """Generate all synthetic datasets, reporting ``(fraction, message)`` to ``progress``"""
+        report = progress or (lambda fraction, message: None)
+        datasets = self.generate_bronze(lambda fraction, message: report(0.6 * fraction, message))
+        master_df = datasets['master']
+        
+        report(0.6, "Materializing features")
+        with span('generate.features'):
+            materialize_features(master_df, WELLS_FILE)
+        report(0.7, "Building spatial index")
+        with span('generate.spatial'):
+            materialize_spatial(master_df, WELLS_FILE)
+        report(0.85, "Building gold tables")
+        with span('generate.gold'):
+            build_gold(WELLS_FILE)
+        report(1.0, "Done")
+        
+        print(f"\n🎉 Synthetic data generation complete!")
+        print(f"📊 Master dataset: {master_df.shape[0]} rows × {master_df.shape[1]} columns")
+        
+        return datasets
 
 
 if __name__ == "__main__":
-    generator = SyntheticDataGenerator(n_wells=150)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate the synthetic Vaca Muerta datasets")
+    parser.add_argument('--n-wells', type=int, default=150)
+    parser.add_argument('--spatial-fields', action='store_true',
+                        help=f"draw {', '.join(FIELD_PROPERTIES)} from Gaussian random fields")
+    parser.add_argument('--variogram-range-km', type=float, default=DEFAULT_VARIOGRAM_RANGE_KM)
+    parser.add_argument('--grid-size', type=int, default=DEFAULT_GRID_SIZE)
+    args = parser.parse_args()
+
+    generator = SyntheticDataGenerator(n_wells=args.n_wells, spatial_fields=args.spatial_fields,
+                                       variogram_range_km=args.variogram_range_km, grid_size=args.grid_size)
     datasets = generator.generate_all()
@@ -0,0 +1,149 @@
+"""
+Gold-Layer Aggregates
+Small precomputed dashboard tables, rebuilt only when their bronze or silver inputs change
+"""
+
+import json
+import os
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+from src.feature_store import feature_table_path, is_fresh, load_feature_table
+from src.utils import WELLS_FILE, ensure_data_dirs, file_signature, load_dataframe
+from src.viz import histogram_table
+
+GOLD_DIR = 'data/gold'
+
+PRODUCTION_COLUMN = 'cum_oil_180_days_m3'
+HISTOGRAM_COLUMNS = ['cum_oil_180_days_m3', 'cum_oil_365_days_m3', 'proppant_intensity_ton_per_m',
+                     'lateral_length_m', 'porosity', 'net_pay_m']
+HISTOGRAM_BINS = 30
+CORRELATION_COLUMNS = ['porosity', 'net_pay_m', 'lateral_length_m',
+                       'proppant_intensity_ton_per_m', 'cum_oil_180_days_m3']
+
+
+def _production_by(df: pd.DataFrame, key: pd.Series) -> pd.DataFrame:
+    grouped = df[PRODUCTION_COLUMN].groupby(key)
+    table = pd.DataFrame({
+        'n_wells': grouped.size(),
+        'mean_m3': grouped.mean(),
+        'p10_m3': grouped.quantile(0.1),
+        'p50_m3': grouped.quantile(0.5),
+        'p90_m3': grouped.quantile(0.9),
+        'total_m3': grouped.sum(),
+    })
+    return table.rename_axis(key.name).reset_index()
+
+
+def production_by_formation(df: pd.DataFrame) -> pd.DataFrame:
+    return _production_by(df, df['formation'])
+
+
+def production_by_proppant_type(df: pd.DataFrame) -> pd.DataFrame:
+    return _production_by(df, df['proppant_type'])
+
+
+def production_by_completion_month(df: pd.DataFrame) -> pd.DataFrame:
+    month = pd.to_datetime(df['completion_date']).dt.to_period('M').astype(str).rename('completion_month')
+    return _production_by(df, month)
+
+
+def histograms(df: pd.DataFrame) -> pd.DataFrame:
+    """Fixed-count bins per column, in long form (column, bin_left, bin_right, count)"""
+    tables = []
+    for column in [c for c in HISTOGRAM_COLUMNS if c in df.columns]:
+        table = histogram_table(df[column], bins=HISTOGRAM_BINS)
+        table.insert(0, 'column', column)
+        tables.append(table)
+    return pd.concat(tables, ignore_index=True)
+
+
+def correlations(df: pd.DataFrame) -> pd.DataFrame:
+    columns = [c for c in CORRELATION_COLUMNS if c in df.columns]
+    return df[columns].corr().rename_axis('feature').reset_index()
+
+
+def feature_summary(features: pd.DataFrame) -> pd.DataFrame:
+    return features.drop(columns='well_id').describe().rename_axis('statistic').reset_index()
+
+
+# name -> (builder, inputs); 'bronze' is the master table, 'silver' the feature table
+GOLD_TABLES: Dict[str, tuple] = {
+    'production_by_formation': (production_by_formation, ['bronze']),
+    'production_by_proppant_type': (production_by_proppant_type, ['bronze']),
+    'production_by_completion_month': (production_by_completion_month, ['bronze']),
+    'histograms': (histograms, ['bronze']),
+    'correlations': (correlations, ['bronze']),
+    'feature_summary': (feature_summary, ['silver']),
+}
+
+
+def gold_path(name: str) -> str:
+    return os.path.join(GOLD_DIR, f'{name}.parquet')
+
+
+def _input_paths(source_path: str) -> Dict[str, str]:
+    return {'bronze': source_path, 'silver': feature_table_path(source_path)}
+
+
+def _signature(inputs: List[str], source_path: str) -> Dict:
+    paths = _input_paths(source_path)
+    return {layer: file_signature(paths[layer]) for layer in inputs}
+
+
+def is_stale(name: str, source_path: str = WELLS_FILE) -> bool:
+    """Whether a gold table is missing or was built from different inputs"""
+    manifest = gold_path(name).replace('.parquet', '.json')
+    if not os.path.exists(gold_path(name)) or not os.path.exists(manifest):
+        return True
+    _, inputs = GOLD_TABLES[name]
+    if 'silver' in inputs and not is_fresh(source_path):
+        return True
+    with open(manifest) as f:
+        return json.load(f) != _signature(inputs, source_path)
+
+
+def build_gold(source_path: str = WELLS_FILE, force: bool = False) -> Dict[str, str]:
+    """Rebuild stale gold tables; returns each table's status ('built' or 'fresh')"""
+    ensure_data_dirs()
+    frames: Dict[str, Callable[[], pd.DataFrame]] = {
+        'bronze': lambda: load_dataframe(source_path),
+        'silver': lambda: load_feature_table(source_path),
+    }
+    loaded: Dict[str, pd.DataFrame] = {}
+    status = {}
+
+    for name, (builder, inputs) in GOLD_TABLES.items():
+        if not force and not is_stale(name, source_path):
+            status[name] = 'fresh'
+            continue
+        for layer in inputs:
+            if layer not in loaded:
+                loaded[layer] = frames[layer]()
+        table = builder(*(loaded[layer] for layer in inputs))
+        table.to_parquet(gold_path(name), index=False)
+        with open(gold_path(name).replace('.parquet', '.json'), 'w') as f:
+            json.dump(_signature(inputs, source_path), f, indent=2)
+        status[name] = 'built'
+
+    built = [n for n, s in status.items() if s == 'built']
+    if built:
+        print(f"✅ Built {len(built)} gold tables in {GOLD_DIR}: {', '.join(built)}")
+    return status
+
+
+def load_gold(name: str, source_path: str = WELLS_FILE) -> pd.DataFrame:
+    """Read a gold table, rebuilding the stale ones first"""
+    if is_stale(name, source_path):
+        build_gold(source_path)
+    return pd.read_parquet(gold_path(name))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build gold-layer aggregates")
+    parser.add_argument('--force', action='store_true', help="Rebuild every table")
+    args = parser.parse_args()
+    print(build_gold(force=args.force))
@@ -0,0 +1,189 @@
+"""
+Pipeline Instrumentation
+Context-manager spans recording wall time, CPU time and peak RSS delta, exported as JSON lines or Prometheus text
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, RSS is not recorded
+    resource = None
+
+# Spans kept in memory per process (oldest are dropped first)
+MAX_SPANS = 10_000
+
+SPANS_PATH = 'data/instrumentation/spans.jsonl'
+
+# ru_maxrss is reported in KiB on Linux and bytes on macOS
+_RSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+def peak_rss_bytes() -> int:
+    """High-water mark of this process's resident set size"""
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+
+class SpanRecorder:
+    """Thread-safe, bounded store of finished spans
+
+    A span measures wall time (``perf_counter``), process CPU time
+    (``process_time``, all threads) and how far it raised the process's
+    peak RSS; the last is 0 when the span stayed under an earlier peak, so
+    it attributes new memory high-water marks rather than transient use.
+    Nested spans record their parent's name. Besides the bounded span
+    buffer, per-name running totals are kept for ``to_prometheus``; they
+    count every span ever added, so they never go backwards when old spans
+    are dropped or the buffer is cleared.
+    """
+
+    def __init__(self, max_spans: int = MAX_SPANS):
+        self._spans = deque(maxlen=max_spans)
+        self._totals: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _add(self, record: Dict):
+        """Buffer a finished span and fold it into the running totals (lock held)"""
+        self._spans.append(record)
+        totals = self._totals.setdefault(record['name'], [0, 0.0, 0.0, 0])
+        totals[0] += 1
+        totals[1] += record['wall_s']
+        totals[2] += record['cpu_s']
+        totals[3] = max(totals[3], record['peak_rss_delta_bytes'])
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        stack = self._local.__dict__.setdefault('stack', [])
+        record = {'name': name, 'parent': stack[-1] if stack else None,
+                  'started_at': time.time(), 'attributes': attributes}
+        stack.append(name)
+        rss, cpu, wall = peak_rss_bytes(), time.process_time(), time.perf_counter()
+        status = 'ok'
+        try:
+            yield record['attributes']
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            record.update({
+                'wall_s': time.perf_counter() - wall,
+                'cpu_s': time.process_time() - cpu,
+                'peak_rss_delta_bytes': peak_rss_bytes() - rss,
+                'status': status,
+                'pid': os.getpid(),
+            })
+            stack.pop()
+            with self._lock:
+                self._add(record)
+
+    def extend(self, records: Iterable[Dict]):
+        """Add spans recorded elsewhere (e.g. returned by a worker process)"""
+        with self._lock:
+            for record in records:
+                self._add(record)
+
+    def records(self) -> List[Dict]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        """Drop the buffered spans; the running totals are kept"""
+        with self._lock:
+            self._spans.clear()
+
+    def to_jsonl(self, path: str = None) -> str:
+        """Spans as JSON lines; appended to ``path`` if given"""
+        text = ''.join(json.dumps(r, default=str) + '\n' for r in self.records())
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'a') as f:
+                f.write(text)
+        return text
+
+    def summary(self) -> pd.DataFrame:
+        """Per-span-name count, total and mean wall time, CPU time and largest RSS delta
+
+        Covers the buffered spans only; ``to_prometheus`` reports all-time totals.
+        """
+        frame = pd.DataFrame(self.records(), columns=['name', 'wall_s', 'cpu_s', 'peak_rss_delta_bytes'])
+        grouped = frame.groupby('name', sort=False)
+        return pd.DataFrame({
+            'count': grouped.size(),
+            'total_wall_s': grouped['wall_s'].sum(),
+            'mean_wall_s': grouped['wall_s'].mean(),
+            'total_cpu_s': grouped['cpu_s'].sum(),
+            'max_rss_delta_mb': grouped['peak_rss_delta_bytes'].max() / 2 ** 20,
+        }).sort_values('total_wall_s', ascending=False).reset_index()
+
+    def to_prometheus(self, prefix: str = 'vmo_span') -> str:
+        """Prometheus text exposition of the running per-span totals (since process start)"""
+        with self._lock:
+            totals = {name: list(values) for name, values in self._totals.items()}
+        metrics = [
+            ('count_total', 'counter', 'Finished spans'),
+            ('wall_seconds_total', 'counter', 'Wall-clock seconds spent in spans'),
+            ('cpu_seconds_total', 'counter', 'Process CPU seconds spent in spans'),
+            ('peak_rss_delta_bytes_max', 'gauge', 'Largest increase of peak RSS during any one span'),
+        ]
+        lines = []
+        for index, (suffix, kind, help_text) in enumerate(metrics):
+            lines += [f"# HELP {prefix}_{suffix} {help_text}", f"# TYPE {prefix}_{suffix} {kind}"]
+            for name, values in totals.items():
+                label = name.replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'{prefix}_{suffix}{{span="{label}"}} {values[index]:.9g}')
+        return '\n'.join(lines) + '\n'
+
+
+RECORDER = SpanRecorder()
+
+
+def span(name: str, **attributes):
+    """Time a block on the process-wide recorder: ``with span('ml.train', n_rows=len(df)):``"""
+    return RECORDER.span(name, **attributes)
+
+
+def main():
+    """Run generation, checks and training, then print the recorded spans"""
+    import argparse
+
+    from src.feature_store import load_feature_table
+    from src.generate_data import SyntheticDataGenerator
+    from src.ml_pipeline import ProductionMLPipeline
+    from src.observability import run_quality_checks
+    from src.utils import WELLS_FILE
+
+    parser = argparse.ArgumentParser(description="Run generation, checks and training with span instrumentation")
+    parser.add_argument('--n-wells', type=int, default=150)
+    parser.add_argument('--format', choices=['summary', 'jsonl', 'prometheus'], default='summary')
+    args = parser.parse_args()
+
+    master = SyntheticDataGenerator(n_wells=args.n_wells).generate_all()['master']
+    run_quality_checks(master, date_column='last_production_date')
+    pipeline = ProductionMLPipeline()
+    pipeline.train_model(master, features=load_feature_table(WELLS_FILE))
+    pipeline.predict_cum_oil(master)
+
+    if args.format == 'jsonl':
+        print(RECORDER.to_jsonl(SPANS_PATH), end='')
+    elif args.format == 'prometheus':
+        print(RECORDER.to_prometheus(), end='')
+    else:
+        print(RECORDER.summary().to_string(index=False))
+
+
+if __name__ == "__main__":
+    # Run from the src.instrumentation module so the pipeline's spans land on its RECORDER
+    import src.instrumentation
+    src.instrumentation.main()
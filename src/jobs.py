@@ -0,0 +1,254 @@
+"""
+Background Job Manager
+Runs data generation and model training in a process pool with progress, ETA and deduplication
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from typing import Dict, List
+
+from src.instrumentation import RECORDER
+from src.utils import WELLS_FILE, file_signature
+
+
+def _generate_data(progress, n_wells: int = 150, spatial_fields: bool = False,
+                   variogram_range_km: float = None) -> Dict:
+    from src.generate_data import SyntheticDataGenerator
+    from src.random_fields import DEFAULT_VARIOGRAM_RANGE_KM
+
+    generator = SyntheticDataGenerator(n_wells=n_wells, spatial_fields=spatial_fields,
+                                       variogram_range_km=variogram_range_km or DEFAULT_VARIOGRAM_RANGE_KM)
+    master = generator.generate_all(progress)['master']
+    return {
+        'n_wells': len(master),
+        'n_columns': master.shape[1],
+        'avg_cum_oil_180_days_m3': float(master['cum_oil_180_days_m3'].mean()),
+        'avg_lateral_length_m': float(master['lateral_length_m'].mean()),
+    }
+
+
+def _train_model(progress, source_path: str = WELLS_FILE) -> Dict:
+    from src.feature_store import load_feature_table
+    from src.ml_pipeline import ProductionMLPipeline
+    from src.utils import load_dataframe
+
+    pipeline = ProductionMLPipeline()
+    metrics = pipeline.train_model(load_dataframe(source_path), features=load_feature_table(source_path),
+                                   progress=progress)
+    return {'pipeline': pipeline, 'metrics': metrics}
+
+
+# kind -> task function, called in a worker as task(progress, **params)
+JOB_KINDS = {
+    'generate_data': _generate_data,
+    'train_model': _train_model,
+}
+
+# Kinds that write or read the data files; they run one at a time in submission
+# order, so training never reads a half-written dataset and generations never interleave
+DATA_JOB_KINDS = {'generate_data', 'train_model'}
+
+
+class _ProgressReporter:
+    """Progress callback writing (fraction, message, start time) to a shared dict"""
+
+    def __init__(self, store, job_id: str):
+        self.store = store
+        self.job_id = job_id
+        self.started_at = time.time()
+
+    def __call__(self, fraction: float, message: str):
+        self.store[self.job_id] = (min(max(float(fraction), 0.0), 1.0), message, self.started_at)
+
+
+def _run_job(kind: str, params: Dict, job_id: str, store):
+    """Worker entry point; returns the task result and the spans it recorded"""
+    # Forked workers inherit the server's spans and keep their own between jobs
+    RECORDER.clear()
+    report = _ProgressReporter(store, job_id)
+    report(0.0, "Started")
+    result = JOB_KINDS[kind](report, **params)
+    report(1.0, "Done")
+    return result, RECORDER.records()
+
+
+def _collect_spans(future):
+    """Merge a finished job's spans into the server's recorder"""
+    if not future.cancelled() and future.exception() is None:
+        RECORDER.extend(future.result()[1])
+
+
+def _copy_outcome(source, target: Future):
+    """Resolve the running ``target`` with the result or exception of the finished ``source``"""
+    if source.cancelled():
+        target.set_exception(CancelledError())
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+def job_key(kind: str, params: Dict) -> str:
+    """Identity of a submission; a ``source_path`` param is keyed by its current signature
+
+    so retraining on regenerated data is not mistaken for a duplicate.
+    """
+    identity = {'kind': kind, 'params': params}
+    source_path = params.get('source_path')
+    if source_path and os.path.exists(source_path):
+        identity['source'] = file_signature(source_path)
+    return hashlib.sha256(json.dumps(identity, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class Job:
+    """Handle to a submitted job; progress is read from the shared store on access"""
+
+    def __init__(self, job_id: str, kind: str, params: Dict, key: str, future, store):
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+        self.key = key
+        self.submitted_at = time.time()
+        self._future = future
+        self._store = store
+
+    def _progress(self):
+        return self._store.get(self.job_id)
+
+    @property
+    def status(self) -> str:
+        if self._future.cancelled():
+            return 'cancelled'
+        if self._future.done():
+            return 'failed' if self._future.exception() else 'done'
+        return 'running' if self._progress() else 'queued'
+
+    @property
+    def done(self) -> bool:
+        return self._future.done()
+
+    def info(self) -> Dict:
+        """Status, fraction, message, elapsed and ETA in seconds"""
+        status = self.status
+        fraction, message, started_at = self._progress() or (0.0, 'Queued', None)
+        if status == 'done':
+            fraction, message = 1.0, 'Done'
+        elif status == 'failed':
+            message = repr(self._future.exception())
+        elapsed = time.time() - started_at if started_at and not self.done else None
+        eta = elapsed * (1 - fraction) / fraction if elapsed and 0 < fraction < 1 else None
+        return {
+            'job_id': self.job_id, 'kind': self.kind, 'status': status,
+            'fraction': fraction, 'message': message, 'elapsed_s': elapsed, 'eta_s': eta,
+        }
+
+    def result(self, timeout: float = None):
+        return self._future.result(timeout)[0]
+
+
+class JobManager:
+    """Process-pool job runner shared by all sessions of a server process
+
+    Jobs live in the manager, not in a session, so they keep running when
+    the page changes and can be picked up again by id. Submitting a job
+    identical to one still queued or running returns the existing job.
+    Jobs of ``DATA_JOB_KINDS`` wait in the manager until the previous one
+    has finished, so only one of them is in the pool at a time. Workers are forked (spawning would re-run the Streamlit script as
+    ``__main__``), report progress through a managed dict and hand their
+    instrumentation spans back with the result.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        context = multiprocessing.get_context('fork')
+        self._sync = context.Manager()
+        self._store = self._sync.dict()
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+        self._jobs: Dict[str, Job] = {}
+        self._active: Dict[str, str] = {}
+        self._data_queue = deque()
+        self._data_running = False
+        # Reentrant: a pool future that is already done runs its callback in the submitting thread
+        self._lock = threading.RLock()
+
+    def submit(self, kind: str, **params) -> Job:
+        """Queue a job, or return the identical job already in flight"""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}'; expected one of {list(JOB_KINDS)}")
+        key = job_key(kind, params)
+        with self._lock:
+            existing = self._jobs.get(self._active.get(key))
+            if existing and not existing.done:
+                return existing
+            job_id = uuid.uuid4().hex[:12]
+            if kind in DATA_JOB_KINDS:
+                future = Future()
+                self._data_queue.append((future, (_run_job, kind, params, job_id, self._store)))
+                self._start_data_job()
+            else:
+                future = self._executor.submit(_run_job, kind, params, job_id, self._store)
+            future.add_done_callback(_collect_spans)
+            job = Job(job_id, kind, params, key, future, self._store)
+            self._jobs[job_id] = job
+            self._active[key] = job_id
+            return job
+
+    def _start_data_job(self):
+        """Send the oldest waiting data job to the pool unless one is already there"""
+        with self._lock:
+            while not self._data_running and self._data_queue:
+                future, call = self._data_queue.popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue
+                self._data_running = True
+                self._executor.submit(*call).add_done_callback(
+                    lambda pool_future, future=future: self._finish_data_job(pool_future, future))
+
+    def _finish_data_job(self, pool_future, future: Future):
+        _copy_outcome(pool_future, future)
+        with self._lock:
+            self._data_running = False
+        self._start_data_job()
+
+    def get(self, job_id: str) -> Job:
+        return self._jobs.get(job_id)
+
+    def jobs(self, kind: str = None) -> List[Job]:
+        """Submitted jobs, newest first"""
+        jobs = [j for j in self._jobs.values() if kind is None or j.kind == kind]
+        return sorted(jobs, key=lambda j: j.submitted_at, reverse=True)
+
+    def shutdown(self):
+        with self._lock:
+            while self._data_queue:
+                self._data_queue.popleft()[0].cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._sync.shutdown()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a background job and follow its progress")
+    parser.add_argument('kind', choices=list(JOB_KINDS))
+    parser.add_argument('--n-wells', type=int, default=150)
+    args = parser.parse_args()
+
+    manager = JobManager()
+    params = {'n_wells': args.n_wells} if args.kind == 'generate_data' else {'source_path': WELLS_FILE}
+    job = manager.submit(args.kind, **params)
+    if manager.submit(args.kind, **params) is job:
+        print(f"🔁 Identical submission reused job {job.job_id}")
+    while not job.done:
+        info = job.info()
+        eta = f", ETA {info['eta_s']:.0f}s" if info['eta_s'] is not None else ""
+        print(f"⏳ {info['fraction']:.0%} {info['message']}{eta}")
+        time.sleep(0.5)
+    print(f"✅ {job.info()['status']}")
+    manager.shutdown()
@@ -4,65 +4,87 @@ Machine Learning Pipeline for Production Prediction
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
-from catboost import CatBoostRegressor
 import plotly.graph_objects as go
-import plotly.express as px
-from typing import Dict, Tuple, List
+from typing import Callable, Dict, Tuple, List
+import os
+import pickle
 import warnings
+from src.features import CompiledFeatureTransform, align_features, derive_features, model_inputs, with_features
+from src.instrumentation import span
+from src.viz import scatter_gl
 warnings.filterwarnings('ignore')
 
+# sklearn and catboost are imported where they are used: importing this module
+# (for MODEL_PATH or a type) stays cheap, and a pickled pipeline pulls them in
+# only when it is loaded
+
+MODEL_PATH = 'models/production_model.pkl'
+
+DEFAULT_PARAMS = {
+    'iterations': 500,
+    'learning_rate': 0.05,
+    'depth': 6,
+    'loss_function': 'RMSE',
+    'random_seed': 42,
+    'verbose': False
+}
+
+# Receives (fraction complete in [0, 1], status message)
+ProgressCallback = Callable[[float, str], None]
+
+HORIZON_TARGETS = [
+    'cum_oil_30_days_m3', 'cum_oil_90_days_m3',
+    'cum_oil_180_days_m3', 'cum_oil_365_days_m3'
+]
+
+
+class _FitProgress:
+    """CatBoost callback mapping boosting iterations onto a slice of overall progress"""
+    
+    def __init__(self, progress: ProgressCallback, n_iterations: int, start: float, end: float):
+        self.progress = progress
+        self.n_iterations = max(n_iterations, 1)
+        self.start, self.end = start, end
+        self.every = max(self.n_iterations // 50, 1)
+    
+    def after_iteration(self, info) -> bool:
+        if info.iteration % self.every == 0:
+            fraction = self.start + (self.end - self.start) * info.iteration / self.n_iterations
+            self.progress(fraction, f"Boosting iteration {info.iteration}/{self.n_iterations}")
+        return True
+
 
 class ProductionMLPipeline:
     """ML Pipeline for predicting oil production"""
     
     def __init__(self, target_column: str = 'cum_oil_180_days_m3'):
+        from sklearn.preprocessing import StandardScaler
+        
         self.target_column = target_column
         self.model = None
         self.scaler = StandardScaler()
         self.feature_columns = None
         self.feature_importance = None
         
-    def prepare_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Engineer features for production prediction"""
-        df_features = df.copy()
-        
-        if 'porosity' in df.columns and 'net_pay_m' in df.columns:
-            df_features['reservoir_quality_index'] = df_features['porosity'] * df_features['net_pay_m']
-        
-        if 'proppant_intensity_ton_per_m' in df.columns and 'fluid_intensity_m3_per_m' in df.columns:
-            df_features['completion_quality_index'] = (
-                df_features['proppant_intensity_ton_per_m'] * 
-                df_features['fluid_intensity_m3_per_m']
-            )
-        
-        if 'porosity' in df.columns and 'oil_saturation' in df.columns and 'net_pay_m' in df.columns:
-            df_features['hc_pore_volume'] = (
-                df_features['porosity'] * 
-                df_features['oil_saturation'] * 
-                df_features['net_pay_m']
-            )
-        
-        if 'n_stages' in df.columns and 'lateral_length_m' in df.columns:
-            df_features['stage_spacing_m'] = df_features['lateral_length_m'] / df_features['n_stages']
-        
-        if 'n_stages' in df.columns and 'n_clusters_per_stage' in df.columns:
-            df_features['total_clusters'] = df_features['n_stages'] * df_features['n_clusters_per_stage']
-        
-        if 'youngs_modulus_gpa' in df.columns and 'poisson_ratio' in df.columns:
-            df_features['brittleness_index'] = (
-                df_features['youngs_modulus_gpa'] / (1 + df_features['poisson_ratio'])
-            )
-        
-        return df_features
+    def prepare_features(self, df: pd.DataFrame, features: pd.DataFrame = None) -> pd.DataFrame:
+        """Engineer features for production prediction
+
+        ``features`` is an optional materialized feature table keyed by
+        ``well_id`` (see ``src.feature_store``); wells found there are not
+        recomputed. The source frame is never copied.
+        """
+        with span('ml.prepare_features', n_rows=len(df), materialized=features is not None):
+            if features is not None and 'well_id' in df.columns:
+                derived = align_features(df, features)
+            else:
+                derived = derive_features(df)
+            return with_features(df, derived)
     
     def select_features(self, df: pd.DataFrame) -> List[str]:
         """Select relevant features for modeling"""
         exclude_cols = [
             'well_id', 'formation', 'proppant_type', 'mesh_size',
-            'spud_date', 'completion_date', 'first_production_date',
+            'spud_date', 'completion_date', 'first_production_date', 'last_production_date',
             'cum_oil_30_days_m3', 'cum_oil_90_days_m3', 
             'cum_oil_180_days_m3', 'cum_oil_365_days_m3',
             'peak_oil_rate_m3_day', 'avg_oil_rate_m3_day',
@@ -75,12 +97,25 @@ class ProductionMLPipeline:
         
         return feature_cols
     
-    def train_model(self, df: pd.DataFrame) -> Dict:
-        """Train production prediction model"""
-        df_features = self.prepare_features(df)
+    def train_model(self, df: pd.DataFrame, params: Dict = None,
+                    features: pd.DataFrame = None, progress: ProgressCallback = None) -> Dict:
+        """Train production prediction model
+
+        ``params`` overrides the default CatBoost configuration, e.g. with the
+        best row of a ``src.tuning`` leaderboard. ``features`` is an optional
+        materialized feature table (see ``prepare_features``). ``progress`` is
+        called with the fraction done and a message as training advances.
+        """
+        from catboost import CatBoostRegressor
+        from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+        from sklearn.model_selection import train_test_split
+        
+        if progress:
+            progress(0.0, "Preparing features")
+        df_features = self.prepare_features(df, features)
         self.feature_columns = self.select_features(df_features)
         
-        X = df_features[self.feature_columns].fillna(0)
+        X = model_inputs(df_features, self.feature_columns)
         y = df_features[self.target_column]
         
         X_train, X_test, y_train, y_test = train_test_split(
@@ -90,17 +125,15 @@ class ProductionMLPipeline:
         X_train_scaled = self.scaler.fit_transform(X_train)
         X_test_scaled = self.scaler.transform(X_test)
         
-        self.model = CatBoostRegressor(
-            iterations=500,
-            learning_rate=0.05,
-            depth=6,
-            loss_function='RMSE',
-            random_seed=42,
-            verbose=False
-        )
+        model_params = {**DEFAULT_PARAMS, **(params or {})}
+        self.model = CatBoostRegressor(**model_params)
         
-        self.model.fit(X_train_scaled, y_train)
+        callbacks = [_FitProgress(progress, model_params['iterations'], 0.1, 0.95)] if progress else None
+        with span('ml.train', target=self.target_column, n_rows=len(X_train), iterations=model_params['iterations']):
+            self.model.fit(X_train_scaled, y_train, callbacks=callbacks)
         
+        if progress:
+            progress(0.95, "Evaluating")
         y_pred_train = self.model.predict(X_train_scaled)
         y_pred_test = self.model.predict(X_test_scaled)
         
@@ -122,12 +155,80 @@ class ProductionMLPipeline:
         
         return metrics
     
-    def predict_cum_oil(self, df: pd.DataFrame) -> np.ndarray:
+    def continue_training(self, df_train: pd.DataFrame, df_holdout: pd.DataFrame,
+                          params: Dict = None, features: pd.DataFrame = None) -> Dict:
+        """Continue boosting the current model on additional wells
+
+        Adds trees on top of the fitted model (CatBoost ``init_model``) while
+        keeping the fitted scaler and feature list, so only ``df_train`` is
+        processed. The fitted model's parameters are reused; ``params``
+        overrides them (e.g. ``iterations``). Holdout metrics of the previous
+        and continued model are returned for a promotion decision; the
+        continued model replaces ``self.model``.
+        """
+        from catboost import CatBoostRegressor
+        from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+        
+        base_model = self.model
+        train_features = self.prepare_features(df_train, features)
+        holdout_features = self.prepare_features(df_holdout, features)
+        
+        X_train = self.scaler.transform(model_inputs(train_features, self.feature_columns))
+        X_holdout = self.scaler.transform(model_inputs(holdout_features, self.feature_columns))
+        y_train = train_features[self.target_column]
+        y_holdout = holdout_features[self.target_column]
+        
+        y_pred_base = base_model.predict(X_holdout)
+        
+        self.model = CatBoostRegressor(**{**base_model.get_params(), 'iterations': 100, **(params or {})})
+        self.model.fit(X_train, y_train, init_model=base_model)
+        y_pred = self.model.predict(X_holdout)
+        
+        self.feature_importance = pd.DataFrame({
+            'feature': self.feature_columns,
+            'importance': self.model.feature_importances_
+        }).sort_values('importance', ascending=False)
+        
+        return {
+            'base_rmse': np.sqrt(mean_squared_error(y_holdout, y_pred_base)),
+            'test_rmse': np.sqrt(mean_squared_error(y_holdout, y_pred)),
+            'base_r2': r2_score(y_holdout, y_pred_base),
+            'test_r2': r2_score(y_holdout, y_pred),
+            'test_mae': mean_absolute_error(y_holdout, y_pred),
+            'update_n_train': len(df_train),
+            'update_n_holdout': len(df_holdout),
+            'tree_count': self.model.tree_count_
+        }
+    
+    def predict_cum_oil(self, df: pd.DataFrame, features: pd.DataFrame = None) -> np.ndarray:
         """Predict cumulative oil production"""
-        df_features = self.prepare_features(df)
-        X = df_features[self.feature_columns].fillna(0)
-        X_scaled = self.scaler.transform(X)
-        return self.model.predict(X_scaled)
+        df_features = self.prepare_features(df, features)
+        with span('ml.predict', target=self.target_column, n_rows=len(df)):
+            X = model_inputs(df_features, self.feature_columns)
+            X_scaled = self.scaler.transform(X)
+            return self.model.predict(X_scaled)
+    
+    def compile_transform(self) -> CompiledFeatureTransform:
+        """Precompile feature derivation and scaling into array operations"""
+        return CompiledFeatureTransform(self.feature_columns, self.scaler.mean_, self.scaler.scale_)
+    
+    def predict_array(self, X_scaled: np.ndarray, thread_count: int = -1) -> np.ndarray:
+        """Predict from an already transformed model matrix"""
+        with span('ml.predict_array', n_rows=len(X_scaled)):
+            return self.model.predict(X_scaled, thread_count=thread_count)
+    
+    def save(self, path: str = MODEL_PATH):
+        """Persist the trained pipeline (model, scaler and feature list)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump(self, f)
+        print(f"✅ Saved model to {path}")
+    
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> 'ProductionMLPipeline':
+        """Load a pipeline persisted with ``save``"""
+        with open(path, 'rb') as f:
+            return pickle.load(f)
     
     def get_feature_importance(self, top_n: int = 15) -> pd.DataFrame:
         """Get top N important features"""
@@ -137,9 +238,9 @@ class ProductionMLPipeline:
         """Plot actual vs predicted values"""
         fig = go.Figure()
         
-        fig.add_trace(go.Scatter(
-            x=y_true,
-            y=y_pred,
+        fig.add_trace(scatter_gl(
+            y_true,
+            y_pred,
             mode='markers',
             name='Predictions',
             marker=dict(size=8, color='royalblue', opacity=0.6)
@@ -184,3 +285,56 @@ class ProductionMLPipeline:
         )
         
         return fig
+
+
+
+class MultiTargetMLPipeline(ProductionMLPipeline):
+    """Single CatBoost MultiRMSE model predicting every cumulative horizon
+
+    One shared tree ensemble replaces one model per horizon; predictions
+    are an (n_wells, n_targets) array ordered as ``target_column``.
+    """
+    
+    def __init__(self, target_columns: List[str] = None):
+        super().__init__(target_column=list(target_columns or HORIZON_TARGETS))
+    
+    def train_model(self, df: pd.DataFrame, params: Dict = None,
+                    features: pd.DataFrame = None, progress: ProgressCallback = None) -> Dict:
+        """Train the multi-target model; metrics average over horizons"""
+        from sklearn.metrics import r2_score
+        
+        metrics = super().train_model(
+            df, {'loss_function': 'MultiRMSE', **(params or {})}, features, progress
+        )
+        y_test, y_pred = metrics['y_test'].to_numpy(), metrics['y_pred']
+        metrics['by_target'] = pd.DataFrame({
+            'target': self.target_column,
+            'test_r2': [r2_score(y_test[:, i], y_pred[:, i]) for i in range(y_test.shape[1])],
+            'test_rmse': np.sqrt(((y_test - y_pred) ** 2).mean(axis=0))
+        })
+        return metrics
+    
+    def predict_horizons(self, df: pd.DataFrame, features: pd.DataFrame = None) -> pd.DataFrame:
+        """Predict all horizons as a DataFrame aligned with ``df``"""
+        return pd.DataFrame(self.predict_cum_oil(df, features),
+                            columns=self.target_column, index=df.index)
+
+
+def main():
+    """Train the production model on the current dataset and register it"""
+    from src.feature_store import load_feature_table
+    from src.model_registry import register_model
+    from src.utils import WELLS_FILE, load_dataframe
+    
+    df = load_dataframe(WELLS_FILE)
+    pipeline = ProductionMLPipeline()
+    metrics = pipeline.train_model(df, features=load_feature_table(WELLS_FILE))
+    print(f"Test R²: {metrics['test_r2']:.3f} | Test RMSE: {metrics['test_rmse']:.1f} m³")
+    register_model(pipeline, df, metrics)
+
+
+if __name__ == "__main__":
+    # Run main() from the package module: a pipeline built from this __main__
+    # copy would pickle as __main__.ProductionMLPipeline and not load elsewhere
+    import src.ml_pipeline
+    src.ml_pipeline.main()
@@ -0,0 +1,173 @@
+"""
+Model Registry and Incremental Updates
+Versioned production models with warm-started refreshes on newly arrived wells
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.ml_pipeline import MODEL_PATH, ProductionMLPipeline
+
+REGISTRY_DIR = 'models/registry'
+INDEX_PATH = os.path.join(REGISTRY_DIR, 'index.json')
+
+
+def list_models() -> List[Dict]:
+    """All registered model versions, oldest first"""
+    if not os.path.exists(INDEX_PATH):
+        return []
+    with open(INDEX_PATH) as f:
+        return json.load(f)
+
+
+def _write_index(entries: List[Dict]):
+    os.makedirs(REGISTRY_DIR, exist_ok=True)
+    tmp = INDEX_PATH + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(entries, f, indent=2)
+    os.replace(tmp, INDEX_PATH)
+
+
+def register_model(pipeline: ProductionMLPipeline, df: pd.DataFrame, metrics: Dict,
+                   holdout_ids: List[str] = None, train_ids: List[str] = None,
+                   parent: str = None, mode: str = 'full') -> Dict:
+    """Register a trained pipeline as the new latest version and promote it
+
+    The wells used for training and holdout are recorded so later
+    incremental updates can tell which wells are new. Promotion also
+    writes the pipeline to ``MODEL_PATH`` for the scoring service.
+    """
+    if holdout_ids is None:
+        holdout_ids = df.loc[metrics['y_test'].index, 'well_id'].tolist()
+    if train_ids is None:
+        holdout = set(holdout_ids)
+        train_ids = [w for w in df['well_id'] if w not in holdout]
+
+    entries = list_models()
+    version = f"v{len(entries) + 1:04d}"
+    version_dir = os.path.join(REGISTRY_DIR, version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    pipeline.save(os.path.join(version_dir, 'pipeline.pkl'))
+    pd.DataFrame({
+        'well_id': list(train_ids) + list(holdout_ids),
+        'role': ['train'] * len(train_ids) + ['holdout'] * len(holdout_ids)
+    }).to_csv(os.path.join(version_dir, 'wells.csv'), index=False)
+
+    entry = {
+        'version': version,
+        'parent': parent,
+        'mode': mode,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'target': pipeline.target_column,
+        'n_train': len(train_ids),
+        'n_holdout': len(holdout_ids),
+        'metrics': {k: float(v) for k, v in metrics.items() if np.isscalar(v)}
+    }
+    _write_index(entries + [entry])
+    pipeline.save(MODEL_PATH)
+
+    print(f"📦 Registered model {version} ({mode})")
+    return entry
+
+
+def load_model_version(version: str = None) -> Tuple[Dict, ProductionMLPipeline]:
+    """Load a registered version, or the latest one when ``version`` is None"""
+    entries = list_models()
+    if not entries:
+        raise FileNotFoundError(f"No models registered in {REGISTRY_DIR}")
+    entry = entries[-1] if version is None else next(e for e in entries if e['version'] == version)
+    pipeline = ProductionMLPipeline.load(os.path.join(REGISTRY_DIR, entry['version'], 'pipeline.pkl'))
+    return entry, pipeline
+
+
+def registered_wells(version: str) -> pd.DataFrame:
+    """Wells (and their train/holdout role) seen by a registered version"""
+    return pd.read_csv(os.path.join(REGISTRY_DIR, version, 'wells.csv'))
+
+
+def incremental_update(df: pd.DataFrame, features: pd.DataFrame = None,
+                       replay_fraction: float = 0.25, holdout_fraction: float = 0.2,
+                       iterations: int = 100, tolerance: float = 0.02,
+                       seed: int = 42) -> Dict:
+    """Continue the latest model on new wells plus a replay sample of old ones
+
+    New wells (absent from the latest version) are split into training and
+    holdout wells; the holdout accumulates across versions. A replay sample
+    of previously trained wells, ``replay_fraction`` times the number of new
+    training wells, guards against drifting away from the old population.
+    The continued model is promoted only if its holdout RMSE is within
+    ``tolerance`` of the previous model's.
+    """
+    start = time.perf_counter()
+    entry, pipeline = load_model_version()
+    seen = registered_wells(entry['version'])
+    old_train = seen.loc[seen['role'] == 'train', 'well_id'].to_numpy()
+    holdout_ids = seen.loc[seen['role'] == 'holdout', 'well_id'].tolist()
+
+    rng = np.random.default_rng(seed)
+    new_ids = np.setdiff1d(df['well_id'].to_numpy(), seen['well_id'].to_numpy())
+    if len(new_ids) == 0:
+        print(f"ℹ️ No new wells since {entry['version']}")
+        return {'promoted': False, 'version': entry['version'], 'n_new_wells': 0}
+
+    new_ids = rng.permutation(new_ids)
+    n_new_holdout = int(round(len(new_ids) * holdout_fraction))
+    new_holdout, new_train = new_ids[:n_new_holdout], new_ids[n_new_holdout:]
+    n_replay = min(len(old_train), int(np.ceil(len(new_train) * replay_fraction)))
+    replay = rng.choice(old_train, size=n_replay, replace=False)
+
+    holdout_ids = holdout_ids + new_holdout.tolist()
+    by_id = df.set_index('well_id', drop=False)
+    df_train = by_id.loc[np.concatenate([new_train, replay])].reset_index(drop=True)
+    df_holdout = by_id.loc[by_id.index.intersection(holdout_ids)].reset_index(drop=True)
+
+    metrics = pipeline.continue_training(df_train, df_holdout, {'iterations': iterations}, features)
+    metrics['update_seconds'] = time.perf_counter() - start
+    promoted = metrics['test_rmse'] <= metrics['base_rmse'] * (1 + tolerance)
+
+    print(f"🔁 {len(new_train)} new + {n_replay} replay wells: holdout RMSE "
+          f"{metrics['base_rmse']:.4f} → {metrics['test_rmse']:.4f} "
+          f"in {metrics['update_seconds']:.1f}s")
+
+    if not promoted:
+        print(f"⛔ Not promoted; {entry['version']} remains the latest model")
+        return {'promoted': False, 'version': entry['version'], 'n_new_wells': len(new_ids), **metrics}
+
+    new_entry = register_model(
+        pipeline, df, metrics, holdout_ids=holdout_ids,
+        train_ids=old_train.tolist() + new_train.tolist(),
+        parent=entry['version'], mode='incremental'
+    )
+    return {'promoted': True, 'version': new_entry['version'], 'n_new_wells': len(new_ids), **metrics}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.feature_store import load_feature_table
+    from src.utils import WELLS_FILE, load_dataframe
+
+    parser = argparse.ArgumentParser(description="Inspect the model registry or run an incremental update")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help='list registered model versions')
+    p_update = sub.add_parser('update', help='continue the latest model on newly added wells')
+    p_update.add_argument('--iterations', type=int, default=100)
+    p_update.add_argument('--replay-fraction', type=float, default=0.25)
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for e in list_models():
+            print(f"{e['version']}  {e['created_at']}  {e['mode']:<11}  parent={e['parent']}  "
+                  f"train={e['n_train']}  holdout={e['n_holdout']}  "
+                  f"test_rmse={e['metrics'].get('test_rmse', float('nan')):.4f}")
+    else:
+        df = load_dataframe(WELLS_FILE)
+        incremental_update(df, load_feature_table(WELLS_FILE),
+                           replay_fraction=args.replay_fraction, iterations=args.iterations)
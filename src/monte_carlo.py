@@ -0,0 +1,165 @@
+"""
+Monte Carlo Production Uncertainty
+Chunked, multi-process simulation of model forecasts over sampled reservoir and completion inputs
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Tuple, Union
+
+import numpy as np
+import plotly.graph_objects as go
+
+from src.compiled_model import CompiledModel
+from src.generate_data import FRACTURING_DISTRIBUTIONS, RESERVOIR_DISTRIBUTIONS, sample_distributions
+from src.ml_pipeline import ProductionMLPipeline
+from src.utils import limit_worker_threads
+
+INPUT_DISTRIBUTIONS: Dict[str, Tuple] = {**RESERVOIR_DISTRIBUTIONS, **FRACTURING_DISTRIBUTIONS}
+
+# Per-process model state, set once by the worker initializer
+_ENGINE = None
+
+
+def draw_inputs(rng: np.random.Generator, n: int, input_columns: Iterable[str],
+                fixed: Dict[str, float] = None,
+                distributions: Dict[str, Tuple] = None) -> np.ndarray:
+    """Raw input matrix of ``n`` sampled wells, columns ordered as ``input_columns``
+
+    Columns in ``fixed`` are held constant (e.g. a known completion design);
+    columns the generator computes from others are recomputed from the draws.
+    """
+    distributions = distributions or INPUT_DISTRIBUTIONS
+    fixed = fixed or {}
+    numeric = {c: d for c, d in distributions.items() if d[0] != 'choice' and c not in fixed}
+    values = sample_distributions(rng, numeric, n)
+    values.update({c: np.full(n, v, dtype=np.float64) for c, v in fixed.items()})
+
+    derived = {
+        'oil_saturation': lambda v: 1 - v['water_saturation'],
+        'proppant_intensity_ton_per_m': lambda v: v['proppant_total_ton'] / v['lateral_length_m'],
+        'fluid_intensity_m3_per_m': lambda v: v['fluid_total_m3'] / v['lateral_length_m'],
+    }
+    for column, fn in derived.items():
+        if column not in fixed:
+            values[column] = fn(values)
+
+    return np.column_stack([
+        np.asarray(values.get(c, np.full(n, np.nan)), dtype=np.float64) for c in input_columns
+    ])
+
+
+class MonteCarloEngine:
+    """Push sampled inputs through feature derivation and the model in chunks
+
+    Each chunk of ``chunk_size`` draws gets its own RNG stream spawned from
+    one ``SeedSequence``, so results depend only on the seed and chunk
+    size, not on how many workers run the chunks. Peak memory per worker
+    is one chunk's raw and feature matrices.
+    """
+
+    def __init__(self, model: Union[ProductionMLPipeline, CompiledModel],
+                 chunk_size: int = 250_000, n_workers: int = None):
+        self.model = model
+        self.chunk_size = chunk_size
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.thread_count = -1
+        if isinstance(model, CompiledModel):
+            self.input_columns = model.input_columns
+        else:
+            self.input_columns = model.compile_transform().input_columns
+
+    def predict(self, raw: np.ndarray) -> np.ndarray:
+        if isinstance(self.model, CompiledModel):
+            return self.model.predict(raw)
+        transform = self.model.compile_transform()
+        return self.model.predict_array(transform(raw), thread_count=self.thread_count)
+
+    def simulate_chunk(self, seed: np.random.SeedSequence, n: int, fixed: Dict[str, float] = None,
+                       distributions: Dict[str, Tuple] = None) -> np.ndarray:
+        """Forecasts for ``n`` draws from one independent RNG stream"""
+        rng = np.random.default_rng(seed)
+        raw = draw_inputs(rng, n, self.input_columns, fixed, distributions)
+        return self.predict(raw).astype(np.float32)
+
+    def run(self, n_draws: int = 1_000_000, fixed: Dict[str, float] = None, seed: int = 42,
+            percentiles: Iterable[float] = (10, 50, 90),
+            distributions: Dict[str, Tuple] = None) -> Dict:
+        """Simulate ``n_draws`` forecasts and summarize their distribution"""
+        start = time.perf_counter()
+        sizes = [min(self.chunk_size, n_draws - i) for i in range(0, n_draws, self.chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        n_workers = max(1, min(self.n_workers, len(sizes)))
+
+        if n_workers == 1:
+            chunks = [self.simulate_chunk(s, n, fixed, distributions) for s, n in zip(seeds, sizes)]
+        else:
+            thread_count = max(1, (os.cpu_count() or 1) // n_workers)
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                     initargs=(self, thread_count)) as executor:
+                chunks = list(executor.map(_simulate_chunk, seeds, sizes,
+                                           [fixed] * len(sizes), [distributions] * len(sizes)))
+
+        samples = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.float32)
+        percentiles = list(percentiles)
+        values = np.percentile(samples, percentiles) if len(samples) else [np.nan] * len(percentiles)
+        return {
+            'samples': samples,
+            'percentiles': {f'p{p:g}': float(v) for p, v in zip(percentiles, values)},
+            'mean': float(samples.mean()) if len(samples) else np.nan,
+            'std': float(samples.std()) if len(samples) else np.nan,
+            'n_draws': len(samples),
+            'n_workers': n_workers,
+            'elapsed_s': time.perf_counter() - start
+        }
+
+
+def _init_worker(engine: MonteCarloEngine, thread_count: int):
+    global _ENGINE
+    limit_worker_threads(thread_count)
+    engine.thread_count = thread_count
+    _ENGINE = engine
+
+
+def _simulate_chunk(seed: np.random.SeedSequence, n: int, fixed: Dict[str, float],
+                    distributions: Dict[str, Tuple]) -> np.ndarray:
+    return _ENGINE.simulate_chunk(seed, n, fixed, distributions)
+
+
+def plot_forecast_distribution(result: Dict, bins: int = 60) -> go.Figure:
+    """Histogram of simulated forecasts with percentile markers"""
+    counts, edges = np.histogram(result['samples'], bins=bins)
+    fig = go.Figure(data=[go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+        marker_color='steelblue', name='Draws'
+    )])
+    for name, value in result['percentiles'].items():
+        fig.add_vline(x=value, line_dash='dash', annotation_text=name.upper())
+    fig.update_layout(
+        title=f"Forecast Distribution ({result['n_draws']:,} draws)",
+        xaxis_title="Predicted production (m³)",
+        yaxis_title="Draws",
+        height=450
+    )
+    return fig
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.ml_pipeline import MODEL_PATH
+
+    parser = argparse.ArgumentParser(description="Monte Carlo production forecast percentiles")
+    parser.add_argument('--draws', type=int, default=1_000_000)
+    parser.add_argument('--chunk-size', type=int, default=250_000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    engine = MonteCarloEngine(ProductionMLPipeline.load(MODEL_PATH), args.chunk_size, args.workers)
+    result = engine.run(args.draws, seed=args.seed)
+    print(f"🎲 {result['n_draws']:,} draws on {result['n_workers']} workers "
+          f"in {result['elapsed_s']:.2f}s")
+    for name, value in result['percentiles'].items():
+        print(f"   {name.upper()}: {value:,.0f} m³")
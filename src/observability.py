@@ -6,9 +6,10 @@ Implements data quality, freshness, and schema drift monitoring
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple
+import os
 from datetime import datetime
 import plotly.graph_objects as go
-from scipy import stats
+from src.instrumentation import span
 
 
 def calculate_completeness(df: pd.DataFrame) -> Dict[str, float]:
@@ -48,6 +49,8 @@ def calculate_freshness(df: pd.DataFrame, date_column: str = None) -> Dict[str,
 
 def detect_outliers_zscore(df: pd.DataFrame, threshold: float = 3.0) -> Dict[str, any]:
     """Detect outliers using z-score method"""
+    from scipy import stats
+    
     numeric_cols = df.select_dtypes(include=[np.number]).columns
     outlier_counts = {}
     outlier_ratios = {}
@@ -67,18 +70,26 @@ def detect_outliers_zscore(df: pd.DataFrame, threshold: float = 3.0) -> Dict[str
     }
 
 
+def _quality_score(completeness: Dict, freshness: Dict, outliers: Dict, n_rows: int) -> float:
+    """Weighted score from completeness, outlier rate and freshness"""
+    return (
+        completeness['overall_completeness_pct'] * 0.5 +
+        (100 - min(outliers['total_outliers'] / n_rows * 100, 100)) * 0.3 +
+        (100 if freshness['days_since_last_update'] < 0 or freshness['days_since_last_update'] <= 7 else 70) * 0.2
+    )
+
+
 def run_quality_checks(df: pd.DataFrame, date_column: str = None) -> Dict[str, any]:
     """Run comprehensive data quality checks"""
     
-    completeness = calculate_completeness(df)
-    freshness = calculate_freshness(df, date_column)
-    outliers = detect_outliers_zscore(df)
+    with span('quality.completeness', engine='pandas', n_rows=len(df)):
+        completeness = calculate_completeness(df)
+    with span('quality.freshness', engine='pandas', n_rows=len(df)):
+        freshness = calculate_freshness(df, date_column)
+    with span('quality.outliers', engine='pandas', n_rows=len(df)):
+        outliers = detect_outliers_zscore(df)
     
-    quality_score = (
-        completeness['overall_completeness_pct'] * 0.5 +
-        (100 - min(outliers['total_outliers'] / len(df) * 100, 100)) * 0.3 +
-        (100 if freshness['days_since_last_update'] < 0 or freshness['days_since_last_update'] <= 7 else 70) * 0.2
-    )
+    quality_score = _quality_score(completeness, freshness, outliers, len(df))
     
     return {
         'quality_score': quality_score,
@@ -91,6 +102,56 @@ def run_quality_checks(df: pd.DataFrame, date_column: str = None) -> Dict[str, a
     }
 
 
+def run_quality_checks_sql(engine, view: str = 'wells', date_column: str = None,
+                           threshold: float = 3.0) -> Dict[str, any]:
+    """Same checks as ``run_quality_checks``, computed in SQL on a ``QueryEngine`` view
+
+    Nothing is loaded into pandas beyond per-column aggregates, so the cost
+    is a few scans of the file regardless of its size.
+    """
+    with span('quality.completeness', engine='sql'):
+        n_rows = engine.row_count(view)
+        nulls = engine.null_counts(view)
+    present = n_rows - nulls
+    completeness = {
+        'overall_completeness_pct': present.sum() / (n_rows * len(nulls)) * 100,
+        'by_column': (present / n_rows * 100).to_dict(),
+        'missing_counts': nulls.to_dict()
+    }
+    
+    latest_date = None
+    days_since_update = -1
+    if date_column:
+        with span('quality.freshness', engine='sql'):
+            latest = engine.query(f'SELECT max("{date_column}") AS latest FROM {view}')['latest'].iloc[0]
+        if pd.notna(latest):
+            latest_date = pd.Timestamp(latest)
+            days_since_update = (datetime.now() - latest_date).days
+    freshness = {
+        'days_since_last_update': days_since_update,
+        'latest_date': latest_date,
+        'status': 'Fresh' if days_since_update <= 7 else 'Stale' if days_since_update <= 30 else 'Very Stale'
+    }
+    
+    with span('quality.outliers', engine='sql'):
+        counts = engine.zscore_outliers(view, threshold)
+    outliers = {
+        'total_outliers': int(counts.sum()),
+        'outlier_counts': counts.to_dict(),
+        'outlier_ratios': (counts / n_rows * 100).to_dict()
+    }
+    
+    return {
+        'quality_score': _quality_score(completeness, freshness, outliers, n_rows),
+        'completeness': completeness,
+        'freshness': freshness,
+        'outliers': outliers,
+        'row_count': n_rows,
+        'column_count': len(nulls),
+        'size_on_disk_mb': os.path.getsize(engine.views[view]) / 1024**2
+    }
+
+
 def plot_completeness_chart(completeness_data: Dict) -> go.Figure:
     """Create pie chart for data completeness"""
     overall = completeness_data['overall_completeness_pct']
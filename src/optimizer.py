@@ -0,0 +1,143 @@
+"""
+Completion Design Optimizer
+Batched scoring of candidate HF designs and production-vs-proppant-cost Pareto fronts
+"""
+
+import time
+from typing import Dict, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from src.compiled_model import CompiledModel
+from src.ml_pipeline import ProductionMLPipeline
+from src.viz import scatter_gl
+
+# Searched completion parameters and their bounds (synthetic data ranges)
+DESIGN_SPACE: Dict[str, Tuple[float, float]] = {
+    'lateral_length_m': (1500, 3000),
+    'n_stages': (25, 55),
+    'cluster_spacing_m': (15, 30),
+    'proppant_intensity_ton_per_m': (0.5, 3.0),
+    'fluid_intensity_m3_per_m': (5.0, 27.0),
+}
+
+PROPPANT_COST_USD_PER_TON = {
+    'White Sand': 60.0,
+    'Brown Sand': 45.0,
+    'Ceramic': 350.0,
+}
+
+
+def grid_candidates(points_per_dim: int = 10) -> pd.DataFrame:
+    """Full factorial grid over the design space"""
+    axes = [np.linspace(lo, hi, points_per_dim) for lo, hi in DESIGN_SPACE.values()]
+    mesh = np.meshgrid(*axes, indexing='ij')
+    candidates = pd.DataFrame({name: m.ravel() for name, m in zip(DESIGN_SPACE, mesh)})
+    candidates['n_stages'] = candidates['n_stages'].round()
+    return candidates.drop_duplicates(ignore_index=True)
+
+
+def random_candidates(n: int = 100_000, seed: int = 42) -> pd.DataFrame:
+    """Uniform random designs over the design space"""
+    rng = np.random.default_rng(seed)
+    candidates = pd.DataFrame({
+        name: rng.uniform(lo, hi, n) for name, (lo, hi) in DESIGN_SPACE.items()
+    })
+    candidates['n_stages'] = candidates['n_stages'].round()
+    return candidates
+
+
+def pareto_front(production: np.ndarray, cost: np.ndarray) -> np.ndarray:
+    """Indices of designs not dominated in (max production, min cost), sorted by cost"""
+    order = np.lexsort((-production, cost))
+    if len(order) == 0:
+        return order
+    best_so_far = np.maximum.accumulate(production[order])
+    improves = np.empty(len(order), dtype=bool)
+    improves[0] = True
+    improves[1:] = production[order][1:] > best_so_far[:-1]
+    return order[improves]
+
+
+class CompletionDesignOptimizer:
+    """Search completion designs for one well with a single batched prediction
+
+    Candidates share the well's reservoir properties; design columns and
+    the totals implied by them (proppant and fluid volumes) are written
+    into one raw feature matrix that is scored in a single model call.
+    """
+
+    def __init__(self, model: Union[ProductionMLPipeline, CompiledModel],
+                 chunk_rows: int = 250_000):
+        self.model = model
+        self.chunk_rows = chunk_rows
+        if isinstance(model, CompiledModel):
+            self.input_columns = model.input_columns
+            self._predict = model.predict
+        else:
+            transform = model.compile_transform()
+            self.input_columns = transform.input_columns
+            self._predict = lambda raw: model.predict_array(transform(raw))
+
+    def design_matrix(self, well: pd.Series, candidates: pd.DataFrame) -> np.ndarray:
+        """Raw input matrix: the well's properties with each candidate design applied"""
+        values = {col: np.full(len(candidates), well.get(col, np.nan), dtype=np.float64)
+                  for col in self.input_columns}
+        for col in candidates.columns:
+            values[col] = candidates[col].to_numpy(dtype=np.float64)
+
+        lateral = values['lateral_length_m']
+        values['proppant_total_ton'] = values['proppant_intensity_ton_per_m'] * lateral
+        values['fluid_total_m3'] = values['fluid_intensity_m3_per_m'] * lateral
+        return np.column_stack([values[col] for col in self.input_columns])
+
+    def optimize(self, well: pd.Series, candidates: pd.DataFrame = None,
+                 proppant_cost_per_ton: float = None) -> Dict:
+        """Score all candidates and return them with the Pareto front"""
+        start = time.perf_counter()
+        candidates = grid_candidates() if candidates is None else candidates
+        raw = self.design_matrix(well, candidates)
+
+        production = np.concatenate([
+            self._predict(raw[i:i + self.chunk_rows]) for i in range(0, len(raw), self.chunk_rows)
+        ])
+        price = proppant_cost_per_ton or PROPPANT_COST_USD_PER_TON.get(well.get('proppant_type'), 60.0)
+        cost = candidates['proppant_intensity_ton_per_m'].to_numpy() * \
+            candidates['lateral_length_m'].to_numpy() * price
+
+        scored = candidates.assign(predicted_production=production, proppant_cost_usd=cost)
+        front = scored.iloc[pareto_front(production, cost)].reset_index(drop=True)
+
+        return {
+            'candidates': scored,
+            'pareto_front': front,
+            'n_candidates': len(scored),
+            'elapsed_s': time.perf_counter() - start
+        }
+
+
+def plot_pareto_front(result: Dict, max_points: int = 5000) -> go.Figure:
+    """Scatter of (stratified-sampled) candidates with the Pareto front highlighted"""
+    candidates = result['candidates']
+    front = result['pareto_front']
+
+    fig = go.Figure()
+    fig.add_trace(scatter_gl(
+        candidates['proppant_cost_usd'], candidates['predicted_production'], max_points=max_points,
+        mode='markers', name='Candidates',
+        marker=dict(size=4, color='lightgray', opacity=0.5)
+    ))
+    fig.add_trace(go.Scatter(
+        x=front['proppant_cost_usd'], y=front['predicted_production'],
+        mode='lines+markers', name='Pareto front',
+        line=dict(color='royalblue'), marker=dict(size=7)
+    ))
+    fig.update_layout(
+        title=f"Production vs Proppant Cost ({result['n_candidates']:,} designs)",
+        xaxis_title="Proppant cost (USD)",
+        yaxis_title="Predicted production (m³)",
+        height=550
+    )
+    return fig
@@ -0,0 +1,374 @@
+"""
+Incremental Medallion Pipeline
+Bronze → silver → gold → model stages, content-hashed so unchanged stages are skipped and independent ones run in parallel
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, List
+
+from src.gold import GOLD_TABLES, gold_path
+from src.instrumentation import RECORDER, SPANS_PATH, span
+from src.production_store import PRODUCTION_STORE_DIR
+from src.random_fields import DEFAULT_VARIOGRAM_RANGE_KM
+from src.utils import WELLS_FILE
+
+STATE_PATH = 'data/pipeline_state.json'
+
+DEFAULT_CONFIG = {'n_wells': 150, 'seed': 42, 'ts_window_days': 30,
+                  'spatial_fields': False, 'variogram_range_km': DEFAULT_VARIOGRAM_RANGE_KM}
+
+BRONZE_FILES = [
+    WELLS_FILE,
+    'data/bronze/reservoir_properties.csv',
+    'data/bronze/fracturing_jobs.csv',
+    'data/bronze/production_data.csv',
+]
+
+
+def _feature_table_path() -> str:
+    from src.feature_store import feature_table_path
+    return feature_table_path(WELLS_FILE)
+
+
+def _ts_feature_path(window_days: int) -> str:
+    from src.ts_features import ts_feature_path
+    return ts_feature_path(window_days)
+
+
+# name -> deps (upstream stages whose outputs are inputs), config keys,
+# code files and outputs; outputs may be files or directories
+STAGES: Dict[str, Dict] = {
+    'bronze': {
+        'deps': [],
+        'config': ['n_wells', 'seed', 'spatial_fields', 'variogram_range_km'],
+        'code': ['src/generate_data.py', 'src/production_store.py', 'src/random_fields.py'],
+        'outputs': lambda config: BRONZE_FILES + [PRODUCTION_STORE_DIR],
+    },
+    'silver_features': {
+        'deps': ['bronze'],
+        'config': [],
+        'code': ['src/features.py', 'src/feature_store.py'],
+        'outputs': lambda config: [_feature_table_path()],
+    },
+    'silver_spatial': {
+        'deps': ['bronze'],
+        'config': [],
+        'code': ['src/spatial.py'],
+        'outputs': lambda config: ['data/silver/well_index.pkl', 'data/silver/offset_features.parquet'],
+    },
+    'silver_ts': {
+        'deps': ['bronze'],
+        'config': ['ts_window_days'],
+        'code': ['src/ts_features.py'],
+        'outputs': lambda config: [_ts_feature_path(config['ts_window_days'])],
+    },
+    'gold': {
+        'deps': ['bronze', 'silver_features'],
+        'config': [],
+        'code': ['src/gold.py'],
+        'outputs': lambda config: [gold_path(name) for name in GOLD_TABLES],
+    },
+    'model': {
+        'deps': ['bronze', 'silver_features'],
+        'config': [],
+        'code': ['src/ml_pipeline.py', 'src/features.py', 'src/model_registry.py'],
+        'outputs': lambda config: ['models/production_model.pkl'],
+    },
+    'anomaly': {
+        'deps': ['bronze', 'silver_features'],
+        'config': [],
+        'code': ['src/anomaly.py', 'src/features.py'],
+        'outputs': lambda config: ['models/anomaly_model.pkl', 'models/anomaly_scores.parquet'],
+    },
+}
+
+
+# Stage bodies run in worker processes; imports are local so each worker
+# only loads what its stage needs
+
+def _run_bronze(config: Dict) -> str:
+    import numpy as np
+    from faker import Faker
+    from src.generate_data import SyntheticDataGenerator
+
+    # Reseed so identical configs reproduce identical bronze files
+    np.random.seed(config['seed'])
+    Faker.seed(config['seed'])
+    generator = SyntheticDataGenerator(n_wells=config['n_wells'], spatial_fields=config['spatial_fields'],
+                                       variogram_range_km=config['variogram_range_km'])
+    datasets = generator.generate_bronze()
+    return f"{len(datasets['master'])} wells"
+
+
+def _run_silver_features(config: Dict) -> str:
+    from src.feature_store import materialize_features
+    from src.utils import load_dataframe
+
+    table = materialize_features(load_dataframe(WELLS_FILE), WELLS_FILE)
+    return f"{table.shape[1] - 1} features"
+
+
+def _run_silver_spatial(config: Dict) -> str:
+    from src.spatial import materialize_spatial
+    from src.utils import load_dataframe
+
+    features = materialize_spatial(load_dataframe(WELLS_FILE), WELLS_FILE)
+    return f"{len(features)} wells"
+
+
+def _run_silver_ts(config: Dict) -> str:
+    from src.ts_features import load_or_extract_ts_features
+
+    table = load_or_extract_ts_features(config['ts_window_days'], n_workers=1)
+    return f"{len(table)} wells × {table.shape[1] - 1} features"
+
+
+def _run_gold(config: Dict) -> str:
+    from src.gold import build_gold
+
+    status = build_gold(WELLS_FILE, force=True)
+    return f"{len(status)} tables"
+
+
+def _run_model(config: Dict) -> str:
+    from src.feature_store import load_feature_table
+    from src.ml_pipeline import ProductionMLPipeline
+    from src.model_registry import register_model
+    from src.utils import load_dataframe
+
+    df = load_dataframe(WELLS_FILE)
+    pipeline = ProductionMLPipeline()
+    metrics = pipeline.train_model(df, features=load_feature_table(WELLS_FILE))
+    entry = register_model(pipeline, df, metrics)
+    return f"{entry['version']}, test R² {metrics['test_r2']:.3f}"
+
+
+def _run_anomaly(config: Dict) -> str:
+    from src.anomaly import anomaly_summary, fit_anomaly_model, load_or_score_anomalies
+
+    fit_anomaly_model()
+    summary = anomaly_summary(load_or_score_anomalies())
+    return f"{summary['n_anomalies']} anomalies"
+
+
+def _run_stage(name: str, config: Dict):
+    """Worker entry point: run one stage by name; returns (summary, elapsed seconds, spans)"""
+    # Pool workers are reused across stages; return only this stage's spans
+    RECORDER.clear()
+    start = time.perf_counter()
+    with span(f'pipeline.{name}'):
+        summary = globals()[f'_run_{name}'](config)
+    return summary, time.perf_counter() - start, RECORDER.records()
+
+
+def _hash_file(path: str, memo: Dict) -> str:
+    """sha256 of a file's bytes, reused from ``memo`` while size and mtime are unchanged"""
+    stat = os.stat(path)
+    cached = memo.get(path)
+    if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+        return cached['sha256']
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    memo[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+    return memo[path]['sha256']
+
+
+def _files(path: str) -> List[str]:
+    if os.path.isdir(path):
+        return sorted(os.path.join(root, f) for root, _, files in os.walk(path) for f in files)
+    return [path]
+
+
+def content_hash(paths: List[str], memo: Dict) -> str:
+    """Combined hash of files and directory trees, or None if any is missing"""
+    digest = hashlib.sha256()
+    for path in paths:
+        if not os.path.exists(path):
+            return None
+        for f in _files(path):
+            digest.update(f.encode())
+            digest.update(_hash_file(f, memo).encode())
+    return digest.hexdigest()
+
+
+def _stage_settings(name: str, config: Dict) -> Dict:
+    """Config values a stage depends on; the variogram range only counts with spatial fields on"""
+    settings = {k: config[k] for k in STAGES[name]['config']}
+    if 'spatial_fields' in settings and not settings['spatial_fields']:
+        settings.pop('variogram_range_km', None)
+    return settings
+
+
+def _input_hash(name: str, config: Dict, memo: Dict) -> str:
+    """Hash of a stage's config keys, code and upstream outputs"""
+    stage = STAGES[name]
+    upstream = [p for dep in stage['deps'] for p in STAGES[dep]['outputs'](config)]
+    files_hash = content_hash(stage['code'] + upstream, memo)
+    if files_hash is None:
+        return None
+    settings = json.dumps(_stage_settings(name, config), sort_keys=True)
+    return hashlib.sha256((settings + files_hash).encode()).hexdigest()
+
+
+def load_state(path: str = STATE_PATH) -> Dict:
+    if not os.path.exists(path):
+        return {'stages': {}, 'file_hashes': {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_state(state: Dict, path: str = STATE_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def _with_upstream(targets: List[str]) -> List[str]:
+    """Targets and everything they depend on, in declaration (topological) order"""
+    needed = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(STAGES[name]['deps'])
+    return [name for name in STAGES if name in needed]
+
+
+def is_up_to_date(name: str, config: Dict, state: Dict) -> bool:
+    """Whether a stage's inputs and outputs still match its last recorded run"""
+    record = state['stages'].get(name)
+    if not record:
+        return False
+    memo = state['file_hashes']
+    return (record['input_hash'] == _input_hash(name, config, memo)
+            and record['output_hash'] == content_hash(STAGES[name]['outputs'](config), memo))
+
+
+def run_pipeline(targets: List[str] = None, config: Dict = None, force: bool = False,
+                 n_workers: int = None, state_path: str = STATE_PATH) -> Dict[str, str]:
+    """Run ``targets`` (all stages by default) and their upstream stages
+
+    A stage is ready once its upstream stages have finished; it is then
+    skipped if its input hash (config, code and upstream output contents)
+    and output hash match the last recorded run, otherwise submitted to the
+    process pool. Ready stages run concurrently. Because hashes are of
+    content, a stage that rewrites identical outputs does not invalidate
+    its downstream stages. Returns each stage's status.
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    stages = _with_upstream(targets or list(STAGES))
+    state = load_state(state_path)
+    memo = state['file_hashes']
+    status: Dict[str, str] = {}
+    running = {}
+    start = time.perf_counter()
+
+    n_workers = max(1, n_workers or min(os.cpu_count() or 1, len(stages)))
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        while True:
+            for name in stages:
+                if name in status or name in running.values():
+                    continue
+                deps = STAGES[name]['deps']
+                if any(status.get(d) in ('failed', 'blocked') for d in deps if d in stages):
+                    status[name] = 'blocked'
+                    continue
+                if not all(status.get(d) in ('ran', 'skipped') for d in deps if d in stages):
+                    continue
+                if not force and is_up_to_date(name, config, state):
+                    status[name] = 'skipped'
+                    print(f"⏭️ {name}: up to date")
+                    continue
+                print(f"▶️ {name}: running")
+                running[executor.submit(_run_stage, name, config)] = name
+
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    summary, elapsed, spans = future.result()
+                except Exception as exc:
+                    status[name] = 'failed'
+                    print(f"❌ {name}: {exc!r}")
+                    continue
+                status[name] = 'ran'
+                RECORDER.extend(spans)
+                state['stages'][name] = {
+                    'input_hash': _input_hash(name, config, memo),
+                    'output_hash': content_hash(STAGES[name]['outputs'](config), memo),
+                    'config': _stage_settings(name, config),
+                    'summary': summary,
+                    'elapsed_s': round(elapsed, 3),
+                    'finished_at': datetime.now().isoformat(timespec='seconds'),
+                }
+                _save_state(state, state_path)
+                print(f"✅ {name}: {summary} ({elapsed:.1f}s)")
+
+    _save_state(state, state_path)
+    print(f"⏱️ Pipeline finished in {time.perf_counter() - start:.1f}s")
+    return status
+
+
+def pipeline_status(config: Dict = None, state_path: str = STATE_PATH) -> List[Dict]:
+    """Per-stage freshness and last-run details"""
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    state = load_state(state_path)
+    rows = []
+    for name in STAGES:
+        record = state['stages'].get(name, {})
+        rows.append({
+            'stage': name,
+            'up_to_date': is_up_to_date(name, config, state),
+            'finished_at': record.get('finished_at'),
+            'elapsed_s': record.get('elapsed_s'),
+            'summary': record.get('summary'),
+        })
+    _save_state(state, state_path)
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Run the medallion pipeline incrementally")
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('run', help="Run stale stages (and their upstream stages)")
+    run.add_argument('stages', nargs='*', help=f"Target stages (default: all of {', '.join(STAGES)})")
+    run.add_argument('--force', action='store_true', help="Rerun the selected stages even if up to date")
+    run.add_argument('--workers', type=int, default=None)
+    run.add_argument('--spans', action='store_true', help=f"Append stage spans to {SPANS_PATH}")
+    status = sub.add_parser('status', help="Show which stages are up to date")
+    for command in (run, status):
+        command.add_argument('--n-wells', type=int, default=DEFAULT_CONFIG['n_wells'])
+        command.add_argument('--seed', type=int, default=DEFAULT_CONFIG['seed'])
+        command.add_argument('--spatial-fields', action='store_true',
+                             help="Draw reservoir properties from Gaussian random fields")
+        command.add_argument('--variogram-range-km', type=float, default=DEFAULT_CONFIG['variogram_range_km'])
+    args = parser.parse_args()
+
+    config = {'n_wells': args.n_wells, 'seed': args.seed, 'spatial_fields': args.spatial_fields,
+              'variogram_range_km': args.variogram_range_km}
+    if args.command == 'run':
+        unknown = [s for s in args.stages if s not in STAGES]
+        if unknown:
+            parser.error(f"unknown stages: {', '.join(unknown)}")
+        result = run_pipeline(args.stages or None, config, force=args.force, n_workers=args.workers)
+        if args.spans:
+            RECORDER.to_jsonl(SPANS_PATH)
+            print(f"✅ Saved spans to {SPANS_PATH}")
+        sys.exit(1 if any(s in ('failed', 'blocked') for s in result.values()) else 0)
+    for row in pipeline_status(config):
+        mark = '✅' if row['up_to_date'] else '⚠️'
+        print(f"{mark} {row['stage']:<16} {row['finished_at'] or '-':<20} {row['summary'] or ''}")
@@ -0,0 +1,143 @@
+"""
+Daily Production Time-Series Store
+Memory-mapped per-well daily rates with prefix sums for O(1) cumulative and window queries
+"""
+
+import json
+import os
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+PRODUCTION_STORE_DIR = 'data/bronze/daily_production'
+
+
+class ProductionStore:
+    """Ragged daily oil rates for many wells, memory-mapped from disk
+
+    Rates for all wells are concatenated into one float32 ``values`` array;
+    well ``i`` owns ``values[offsets[i]:offsets[i + 1]]`` (day 1 first).
+    ``prefix`` holds each well's running sum (float64) in the same layout,
+    so cumulative production to day N is a single lookup per well and a
+    window total is the difference of two. Arrays are opened with
+    ``mmap_mode='r'``: queries gather only the cells they touch and
+    per-well histories are returned as views.
+    """
+
+    def __init__(self, directory: str = PRODUCTION_STORE_DIR):
+        self.directory = directory
+        self.well_ids = np.load(os.path.join(directory, 'well_ids.npy'))
+        self.offsets = np.load(os.path.join(directory, 'offsets.npy'))
+        self.values = np.load(os.path.join(directory, 'values.npy'), mmap_mode='r')
+        self.prefix = np.load(os.path.join(directory, 'prefix.npy'), mmap_mode='r')
+        self.lengths = np.diff(self.offsets)
+        self._rows = {well_id: i for i, well_id in enumerate(self.well_ids)}
+
+    @classmethod
+    def write(cls, well_ids: Iterable[str], lengths: np.ndarray, chunks: Iterable[np.ndarray],
+              directory: str = PRODUCTION_STORE_DIR) -> 'ProductionStore':
+        """Write a store from (wells × days) rate blocks given in well order
+
+        Each block may be padded beyond a well's length; only the first
+        ``lengths[i]`` days of row ``i`` are kept.
+        """
+        os.makedirs(directory, exist_ok=True)
+        well_ids = np.asarray(well_ids).astype(str)
+        lengths = np.asarray(lengths, dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+
+        values = np.lib.format.open_memmap(os.path.join(directory, 'values.npy'), mode='w+',
+                                           dtype=np.float32, shape=(int(offsets[-1]),))
+        prefix = np.lib.format.open_memmap(os.path.join(directory, 'prefix.npy'), mode='w+',
+                                           dtype=np.float64, shape=(int(offsets[-1]),))
+        row = 0
+        for block in chunks:
+            block_lengths = lengths[row:row + len(block)]
+            keep = np.arange(block.shape[1])[None, :] < block_lengths[:, None]
+            start, end = offsets[row], offsets[row + len(block)]
+            values[start:end] = block[keep]
+            prefix[start:end] = np.cumsum(block, axis=1, dtype=np.float64)[keep]
+            row += len(block)
+        if row != len(well_ids):
+            raise ValueError(f"Expected rates for {len(well_ids)} wells, got {row}")
+        values.flush()
+        prefix.flush()
+        del values, prefix
+
+        np.save(os.path.join(directory, 'well_ids.npy'), well_ids)
+        np.save(os.path.join(directory, 'offsets.npy'), offsets)
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump({'n_wells': len(well_ids), 'n_days': int(offsets[-1]), 'units': 'm3/day'}, f, indent=2)
+        print(f"✅ Saved {offsets[-1]:,} daily rates for {len(well_ids)} wells to {directory}")
+        return cls(directory)
+
+    def rows(self, well_ids: Iterable[str] = None) -> np.ndarray:
+        """Row positions of ``well_ids`` (all wells if omitted)"""
+        if well_ids is None:
+            return np.arange(len(self.well_ids))
+        return np.array([self._rows[w] for w in well_ids], dtype=np.int64)
+
+    def history(self, well_id: str) -> np.ndarray:
+        """Daily rates of one well (read-only view into the memory map)"""
+        i = self._rows[well_id]
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+    def window(self, days: int, rows: np.ndarray = None, start_day: int = 0) -> np.ndarray:
+        """(wells × days) rates for days ``start_day + 1`` .. ``start_day + days``, NaN past each history"""
+        rows = self.rows() if rows is None else rows
+        day_index = start_day + np.arange(days)[None, :]
+        observed = day_index < self.lengths[rows, None]
+        index = self.offsets[rows, None] + np.where(observed, day_index, 0)
+        return np.where(observed, self.values[np.minimum(index, len(self.values) - 1)], np.nan)
+
+    def cumulative(self, day: int, rows: np.ndarray = None) -> np.ndarray:
+        """Cumulative production (m³) to the end of ``day`` for each well
+
+        NaN for wells with fewer than ``day`` days of history.
+        """
+        rows = self.rows() if rows is None else rows
+        lengths = self.lengths[rows]
+        if day <= 0:
+            return np.zeros(len(rows))
+        observed = lengths >= day
+        index = self.offsets[rows] + np.minimum(day, np.maximum(lengths, 1)) - 1
+        return np.where(observed, self.prefix[index], np.nan)
+
+    def total(self, rows: np.ndarray = None) -> np.ndarray:
+        """Cumulative production (m³) over each well's full history"""
+        rows = self.rows() if rows is None else rows
+        return np.where(self.lengths[rows] > 0, self.prefix[np.maximum(self.offsets[rows + 1] - 1, 0)], 0.0)
+
+    def window_rate(self, start_day: int, end_day: int, rows: np.ndarray = None) -> np.ndarray:
+        """Average daily rate over days ``start_day + 1`` .. ``end_day``"""
+        total = self.cumulative(end_day, rows) - self.cumulative(start_day, rows)
+        return total / (end_day - start_day)
+
+    def cumulative_table(self, days: List[int], well_ids: Iterable[str] = None) -> pd.DataFrame:
+        """``cum_oil_<N>_days_m3`` columns for the requested horizons"""
+        rows = self.rows(well_ids)
+        table = pd.DataFrame({'well_id': self.well_ids[rows]})
+        for day in days:
+            table[f'cum_oil_{day}_days_m3'] = self.cumulative(day, rows)
+        return table
+
+    def summary(self) -> Dict:
+        return {
+            'n_wells': len(self.well_ids),
+            'n_days': int(self.offsets[-1]),
+            'min_days': int(self.lengths.min()) if len(self.lengths) else 0,
+            'max_days': int(self.lengths.max()) if len(self.lengths) else 0,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query cumulative production from the daily store")
+    parser.add_argument('days', type=int, nargs='+', help="Horizons in days, e.g. 30 180 720")
+    args = parser.parse_args()
+
+    store = ProductionStore()
+    print(store.summary())
+    print(store.cumulative_table(args.days).describe().to_string())
@@ -0,0 +1,129 @@
+"""
+Embedded SQL Query Layer
+DuckDB views over the bronze, silver and gold files, queried in place without pandas loads
+"""
+
+import os
+from typing import Dict, List, Sequence
+
+import duckdb
+import pandas as pd
+
+from src.feature_store import feature_table_path
+from src.gold import GOLD_TABLES, gold_path
+from src.spatial import OFFSET_FEATURES_PATH
+from src.utils import WELLS_FILE
+
+
+def medallion_views(source_path: str = WELLS_FILE) -> Dict[str, str]:
+    """View name -> data file for every layer"""
+    views = {
+        'wells': source_path,
+        'reservoir': 'data/bronze/reservoir_properties.csv',
+        'fracturing': 'data/bronze/fracturing_jobs.csv',
+        'production': 'data/bronze/production_data.csv',
+        'features': feature_table_path(source_path),
+        'offset_features': OFFSET_FEATURES_PATH,
+    }
+    views.update({f'gold_{name}': gold_path(name) for name in GOLD_TABLES})
+    return views
+
+
+def _scan(path: str) -> str:
+    reader = 'read_parquet' if path.endswith('.parquet') else 'read_csv_auto'
+    return f"{reader}('{path}')"
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class QueryEngine:
+    """In-process DuckDB connection with one view per medallion file
+
+    Views are lazy: files are scanned when queried, so regenerated data is
+    picked up without re-registering, and filters, aggregations and joins
+    run vectorized (and out-of-core) inside DuckDB. Each query runs on its
+    own cursor, so one engine can be shared across threads.
+    """
+
+    def __init__(self, source_path: str = WELLS_FILE, database: str = ':memory:'):
+        self.source_path = source_path
+        self.connection = duckdb.connect(database)
+        self.views: Dict[str, str] = {}
+        self.refresh()
+
+    def refresh(self):
+        """(Re)register views for the data files that currently exist"""
+        for name, path in medallion_views(self.source_path).items():
+            if os.path.exists(path):
+                self.connection.execute(f"CREATE OR REPLACE VIEW {name} AS SELECT * FROM {_scan(path)}")
+                self.views[name] = path
+
+    def query(self, sql: str, params: Sequence = None) -> pd.DataFrame:
+        """Run SQL and return the (usually small) result as a DataFrame"""
+        cursor = self.connection.cursor()
+        try:
+            return cursor.execute(sql, params or []).df()
+        finally:
+            cursor.close()
+
+    def columns(self, view: str) -> pd.DataFrame:
+        """Column names and DuckDB types of a view"""
+        return self.query(f"DESCRIBE {view}")[['column_name', 'column_type']]
+
+    def numeric_columns(self, view: str) -> List[str]:
+        numeric = ('TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT', 'FLOAT', 'DOUBLE', 'DECIMAL')
+        columns = self.columns(view)
+        return columns.loc[columns['column_type'].str.startswith(numeric), 'column_name'].tolist()
+
+    def row_count(self, view: str) -> int:
+        return int(self.query(f"SELECT count(*) AS n FROM {view}")['n'].iloc[0])
+
+    def null_counts(self, view: str) -> pd.Series:
+        """Missing values per column, computed in one scan"""
+        columns = self.columns(view)['column_name'].tolist()
+        select = ', '.join(f"count(*) - count({_quote(c)}) AS {_quote(c)}" for c in columns)
+        return self.query(f"SELECT {select} FROM {view}").iloc[0].astype(int)
+
+    def group_stats(self, view: str, by: str, value: str, where: str = None,
+                    params: Sequence = None) -> pd.DataFrame:
+        """Count, mean and P10/P50/P90 of ``value`` per ``by`` group"""
+        where_sql = f"WHERE {where}" if where else ""
+        return self.query(f"""
+            SELECT {_quote(by)}, count(*) AS n_wells, avg({_quote(value)}) AS mean,
+                   quantile_cont({_quote(value)}, 0.1) AS p10,
+                   quantile_cont({_quote(value)}, 0.5) AS p50,
+                   quantile_cont({_quote(value)}, 0.9) AS p90
+            FROM {view} {where_sql}
+            GROUP BY 1 ORDER BY 1
+        """, params)
+
+    def zscore_outliers(self, view: str, threshold: float = 3.0) -> pd.Series:
+        """Per-column count of values more than ``threshold`` population std-devs from the mean"""
+        columns = self.numeric_columns(view)
+        if not columns:
+            return pd.Series(dtype=int)
+        stats = self.query("SELECT " + ', '.join(
+            f"avg({_quote(c)}) AS {_quote(c + '__mean')}, stddev_pop({_quote(c)}) AS {_quote(c + '__std')}"
+            for c in columns
+        ) + f" FROM {view}").iloc[0]
+
+        counts = []
+        for c in columns:
+            mean, std = float(stats[c + '__mean']), float(stats[c + '__std'])
+            if pd.isna(std) or std == 0:
+                counts.append(f"0 AS {_quote(c)}")
+            else:
+                counts.append(f"count(*) FILTER (WHERE abs({_quote(c)} - {mean!r}) / {std!r} > {threshold!r}) "
+                              f"AS {_quote(c)}")
+        return self.query(f"SELECT {', '.join(counts)} FROM {view}").iloc[0].astype(int)
+
+
+if __name__ == "__main__":
+    import sys
+
+    engine = QueryEngine()
+    print(f"Views: {', '.join(engine.views)}")
+    sql = ' '.join(sys.argv[1:]) or "SELECT formation, count(*) AS n_wells FROM wells GROUP BY 1"
+    print(engine.query(sql).to_string(index=False))
@@ -0,0 +1,144 @@
+"""
+Segmented Production Models
+Trains one production model per formation (or any grouping column) in parallel
+"""
+
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.ml_pipeline import ProductionMLPipeline
+from src.utils import limit_worker_threads
+
+SEGMENTED_MODEL_PATH = 'models/segmented_model.pkl'
+
+# Key under which the all-wells fallback model is stored
+GLOBAL_SEGMENT = '__global__'
+
+
+def _train_segment(segment: str, df: pd.DataFrame, features: pd.DataFrame, target_column: str,
+                   params: Dict, thread_count: int) -> Tuple[str, ProductionMLPipeline, Dict]:
+    pipeline = ProductionMLPipeline(target_column=target_column)
+    metrics = pipeline.train_model(
+        df, {'thread_count': thread_count, 'allow_writing_files': False, **(params or {})}, features
+    )
+    summary = {k: metrics[k] for k in ('train_r2', 'test_r2', 'test_rmse', 'test_mae')}
+    return segment, pipeline, summary
+
+
+class SegmentedMLPipeline:
+    """One ProductionMLPipeline per segment, plus a global fallback model
+
+    Segments with fewer than ``min_segment_size`` wells, and segments not
+    seen during training, are scored by the global model.
+    """
+
+    def __init__(self, segment_column: str = 'formation',
+                 target_column: str = 'cum_oil_180_days_m3', min_segment_size: int = 30):
+        self.segment_column = segment_column
+        self.target_column = target_column
+        self.min_segment_size = min_segment_size
+        self.models: Dict[str, ProductionMLPipeline] = {}
+        self.segments: List[str] = []
+
+    def train_model(self, df: pd.DataFrame, params: Dict = None, features: pd.DataFrame = None,
+                    n_workers: int = None) -> pd.DataFrame:
+        """Train all segment models concurrently and return per-segment metrics"""
+        counts = df[self.segment_column].value_counts()
+        segments = sorted(counts[counts >= self.min_segment_size].index)
+
+        jobs = [(GLOBAL_SEGMENT, df)] + [
+            (segment, df[df[self.segment_column] == segment]) for segment in segments
+        ]
+        n_workers = n_workers or max(1, min(len(jobs), os.cpu_count() or 1))
+        thread_count = max(1, (os.cpu_count() or 1) // n_workers)
+
+        print(f"🧩 Training {len(jobs)} models on '{self.segment_column}' "
+              f"({n_workers} workers × {thread_count} threads)")
+
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=limit_worker_threads,
+                                 initargs=(thread_count,)) as executor:
+            futures = [
+                executor.submit(_train_segment, segment, frame, features,
+                                self.target_column, params, thread_count)
+                for segment, frame in jobs
+            ]
+            results = [future.result() for future in futures]
+
+        self.models = {segment: pipeline for segment, pipeline, _ in results}
+        self.segments = segments
+
+        return pd.DataFrame([
+            {'segment': segment, 'n_wells': len(frame), **summary}
+            for (segment, frame), (_, _, summary) in zip(jobs, results)
+        ])
+
+    def segment_codes(self, df: pd.DataFrame) -> np.ndarray:
+        """Index of each row's segment in ``self.segments`` (-1 routes to the global model)"""
+        return pd.Categorical(df[self.segment_column], categories=self.segments).codes
+
+    def predict_cum_oil(self, df: pd.DataFrame) -> np.ndarray:
+        """Route each well to its segment model and predict in one call per segment"""
+        codes = self.segment_codes(df)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(-1, len(self.segments) + 1))
+
+        transforms = [self.models[GLOBAL_SEGMENT].compile_transform()] + [
+            self.models[segment].compile_transform() for segment in self.segments
+        ]
+        columns = list(dict.fromkeys(c for t in transforms for c in t.input_columns))
+        raw = df.reindex(columns=columns).to_numpy(dtype=np.float64)[order]
+        col_index = {c: i for i, c in enumerate(columns)}
+
+        preds = np.empty(len(df), dtype=np.float64)
+        for k, transform in enumerate(transforms):
+            start, end = bounds[k], bounds[k + 1]
+            if start == end:
+                continue
+            pipeline = self.models[GLOBAL_SEGMENT if k == 0 else self.segments[k - 1]]
+            block = raw[start:end][:, [col_index[c] for c in transform.input_columns]]
+            preds[order[start:end]] = pipeline.predict_array(transform(block))
+        return preds
+
+    def save(self, path: str = SEGMENTED_MODEL_PATH):
+        """Persist all segment models"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump(self, f)
+        print(f"✅ Saved segmented model to {path}")
+
+    @classmethod
+    def load(cls, path: str = SEGMENTED_MODEL_PATH) -> 'SegmentedMLPipeline':
+        """Load a segmented model persisted with ``save``"""
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+
+def main():
+    """Command-line entry point: train and save one model per segment"""
+    import argparse
+
+    from src.feature_store import load_feature_table
+    from src.utils import WELLS_FILE, load_dataframe
+
+    parser = argparse.ArgumentParser(description="Train one production model per segment")
+    parser.add_argument('--segment-column', default='formation')
+    parser.add_argument('--min-segment-size', type=int, default=30)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    df = load_dataframe(WELLS_FILE)
+    segmented = SegmentedMLPipeline(args.segment_column, min_segment_size=args.min_segment_size)
+    report = segmented.train_model(df, features=load_feature_table(WELLS_FILE), n_workers=args.workers)
+    print(report.to_string(index=False))
+    segmented.save()
+
+
+if __name__ == "__main__":
+    # Pickled segment models must reference src.segmented, not __main__
+    import src.segmented
+    src.segmented.main()
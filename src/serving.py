@@ -0,0 +1,207 @@
+"""
+Low-latency HTTP Scoring Service
+Serves ProductionMLPipeline predictions with request micro-batching
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from src.ml_pipeline import MODEL_PATH, ProductionMLPipeline
+
+
+class MicroBatcher:
+    """Coalesce concurrent scoring requests into single model calls
+
+    The worker thread blocks for the first request, then keeps collecting
+    requests until ``window_ms`` has elapsed or ``max_batch_rows`` rows are
+    queued, and scores the stacked matrix with one ``predict_fn`` call.
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray],
+                 window_ms: float = 2.0, max_batch_rows: int = 512):
+        self.predict_fn = predict_fn
+        self.window_s = window_ms / 1000.0
+        self.max_batch_rows = max_batch_rows
+        self._queue = queue.Queue()
+        self._closed = threading.Event()
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, X: np.ndarray) -> Future:
+        """Queue a model matrix for scoring and return a future of predictions"""
+        if self._closed.is_set():
+            raise RuntimeError("Micro-batcher is closed")
+        future = Future()
+        self._queue.put((X, future))
+        return future
+
+    def close(self):
+        """Stop the worker thread once every request queued before the call is scored"""
+        self._closed.set()
+        self._queue.put(None)
+        self._worker.join()
+        # Requests that raced past the closed check land behind the sentinel
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[1].set_exception(RuntimeError("Micro-batcher is closed"))
+
+    def _collect(self, first) -> Tuple[List, bool]:
+        """Batch of queued requests, and whether the stop sentinel was reached"""
+        batch = [first]
+        n_rows = first[0].shape[0]
+        deadline = time.perf_counter() + self.window_s
+        while n_rows < self.max_batch_rows:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+            n_rows += item[0].shape[0]
+        return batch, False
+
+    def _score(self, batch: List):
+        try:
+            preds = self.predict_fn(np.vstack([X for X, _ in batch]))
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        start = 0
+        for X, future in batch:
+            future.set_result(preds[start:start + X.shape[0]])
+            start += X.shape[0]
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stopping = self._collect(first)
+            self._score(batch)
+
+
+class ScoringService:
+    """Model loaded once, with precompiled features and a micro-batcher"""
+
+    def __init__(self, model_path: str = MODEL_PATH, window_ms: float = 2.0,
+                 max_batch_rows: int = 512):
+        self.pipeline = ProductionMLPipeline.load(model_path)
+        self.transform = self.pipeline.compile_transform()
+        self.batcher = MicroBatcher(self.pipeline.predict_array, window_ms, max_batch_rows)
+
+        # Warm up CatBoost so the first request does not pay initialization cost
+        self.pipeline.predict_array(self.transform(np.zeros((1, len(self.transform.input_columns)))))
+
+    def score(self, wells: List[Dict], timeout: float = 5.0) -> np.ndarray:
+        """Score a list of well records"""
+        if not wells:
+            return np.empty(0)
+        X = self.transform(self.transform.rows_to_array(wells))
+        return self.batcher.submit(X).result(timeout=timeout)
+
+    def close(self):
+        self.batcher.close()
+
+
+class ScoringHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server with a listen backlog sized for bursty clients"""
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def _make_handler(service: ScoringService):
+
+    class ScoringHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send_json(self, status: int, payload: Dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, {
+                    'status': 'ok',
+                    'target': service.pipeline.target_column,
+                    'input_columns': service.transform.input_columns
+                })
+            else:
+                self._send_json(404, {'error': f'Unknown path: {self.path}'})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._send_json(404, {'error': f'Unknown path: {self.path}'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                if not isinstance(payload, dict):
+                    raise ValueError("Expected a JSON object: a well or {\"wells\": [...]}")
+                wells = payload['wells'] if 'wells' in payload else [payload]
+                if not isinstance(wells, list) or not all(isinstance(well, dict) for well in wells):
+                    raise ValueError("'wells' must be a list of JSON objects")
+                preds = service.score(wells)
+            except (ValueError, KeyError, TypeError) as exc:
+                self._send_json(400, {'error': str(exc)})
+                return
+            except Exception as exc:
+                # e.g. a batcher timeout or a model error; answer instead of dropping the connection
+                self._send_json(500, {'error': f'{type(exc).__name__}: {exc}'})
+                return
+            self._send_json(200, {
+                'target': service.pipeline.target_column,
+                'predictions': preds.tolist()
+            })
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoringHandler
+
+
+def serve(model_path: str = MODEL_PATH, host: str = '0.0.0.0', port: int = 8080,
+          window_ms: float = 2.0, max_batch_rows: int = 512):
+    """Run the scoring service until interrupted"""
+    service = ScoringService(model_path, window_ms, max_batch_rows)
+    server = ScoringHTTPServer((host, port), _make_handler(service))
+    print(f"🚀 Scoring service on http://{host}:{port} (batch window {window_ms} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve production predictions over HTTP")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--window-ms', type=float, default=2.0)
+    parser.add_argument('--max-batch-rows', type=int, default=512)
+    args = parser.parse_args()
+    serve(args.model, args.host, args.port, args.window_ms, args.max_batch_rows)
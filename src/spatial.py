@@ -0,0 +1,198 @@
+"""
+Spatial Index over Well Locations
+KD-tree on unit-sphere coordinates for nearest-well queries and offset-well features
+"""
+
+import json
+import os
+import pickle
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils import WELLS_FILE, ensure_data_dirs, file_signature, load_dataframe
+
+SPATIAL_INDEX_PATH = 'data/silver/well_index.pkl'
+OFFSET_FEATURES_PATH = 'data/silver/offset_features.parquet'
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Widest k-nearest query before offset features fall back to a direct search
+MAX_KNN_CANDIDATES = 2048
+
+
+def to_unit_vectors(latitude, longitude) -> np.ndarray:
+    """(n, 3) Cartesian points on the unit sphere"""
+    lat, lon = np.radians(np.asarray(latitude, dtype=np.float64)), np.radians(np.asarray(longitude, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_km(chord: np.ndarray) -> np.ndarray:
+    """Great-circle distance for a unit-sphere chord length"""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1.0))
+
+
+def km_to_chord(km: float) -> float:
+    return 2 * np.sin(km / (2 * EARTH_RADIUS_KM))
+
+
+class WellSpatialIndex:
+    """Nearest-neighbour and radius queries over well surface locations
+
+    Coordinates are mapped to 3D points on the unit sphere, where straight
+    chord distance orders neighbours exactly like great-circle distance,
+    so a plain KD-tree answers haversine queries; distances are converted
+    back to kilometres on the way out.
+    """
+
+    def __init__(self, well_ids, latitude, longitude):
+        from scipy.spatial import cKDTree
+        
+        self.well_ids = np.asarray(well_ids)
+        self.points = to_unit_vectors(latitude, longitude)
+        self.tree = cKDTree(self.points)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'WellSpatialIndex':
+        return cls(df['well_id'], df['latitude'], df['longitude'])
+
+    def knn(self, latitude, longitude, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Distances (km) and row indices of the ``k`` nearest wells to each point"""
+        k = min(k, len(self.well_ids))
+        chord, idx = self.tree.query(to_unit_vectors(latitude, longitude), k=k, workers=-1)
+        return chord_to_km(chord.reshape(len(idx), -1)), idx.reshape(len(idx), -1)
+
+    def radius(self, latitude, longitude, radius_km: float) -> List[np.ndarray]:
+        """Row indices of wells within ``radius_km`` of each point"""
+        return list(self.tree.query_ball_point(
+            to_unit_vectors(latitude, longitude), km_to_chord(radius_km), workers=-1
+        ))
+
+    def count_within(self, latitude, longitude, radius_km: float) -> np.ndarray:
+        """Number of wells within ``radius_km`` of each point"""
+        return self.tree.query_ball_point(
+            to_unit_vectors(latitude, longitude), km_to_chord(radius_km),
+            workers=-1, return_length=True
+        )
+
+    def save(self, path: str = SPATIAL_INDEX_PATH, source_path: str = None):
+        ensure_data_dirs()
+        with open(path, 'wb') as f:
+            pickle.dump(self, f)
+        with open(path.replace('.pkl', '.json'), 'w') as f:
+            json.dump({
+                'n_wells': len(self.well_ids),
+                'source': file_signature(source_path) if source_path else None
+            }, f, indent=2)
+        print(f"✅ Saved spatial index for {len(self.well_ids)} wells to {path}")
+
+    @classmethod
+    def load(cls, path: str = SPATIAL_INDEX_PATH) -> 'WellSpatialIndex':
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+
+def load_or_build_index(source_path: str = WELLS_FILE,
+                        path: str = SPATIAL_INDEX_PATH) -> WellSpatialIndex:
+    """Persisted index for ``source_path``, rebuilt only when the source changed"""
+    manifest_path = path.replace('.pkl', '.json')
+    if os.path.exists(path) and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f).get('source') == file_signature(source_path):
+                return WellSpatialIndex.load(path)
+
+    index = WellSpatialIndex.from_dataframe(load_dataframe(source_path))
+    index.save(path, source_path)
+    return index
+
+
+def offset_well_features(df: pd.DataFrame, index: WellSpatialIndex = None, k: int = 5,
+                         radius_km: float = 2.0,
+                         production_column: str = 'cum_oil_180_days_m3') -> pd.DataFrame:
+    """Per-well offset (neighbour) features, in the row order of ``df``
+
+    Parent wells are neighbours completed before the well. Candidates come
+    from one batched k-nearest query; wells whose parents are not all among
+    their candidates are re-queried with a wider neighbourhood, so only a
+    shrinking remainder is revisited.
+
+    - ``nearest_offset_km``: distance to the closest other well
+    - ``nearest_parent_km``: distance to the closest earlier-completed well
+    - ``n_offsets_within_radius``: other wells within ``radius_km``
+    - ``parent_avg_production``: mean ``production_column`` of the ``k``
+      nearest parent wells
+    """
+    index = index or WellSpatialIndex.from_dataframe(df)
+    n = len(df)
+    completion = pd.to_datetime(df['completion_date']).to_numpy().astype('datetime64[D]').astype(np.int64)
+    production = df[production_column].to_numpy(dtype=np.float64)
+    lat, lon = df['latitude'].to_numpy(), df['longitude'].to_numpy()
+
+    nearest_offset = np.full(n, np.nan)
+    nearest_parent = np.full(n, np.nan)
+    parent_avg = np.full(n, np.nan)
+
+    pending = np.arange(n)
+    n_candidates = 4 * (k + 1)
+    while len(pending) and n_candidates <= MAX_KNN_CANDIDATES:
+        kk = min(n_candidates, n)
+        dist, idx = index.knn(lat[pending], lon[pending], kk)
+        rows = np.arange(len(pending))
+        is_self = idx == pending[:, None]
+        is_parent = completion[idx] < completion[pending, None]
+
+        has_other = (~is_self).any(axis=1)
+        nearest_offset[pending] = np.where(has_other, dist[rows, np.argmax(~is_self, axis=1)], np.nan)
+        has_parent = is_parent.any(axis=1)
+        nearest_parent[pending] = np.where(has_parent, dist[rows, np.argmax(is_parent, axis=1)], np.nan)
+
+        take = is_parent & (np.cumsum(is_parent, axis=1) <= k)
+        n_taken = take.sum(axis=1)
+        with np.errstate(invalid='ignore'):
+            parent_avg[pending] = np.where(take, production[idx], 0.0).sum(axis=1) / n_taken
+
+        # Done when k parents were found or the whole field has been searched
+        done = (n_taken >= k) | (kk >= n)
+        pending = pending[~done]
+        n_candidates *= 4
+
+    # Wells still short of parents are among the earliest completed, so
+    # their possible parents are few: compare against those directly
+    if len(pending):
+        order = np.argsort(completion, kind='stable')
+        n_early = np.searchsorted(completion[order], completion[pending].max())
+        early = order[:n_early]
+        chord = np.linalg.norm(index.points[pending][:, None, :] - index.points[early][None, :, :], axis=2)
+        chord = np.where(completion[early][None, :] < completion[pending][:, None], chord, np.inf)
+        nearest = np.argsort(chord, axis=1)[:, :k]
+        nearest_chord = np.take_along_axis(chord, nearest, axis=1)
+        found = np.isfinite(nearest_chord)
+        nearest_parent[pending] = np.where(found[:, 0], chord_to_km(nearest_chord[:, 0]), np.nan)
+        with np.errstate(invalid='ignore'):
+            parent_avg[pending] = np.where(found, production[early][nearest], 0.0).sum(axis=1) / found.sum(axis=1)
+
+    return pd.DataFrame({
+        'well_id': df['well_id'].to_numpy(),
+        'nearest_offset_km': nearest_offset,
+        'nearest_parent_km': nearest_parent,
+        'n_offsets_within_radius': index.count_within(lat, lon, radius_km) - 1,
+        'parent_avg_production': parent_avg
+    })
+
+
+def materialize_spatial(df: pd.DataFrame, source_path: str = WELLS_FILE) -> pd.DataFrame:
+    """Build and persist the spatial index and offset-well features for a dataset"""
+    index = WellSpatialIndex.from_dataframe(df)
+    index.save(SPATIAL_INDEX_PATH, source_path)
+    features = offset_well_features(df, index)
+    features.to_parquet(OFFSET_FEATURES_PATH, index=False)
+    print(f"✅ Saved offset-well features for {len(features)} wells to {OFFSET_FEATURES_PATH}")
+    return features
+
+
+if __name__ == "__main__":
+    # The saved index must unpickle as src.spatial.WellSpatialIndex
+    import src.spatial
+    src.spatial.materialize_spatial(load_dataframe(WELLS_FILE), WELLS_FILE)
@@ -0,0 +1,137 @@
+"""
+Early-Production Time-Series Features
+Curated tsfresh features over each well's first production days, extracted in parallel and cached
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+from tsfresh import extract_features
+
+from src.production_store import PRODUCTION_STORE_DIR, ProductionStore
+from src.utils import ensure_data_dirs, limit_worker_threads
+
+SILVER_DIR = 'data/silver'
+
+# Curated tsfresh calculators (a small, fast subset of the comprehensive set)
+TS_FEATURE_PARAMETERS: Dict = {
+    'sum_values': None,
+    'mean': None,
+    'median': None,
+    'standard_deviation': None,
+    'maximum': None,
+    'minimum': None,
+    'last_location_of_maximum': None,
+    'absolute_sum_of_changes': None,
+    'count_above_mean': None,
+    'quantile': [{'q': 0.1}, {'q': 0.9}],
+    'linear_trend': [{'attr': 'slope'}, {'attr': 'intercept'}, {'attr': 'rvalue'}],
+    'agg_linear_trend': [{'attr': 'slope', 'chunk_len': 5, 'f_agg': 'mean'}],
+    'autocorrelation': [{'lag': 1}, {'lag': 7}],
+    'cid_ce': [{'normalize': True}],
+}
+
+# Short hash of the calculator set, used to key cached feature tables
+TS_FEATURE_VERSION = hashlib.sha256(
+    json.dumps(TS_FEATURE_PARAMETERS, sort_keys=True).encode()
+).hexdigest()[:12]
+
+
+def ts_feature_path(window_days: int, version: str = TS_FEATURE_VERSION) -> str:
+    """Cache path for a window length and feature-set version"""
+    return os.path.join(SILVER_DIR, f'ts_features_{window_days}d_{version}.parquet')
+
+
+def window_hashes(windows: np.ndarray) -> np.ndarray:
+    """Content hash of each well's window, so changed histories are re-extracted"""
+    windows = np.ascontiguousarray(windows, dtype=np.float32)
+    return np.array([hashlib.blake2b(row.tobytes(), digest_size=8).hexdigest() for row in windows])
+
+
+def _extract_chunk(well_ids: np.ndarray, windows: np.ndarray) -> pd.DataFrame:
+    """tsfresh features for one block of wells (runs in a worker process)"""
+    n_wells, n_days = windows.shape
+    long = pd.DataFrame({
+        'well_id': np.repeat(well_ids, n_days),
+        'day': np.tile(np.arange(1, n_days + 1), n_wells),
+        'rate': windows.ravel()
+    })
+    features = extract_features(
+        long, column_id='well_id', column_sort='day',
+        default_fc_parameters=TS_FEATURE_PARAMETERS,
+        n_jobs=0, disable_progressbar=True
+    )
+    features.index.name = 'well_id'
+    return features.reindex(well_ids).reset_index()
+
+
+def extract_window_features(well_ids: np.ndarray, windows: np.ndarray, n_workers: int = None,
+                            chunk_wells: int = 1000) -> pd.DataFrame:
+    """Extract curated features for (wells × days) windows, chunking wells across processes"""
+    well_ids = np.asarray(well_ids)
+    chunks = [slice(i, i + chunk_wells) for i in range(0, len(well_ids), chunk_wells)]
+    if not chunks:
+        return pd.DataFrame({'well_id': well_ids})
+
+    n_workers = max(1, min(n_workers or os.cpu_count() or 1, len(chunks)))
+    if n_workers == 1:
+        parts = [_extract_chunk(well_ids[c], windows[c]) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=limit_worker_threads,
+                                 initargs=(1,)) as executor:
+            parts = list(executor.map(_extract_chunk, [well_ids[c] for c in chunks],
+                                      [windows[c] for c in chunks]))
+    return pd.concat(parts, ignore_index=True)
+
+
+def load_or_extract_ts_features(window_days: int = 30, store: ProductionStore = None,
+                                n_workers: int = None) -> pd.DataFrame:
+    """Features of every well's first ``window_days`` days, extracting only what is new
+
+    The cache in the silver layer is keyed by window length and feature-set
+    hash; each row also records a hash of the window it was computed from,
+    so a rerun extracts only wells that are new or whose early history
+    changed. Wells with fewer than ``window_days`` days are skipped.
+    """
+    ensure_data_dirs()
+    store = store or ProductionStore(PRODUCTION_STORE_DIR)
+    rows = np.flatnonzero(store.lengths >= window_days)
+    well_ids = store.well_ids[rows]
+    windows = store.window(window_days, rows).astype(np.float32)
+    hashes = window_hashes(windows)
+
+    path = ts_feature_path(window_days)
+    cached = pd.read_parquet(path) if os.path.exists(path) else pd.DataFrame(columns=['well_id', 'window_hash'])
+    current = dict(zip(cached['well_id'], cached['window_hash']))
+    stale = np.array([current.get(w) != h for w, h in zip(well_ids, hashes)], dtype=bool)
+
+    if stale.any():
+        fresh = extract_window_features(well_ids[stale], windows[stale], n_workers)
+        fresh['window_hash'] = hashes[stale]
+        kept = cached[cached['well_id'].isin(set(well_ids[~stale]))]
+        cached = pd.concat([kept, fresh], ignore_index=True) if len(kept) else fresh
+        cached.to_parquet(path, index=False)
+        print(f"✅ Extracted {len(fresh.columns) - 2} tsfresh features for {stale.sum()} wells "
+              f"({len(kept)} cached) to {path}")
+
+    table = cached.set_index('well_id').reindex(well_ids).reset_index()
+    return table.drop(columns='window_hash')
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Extract early-production tsfresh features")
+    parser.add_argument('--window', type=int, default=30, help="Days from first production")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = load_or_extract_ts_features(args.window, n_workers=args.workers)
+    print(f"⏱️ {len(table)} wells × {table.shape[1] - 1} features in {time.perf_counter() - start:.2f}s")
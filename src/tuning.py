@@ -0,0 +1,213 @@
+"""
+Hyperparameter Search for the Production Model
+Parallel k-fold cross-validation with early stopping and a persisted leaderboard
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from catboost import CatBoostRegressor, Pool
+from sklearn.model_selection import KFold
+
+from src.features import model_inputs
+from src.ml_pipeline import DEFAULT_PARAMS, ProductionMLPipeline
+
+LEADERBOARD_DIR = 'models/tuning'
+
+SEARCH_SPACE = {
+    'depth': [4, 5, 6, 7, 8],
+    'learning_rate': [0.02, 0.03, 0.05, 0.08, 0.12],
+    'l2_leaf_reg': [1, 3, 5, 10, 20],
+    'bagging_temperature': [0.0, 0.5, 1.0],
+    'border_count': [64, 128, 254],
+}
+
+# Per-process fold pools, built once by the worker initializer
+_FOLD_POOLS: List = []
+_THREAD_COUNT = 1
+
+
+def sample_params(space: Dict[str, List], n_trials: int, seed: int = 42) -> List[Dict]:
+    """Draw distinct random configurations from a discrete search space"""
+    rng = np.random.default_rng(seed)
+    n_total = int(np.prod([len(v) for v in space.values()]))
+    trials, seen = [], set()
+    while len(trials) < min(n_trials, n_total):
+        params = {k: v[rng.integers(len(v))] for k, v in space.items()}
+        params = {k: v.item() if hasattr(v, 'item') else v for k, v in params.items()}
+        key = params_key(params)
+        if key not in seen:
+            seen.add(key)
+            trials.append(params)
+    return trials
+
+
+def params_key(params: Dict) -> str:
+    """Stable identifier for a configuration, used to resume leaderboards"""
+    return json.dumps(params, sort_keys=True)
+
+
+def study_key(X: np.ndarray, y: np.ndarray, target_column: str, n_folds: int,
+              max_iterations: int, early_stopping_rounds: int) -> str:
+    """Short hash of everything a CV score depends on besides the parameters"""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    digest.update(json.dumps([X.shape, target_column, n_folds, max_iterations, early_stopping_rounds]).encode())
+    return digest.hexdigest()[:12]
+
+
+def leaderboard_path(study: str) -> str:
+    """Leaderboard file of one study; regenerated data or a new target starts a fresh one"""
+    return os.path.join(LEADERBOARD_DIR, f'leaderboard_{study}.csv')
+
+
+def _init_worker(X: np.ndarray, y: np.ndarray, folds: List, thread_count: int):
+    global _FOLD_POOLS, _THREAD_COUNT
+    _THREAD_COUNT = thread_count
+    _FOLD_POOLS = [
+        (Pool(X[train_idx], y[train_idx]), Pool(X[valid_idx], y[valid_idx]))
+        for train_idx, valid_idx in folds
+    ]
+
+
+def _run_trial(params: Dict, max_iterations: int, early_stopping_rounds: int) -> Dict:
+    start = time.perf_counter()
+    scores, best_iterations = [], []
+    for train_pool, valid_pool in _FOLD_POOLS:
+        model = CatBoostRegressor(**{
+            **DEFAULT_PARAMS, **params,
+            'iterations': max_iterations,
+            'early_stopping_rounds': early_stopping_rounds,
+            'use_best_model': True,
+            'thread_count': _THREAD_COUNT,
+            'allow_writing_files': False
+        })
+        model.fit(train_pool, eval_set=valid_pool)
+        scores.append(model.get_best_score()['validation']['RMSE'])
+        best_iterations.append(model.get_best_iteration() + 1)
+
+    return {
+        **params,
+        'cv_rmse_mean': float(np.mean(scores)),
+        'cv_rmse_std': float(np.std(scores)),
+        'best_iteration': int(np.mean(best_iterations)),
+        'fit_seconds': time.perf_counter() - start,
+        'params_key': params_key(params)
+    }
+
+
+def load_leaderboard(path: str) -> pd.DataFrame:
+    """Load a persisted leaderboard sorted by CV RMSE"""
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_csv(path).sort_values('cv_rmse_mean').reset_index(drop=True)
+
+
+def best_params(leaderboard: pd.DataFrame) -> Dict:
+    """CatBoost parameters of the best trial, with its early-stopped iteration count"""
+    if leaderboard.empty:
+        raise ValueError("Leaderboard has no finished trials; raise the time budget or the number of trials")
+    best = leaderboard.sort_values('cv_rmse_mean').iloc[0]
+    params = {k: best[k].item() if hasattr(best[k], 'item') else best[k]
+              for k in SEARCH_SPACE if k in best.index}
+    params['iterations'] = int(best['best_iteration'])
+    return params
+
+
+def tune_hyperparameters(df: pd.DataFrame, target_column: str = 'cum_oil_180_days_m3',
+                         features: pd.DataFrame = None, space: Dict[str, List] = None, n_trials: int = 30, n_folds: int = 5,
+                         n_workers: int = None, time_budget_s: float = 600,
+                         max_iterations: int = 2000, early_stopping_rounds: int = 50,
+                         path: str = None) -> pd.DataFrame:
+    """Run a parallel k-fold CV search and persist results after every trial
+
+    Results go to the study's leaderboard (see ``study_key``) unless
+    ``path`` is given. Trials already present in it are skipped, so an
+    interrupted or budget-limited search resumes where it stopped, while
+    regenerated data, another target or fold count never reuse stale
+    scores. The result is empty if no trial finished. No new trials are
+    started once ``time_budget_s`` has elapsed. Features are left unscaled:
+    tree splits are invariant to the pipeline's affine StandardScaler.
+    """
+    pipeline = ProductionMLPipeline(target_column=target_column)
+    df_features = pipeline.prepare_features(df, features)
+    feature_columns = pipeline.select_features(df_features)
+    X = model_inputs(df_features, feature_columns).to_numpy(dtype=np.float32)
+    y = df_features[target_column].to_numpy(dtype=np.float64)
+
+    folds = list(KFold(n_splits=n_folds, shuffle=True, random_state=42).split(X))
+
+    path = path or leaderboard_path(study_key(X, y, target_column, n_folds, max_iterations, early_stopping_rounds))
+    leaderboard = load_leaderboard(path)
+    done = set(leaderboard['params_key']) if len(leaderboard) else set()
+    pending = [p for p in sample_params(space or SEARCH_SPACE, n_trials) if params_key(p) not in done]
+
+    n_workers = n_workers or max(1, min(len(pending), os.cpu_count() or 1))
+    thread_count = max(1, (os.cpu_count() or 1) // n_workers)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    print(f"🔎 Tuning {len(pending)} trials × {n_folds} folds on {n_workers} workers "
+          f"(budget {time_budget_s:.0f}s, {len(done)} cached in {path})")
+
+    deadline = time.perf_counter() + time_budget_s
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(X, y, folds, thread_count)) as executor:
+        queue = iter(pending)
+        running = set()
+        while True:
+            while len(running) < n_workers and time.perf_counter() < deadline:
+                params = next(queue, None)
+                if params is None:
+                    break
+                running.add(executor.submit(_run_trial, params, max_iterations, early_stopping_rounds))
+            if not running:
+                break
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                row = future.result()
+                pd.DataFrame([row]).to_csv(
+                    path, mode='a', index=False,
+                    header=not os.path.exists(path)
+                )
+                print(f"✅ CV RMSE {row['cv_rmse_mean']:.4f} ± {row['cv_rmse_std']:.4f} "
+                      f"@ {row['best_iteration']} it: {row['params_key']}")
+
+    return load_leaderboard(path)
+
+
+if __name__ == "__main__":
+    from src.feature_store import load_feature_table
+    from src.utils import WELLS_FILE, load_dataframe
+
+    parser = argparse.ArgumentParser(description="Tune the production model with k-fold CV")
+    parser.add_argument('--data', default=WELLS_FILE)
+    parser.add_argument('--trials', type=int, default=30)
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--budget', type=float, default=600, help='wall-clock budget in seconds')
+    parser.add_argument('--train', action='store_true', help='train and register the best configuration')
+    args = parser.parse_args()
+
+    df = load_dataframe(args.data)
+    features = load_feature_table(args.data)
+    leaderboard = tune_hyperparameters(df, features=features, n_trials=args.trials, n_folds=args.folds,
+                                       n_workers=args.workers, time_budget_s=args.budget)
+    if leaderboard.empty:
+        parser.exit(1, "❌ No trial finished within the time budget; raise --budget or lower --folds\n")
+    print(leaderboard.head(10).drop(columns='params_key').to_string())
+
+    if args.train:
+        from src.model_registry import register_model
+
+        pipeline = ProductionMLPipeline()
+        metrics = pipeline.train_model(df, params=best_params(leaderboard), features=features)
+        print(f"Test R²: {metrics['test_r2']:.3f}")
+        register_model(pipeline, df, metrics)
@@ -7,6 +7,11 @@ import numpy as np
 from typing import Dict, List, Tuple
 import os
 
+WELLS_FILE = 'data/bronze/wells_synth.csv'
+
+# Decline exponents below this are treated as exponential decline
+ARPS_B_EPS = 1e-6
+
 
 def ensure_data_dirs():
     """Ensure data directories exist"""
@@ -15,6 +20,21 @@ def ensure_data_dirs():
         os.makedirs(d, exist_ok=True)
 
 
+def file_signature(path: str) -> Dict:
+    """Cheap change-detection signature of a file (path, size, mtime)"""
+    stat = os.stat(path)
+    return {'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def limit_worker_threads(thread_count: int):
+    """Cap native thread pools in a worker process so parallel workers do not oversubscribe cores"""
+    from threadpoolctl import threadpool_limits
+    
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[var] = str(thread_count)
+    threadpool_limits(thread_count)
+
+
 def format_number(num: float, decimals: int = 2) -> str:
     """Format number with thousand separators"""
     return f"{num:,.{decimals}f}"
@@ -39,18 +59,45 @@ def detect_outliers_iqr(df: pd.DataFrame, column: str) -> pd.Series:
     return (df[column] < lower_bound) | (df[column] > upper_bound)
 
 
-def arps_decline(qi: float, di: float, b: float, time: np.ndarray) -> np.ndarray:
+def arps_decline(qi, di, b, time):
     """
-    Arps decline curve equation
+    Arps decline curve equation (elementwise, broadcasts over wells and time)
     qi: initial production rate
     di: initial decline rate
     b: decline exponent (0=exponential, 0-1=hyperbolic, 1=harmonic)
     time: time array
     """
-    if b == 0:
-        return qi * np.exp(-di * time)
-    else:
-        return qi / ((1 + b * di * time) ** (1/b))
+    qi, di, b, time = np.broadcast_arrays(qi, di, b, time)
+    hyperbolic = b > ARPS_B_EPS
+    b_safe = np.where(hyperbolic, b, 1)
+    with np.errstate(over='ignore'):
+        return np.where(
+            hyperbolic,
+            qi * np.exp(-np.log1p(b_safe * di * time) / b_safe),
+            qi * np.exp(-di * time)
+        )
+
+
+def arps_cumulative(qi, di, b, time):
+    """
+    Cumulative production of an Arps decline from 0 to time (elementwise)
+
+    The hyperbolic form is written as ``qi/di * L/b * expm1(u)/u`` with
+    ``L = ln(1 + b·di·t)`` and ``u = (b-1)/b · L``, which is continuous
+    through the harmonic case (b = 1, u = 0), so fits can move b across it.
+    """
+    qi, di, b, time = np.broadcast_arrays(qi, di, b, time)
+    exponential = b <= ARPS_B_EPS
+    b_safe = np.where(exponential, 1.0, b)
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        log_term = np.log1p(b_safe * di * time)
+        u = (b_safe - 1) / b_safe * log_term
+        exprel = np.where(u == 0, 1.0, np.expm1(u) / np.where(u == 0, 1.0, u))
+        return np.where(
+            exponential,
+            qi / di * (1 - np.exp(-di * time)),
+            qi / di * log_term / b_safe * exprel
+        )
 
 
 def save_dataframe(df: pd.DataFrame, filepath: str, format: str = 'csv'):
@@ -0,0 +1,247 @@
+"""
+Visualization Data Layer
+Server-side binning, summary statistics and downsampling so chart payloads stay bounded at any well count
+"""
+
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Payload limits: charts never ship more than these many marks to the browser
+MAX_MAP_CELLS = 2000
+MAX_RAW_MAP_POINTS = 5000
+MAX_SCATTER_POINTS = 5000
+MAX_BOX_OUTLIERS = 200
+
+# Hexagon radius on screen at the requested zoom
+HEX_RADIUS_PX = 12
+
+SQRT3 = np.sqrt(3.0)
+
+
+def hex_radius_deg(zoom: float) -> float:
+    """Hexagon radius in degrees that spans ``HEX_RADIUS_PX`` pixels at a web-map zoom level"""
+    return HEX_RADIUS_PX * 360.0 / (256 * 2.0 ** zoom)
+
+
+def _hex_round(q: np.ndarray, r: np.ndarray):
+    """Round fractional axial coordinates to the containing hexagon (cube rounding)"""
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+def hex_bin(latitude, longitude, values=None, zoom: float = 6,
+            max_cells: int = MAX_MAP_CELLS) -> pd.DataFrame:
+    """Aggregate points into pointy-top hexagons sized for ``zoom``
+
+    Longitudes are scaled by cos(mean latitude) so cells are near-regular
+    on the map. If more than ``max_cells`` cells are occupied the hexagon
+    size doubles until they fit. Returns one row per occupied cell with its
+    centre, well count and the mean of ``values``; ``attrs`` carries the
+    radius and reference latitude needed to draw the cells.
+    """
+    lat = np.asarray(latitude, dtype=np.float64)
+    lon = np.asarray(longitude, dtype=np.float64)
+    lat0 = float(np.nanmean(lat)) if len(lat) else 0.0
+    x, y = lon * np.cos(np.radians(lat0)), lat
+    radius = hex_radius_deg(zoom)
+
+    while True:
+        q, r = _hex_round((SQRT3 / 3 * x - y / 3) / radius, (2 / 3 * y) / radius)
+        # One int64 key per cell, so grouping is a 1-D sort
+        q0, r0 = (q.min(), r.min()) if len(q) else (0, 0)
+        width = (r.max() - r0 + 1) if len(r) else 1
+        keys, inverse = np.unique((q - q0) * width + (r - r0), return_inverse=True)
+        if len(keys) <= max_cells:
+            break
+        radius *= 2
+    cell_q, cell_r = keys // width + q0, keys % width + r0
+
+    counts = np.bincount(inverse, minlength=len(keys))
+    cells = pd.DataFrame({
+        'hex_q': cell_q, 'hex_r': cell_r,
+        'latitude': radius * 1.5 * cell_r,
+        'longitude': radius * SQRT3 * (cell_q + cell_r / 2) / np.cos(np.radians(lat0)),
+        'n_wells': counts,
+    })
+    if values is not None:
+        v = np.asarray(values, dtype=np.float64)
+        valid = np.isfinite(v)
+        sums = np.bincount(inverse[valid], weights=v[valid], minlength=len(keys))
+        n_valid = np.bincount(inverse[valid], minlength=len(keys))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cells['mean_value'] = sums / n_valid
+    cells.attrs.update({'radius_deg': radius, 'lat0': lat0})
+    return cells
+
+
+def hex_geojson(cells: pd.DataFrame) -> Dict:
+    """GeoJSON polygons for ``hex_bin`` cells, with feature ids matching row positions"""
+    radius, lat0 = cells.attrs['radius_deg'], cells.attrs['lat0']
+    angles = np.radians(30 + 60 * np.arange(7))
+    x0 = cells['longitude'].to_numpy() * np.cos(np.radians(lat0))
+    ring_lon = (x0[:, None] + radius * np.cos(angles)[None, :]) / np.cos(np.radians(lat0))
+    ring_lat = cells['latitude'].to_numpy()[:, None] + radius * np.sin(angles)[None, :]
+    return {
+        'type': 'FeatureCollection',
+        'features': [
+            {'type': 'Feature', 'id': i,
+             'geometry': {'type': 'Polygon', 'coordinates': [np.column_stack([lo, la]).round(5).tolist()]}}
+            for i, (lo, la) in enumerate(zip(ring_lon, ring_lat))
+        ]
+    }
+
+
+def plot_well_map(df: pd.DataFrame, value: str, zoom: float = 6, hover: Sequence[str] = ('well_id',),
+                  title: str = "Well Locations", height: int = 600) -> go.Figure:
+    """Well map: individual markers for small datasets, zoom-sized hexagons beyond ``MAX_RAW_MAP_POINTS``"""
+    center = {'lat': float(df['latitude'].mean()), 'lon': float(df['longitude'].mean())}
+    if len(df) <= MAX_RAW_MAP_POINTS:
+        hover_columns = [c for c in hover if c in df.columns]
+        fig = go.Figure(go.Scattermapbox(
+            lat=df['latitude'], lon=df['longitude'], mode='markers',
+            marker=dict(color=df[value], colorscale='Viridis', showscale=True, size=8,
+                        colorbar=dict(title=value)),
+            customdata=df[hover_columns].to_numpy() if hover_columns else None,
+            hovertemplate=''.join(f"{c}: %{{customdata[{i}]}}<br>" for i, c in enumerate(hover_columns))
+                          + f"{value}: %{{marker.color:.1f}}<extra></extra>",
+        ))
+    else:
+        cells = hex_bin(df['latitude'], df['longitude'], df[value], zoom)
+        fig = go.Figure(go.Choroplethmapbox(
+            geojson=hex_geojson(cells), locations=np.arange(len(cells)), z=cells['mean_value'],
+            colorscale='Viridis', marker_opacity=0.7, marker_line_width=0,
+            colorbar=dict(title=f"mean {value}"), customdata=cells[['n_wells']].to_numpy(),
+            hovertemplate=f"wells: %{{customdata[0]:,}}<br>mean {value}: %{{z:.1f}}<extra></extra>",
+        ))
+        title = f"{title} ({len(df):,} wells in {len(cells):,} hexagons)"
+    fig.update_layout(title=title, height=height, mapbox=dict(style='open-street-map', zoom=zoom, center=center),
+                      margin=dict(l=0, r=0, t=40, b=0))
+    return fig
+
+
+def histogram_table(values, bins: int = 30, value_range: tuple = None) -> pd.DataFrame:
+    """Counts per bin (bin_left, bin_right, count), computed with NumPy instead of in the browser"""
+    values = np.asarray(values, dtype=np.float64)
+    counts, edges = np.histogram(values[np.isfinite(values)], bins=bins, range=value_range)
+    return pd.DataFrame({'bin_left': edges[:-1], 'bin_right': edges[1:], 'count': counts})
+
+
+def histogram_trace(table: pd.DataFrame, name: str = None, **kwargs) -> go.Bar:
+    """Bar trace drawing a ``histogram_table``"""
+    return go.Bar(x=(table['bin_left'] + table['bin_right']) / 2, y=table['count'],
+                  width=table['bin_right'] - table['bin_left'], name=name, **kwargs)
+
+
+def box_stats(values) -> Dict:
+    """Tukey box-plot statistics, with at most ``MAX_BOX_OUTLIERS`` of the most extreme outliers"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return {'n': 0, 'q1': np.nan, 'median': np.nan, 'q3': np.nan, 'mean': np.nan,
+                'lowerfence': np.nan, 'upperfence': np.nan, 'outliers': np.array([])}
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    outliers = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+    if len(outliers) > MAX_BOX_OUTLIERS:
+        outliers = outliers[np.argsort(np.abs(outliers - median))[-MAX_BOX_OUTLIERS:]]
+    return {
+        'n': len(values), 'q1': q1, 'median': median, 'q3': q3, 'mean': values.mean(),
+        'lowerfence': inside.min(), 'upperfence': inside.max(), 'outliers': outliers,
+    }
+
+
+def plot_box(stats: Dict[str, Dict], title: str = None, height: int = 450) -> go.Figure:
+    """Box plot from precomputed ``box_stats`` per series name"""
+    fig = go.Figure()
+    for name, s in stats.items():
+        fig.add_trace(go.Box(
+            name=name, q1=[s['q1']], median=[s['median']], q3=[s['q3']], mean=[s['mean']],
+            lowerfence=[s['lowerfence']], upperfence=[s['upperfence']], boxpoints=False
+        ))
+        if len(s['outliers']):
+            fig.add_trace(go.Scattergl(
+                x=[name] * len(s['outliers']), y=s['outliers'], mode='markers', showlegend=False,
+                marker=dict(size=4, color='#EF553B'), name=f"{name} outliers"
+            ))
+    fig.update_layout(title=title, height=height, showlegend=False)
+    return fig
+
+
+def lttb(x, y, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of ``n_out`` points preserving a series' visual shape
+
+    ``x`` must be sorted. The first and last points are always kept; each
+    bucket in between keeps the point forming the largest triangle with the
+    previously kept point and the next bucket's centroid.
+    """
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    next_mean_x = np.array([x[a:b].mean() for a, b in zip(edges[1:], np.append(edges[2:], n))])
+    next_mean_y = np.array([y[a:b].mean() for a, b in zip(edges[1:], np.append(edges[2:], n))])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        a, b = edges[i], edges[i + 1]
+        area = np.abs((x[previous] - next_mean_x[i]) * (y[a:b] - y[previous])
+                      - (x[previous] - x[a:b]) * (next_mean_y[i] - y[previous]))
+        previous = a + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def stratified_sample(x, y, n_out: int, n_strata: int = 20, seed: int = 42) -> np.ndarray:
+    """Indices of a random sample stratified over (x, y) quantile cells
+
+    Each cell keeps its proportional share (at least one point), so sparse
+    tails stay visible; the points at the x and y extremes are always kept.
+    """
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+
+    def quantile_bin(v):
+        edges = np.nanquantile(v, np.linspace(0, 1, n_strata + 1)[1:-1])
+        return np.searchsorted(edges, v, side='right')
+
+    stratum = quantile_bin(x) * n_strata + quantile_bin(y)
+    sizes = np.bincount(stratum, minlength=n_strata * n_strata)
+    quota = np.where(sizes > 0, np.maximum(np.floor(sizes * n_out / n), 1), 0).astype(np.int64)
+
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(n), stratum))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rank = np.arange(n) - starts[stratum[order]]
+    keep = order[rank < quota[stratum[order]]]
+    extremes = [np.nanargmin(x), np.nanargmax(x), np.nanargmin(y), np.nanargmax(y)]
+    return np.unique(np.concatenate([keep, extremes]))
+
+
+def scatter_gl(x, y, max_points: int = MAX_SCATTER_POINTS, method: str = 'stratified',
+               name: str = None, **kwargs) -> go.Scattergl:
+    """WebGL scatter trace with at most ~``max_points`` markers
+
+    ``method`` is 'stratified' for point clouds or 'lttb' for series
+    ordered by ``x``.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    if len(x) > max_points:
+        index = lttb(x, y, max_points) if method == 'lttb' else stratified_sample(x, y, max_points)
+        x, y = x[index], y[index]
+    return go.Scattergl(x=x, y=y, name=name, **kwargs)